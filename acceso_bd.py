@@ -0,0 +1,102 @@
+# =====================================================
+# ACCESO A LA BASE DE DATOS CON POOL - POKÉMON TEAM BUILDER
+# Conexiones compartidas y seguras entre sesiones de Streamlit
+# =====================================================
+
+import threading
+import time
+from contextlib import contextmanager
+
+from mysql.connector import errors, pooling
+
+
+class PoolConexiones:
+    """Pool de conexiones MySQL con espera acotada, health check y métricas"""
+
+    def __init__(self, config, pool_size=5, pool_name='pokemon_pool', timeout=10.0):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name=pool_name,
+            pool_size=pool_size,
+            pool_reset_session=True,
+            **config
+        )
+        # MySQLConnectionPool falla en vez de esperar cuando se agota: el semáforo
+        # hace que las sesiones esperen su turno (y permite medir esa espera)
+        self._disponibles = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._activas = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._reconexiones = 0
+        self._errores = 0
+
+    @contextmanager
+    def conexion(self):
+        """Tomar una conexión del pool, verificarla y devolverla al terminar"""
+        inicio = time.perf_counter()
+        if not self._disponibles.acquire(timeout=self.timeout):
+            with self._lock:
+                self._errores += 1
+            raise errors.PoolError(f"No hay conexiones libres tras {self.timeout:.0f}s de espera")
+        try:
+            conn = self._pool.get_connection()
+        except Exception:
+            self._disponibles.release()
+            with self._lock:
+                self._errores += 1
+            raise
+
+        espera = time.perf_counter() - inicio
+        with self._lock:
+            self._checkouts += 1
+            self._activas += 1
+            self._espera_total += espera
+            self._espera_max = max(self._espera_max, espera)
+
+        try:
+            # Health check: reconectar si el servidor cerró la conexión inactiva
+            if not conn.is_connected():
+                conn.reconnect(attempts=3, delay=0.5)
+                with self._lock:
+                    self._reconexiones += 1
+            yield conn
+        finally:
+            conn.close()  # En una conexión del pool, close() la devuelve al pool
+            with self._lock:
+                self._activas -= 1
+            self._disponibles.release()
+
+    def ejecutar(self, funcion, reintentar=True):
+        """Ejecutar funcion(conn) con una conexión del pool, reintentando una vez si se perdió.
+        
+        Con reintentar=False (escrituras) solo se reintenta si falla obtener o verificar la
+        conexión: si se perdió durante funcion, el commit pudo llegar al servidor y repetirla
+        duplicaría las filas.
+        """
+        for intento in range(2):
+            empezada = False
+            try:
+                with self.conexion() as conn:
+                    empezada = True
+                    return funcion(conn)
+            except (errors.OperationalError, errors.InterfaceError):
+                with self._lock:
+                    self._errores += 1
+                if intento == 1 or (empezada and not reintentar):
+                    raise
+
+    def metricas(self):
+        """Estado y contadores del pool"""
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'activas': self._activas,
+                'checkouts': self._checkouts,
+                'espera_media_ms': self._espera_total / self._checkouts * 1000 if self._checkouts else 0.0,
+                'espera_max_ms': self._espera_max * 1000,
+                'reconexiones': self._reconexiones,
+                'errores': self._errores,
+            }
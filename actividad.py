@@ -0,0 +1,211 @@
+# =====================================================
+# MANTENIMIENTO DE ACTIVITY_LOG - POKÉMON TEAM BUILDER
+# Particiones por día, retención con resumen diario y lectura acotada
+# =====================================================
+#
+# Uso (p. ej. una vez al día desde cron):
+#   python actividad.py                                    # MySQL, 30 días de retención
+#   python actividad.py --retencion-dias 7 --backend sqlite --sqlite-path pokemon_team_builder.db
+#
+# MySQL: activity_log está particionada por día (RANGE sobre UNIX_TIMESTAMP). Se crean
+# particiones con unos días de adelanto y las vencidas se resumen en activity_log_daily
+# y se eliminan con DROP PARTITION, sin recorrer sus filas con un DELETE.
+# SQLite no tiene particiones: las entradas vencidas se resumen y se borran por rango de
+# timestamp. En los dos casos activity_log guarda solo los últimos `retencion_dias` días,
+# así sus índices (y el costo de cada INSERT) dejan de crecer.
+
+import argparse
+import re
+import sys
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from almacenamiento import SQLITE_PATH_DEFAULT, es_sqlite
+
+RETENCION_DIAS_DEFAULT = 30
+DIAS_ADELANTADOS = 7  # Particiones creadas por adelantado (MySQL)
+LIMITE_RECIENTE = 50
+
+# Resumen de las entradas anteriores al corte; al reejecutarse reemplaza (no suma) el conteo
+# del día, así una compactación interrumpida se puede repetir sin duplicar nada
+_SQL_RESUMIR = """
+    INSERT INTO activity_log_daily (day, table_name, action_type, entries, first_id, last_id)
+    SELECT DATE(timestamp), table_name, action_type, COUNT(*), MIN(id), MAX(id)
+    FROM activity_log
+    WHERE timestamp < %s
+    GROUP BY DATE(timestamp), table_name, action_type
+    ON DUPLICATE KEY UPDATE
+        entries = VALUES(entries), first_id = VALUES(first_id), last_id = VALUES(last_id)
+"""
+
+# Lectura acotada: un recorrido inverso de la clave primaria, sin ordenar la tabla
+SQL_ACTIVIDAD_RECIENTE = """
+    SELECT id, table_name, action_type, record_id, new_values, timestamp
+    FROM activity_log
+    ORDER BY id DESC
+    LIMIT %s
+"""
+
+
+def _hoy(cursor):
+    """Fecha actual según la base (la misma referencia que el DEFAULT de timestamp)"""
+    cursor.execute("SELECT CURRENT_DATE")
+    hoy = cursor.fetchone()[0]
+    return hoy if isinstance(hoy, date) else date.fromisoformat(str(hoy))
+
+
+def _nombre_particion(dia):
+    return f"p{dia:%Y%m%d}"
+
+
+def particiones_diarias(cursor):
+    """{nombre: día} de las particiones diarias de activity_log, o None si no está particionada"""
+    cursor.execute("""
+        SELECT PARTITION_NAME
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'activity_log' AND PARTITION_NAME IS NOT NULL
+    """)
+    nombres = [nombre for (nombre,) in cursor.fetchall()]
+    if not nombres:
+        return None
+    return {
+        nombre: datetime.strptime(nombre[1:], '%Y%m%d').date()
+        for nombre in nombres if re.fullmatch(r'p\d{8}', nombre)
+    }
+
+
+def preparar_particiones(connection, dias_adelantados=DIAS_ADELANTADOS):
+    """Crear las particiones diarias de hoy a hoy + dias_adelantados que falten; devuelve cuántas"""
+    if es_sqlite(connection):
+        return 0
+    cursor = connection.cursor()
+    particiones = particiones_diarias(cursor)
+    if particiones is None:
+        return 0  # Base creada antes de particionar activity_log: solo se compacta
+    hoy = _hoy(cursor)
+    # REORGANIZE solo puede partir p_futuro: los días nuevos van después del último existente
+    desde = max(max(particiones.values()) + timedelta(days=1), hoy) if particiones else hoy
+    dias = [desde + timedelta(days=k) for k in range((hoy + timedelta(days=dias_adelantados) - desde).days + 1)]
+    if not dias:
+        return 0
+    nuevas = ', '.join(
+        f"PARTITION {_nombre_particion(dia)} VALUES LESS THAN "
+        f"(UNIX_TIMESTAMP('{dia + timedelta(days=1):%Y-%m-%d} 00:00:00'))"
+        for dia in dias
+    )
+    cursor.execute(
+        f"ALTER TABLE activity_log REORGANIZE PARTITION p_futuro INTO "
+        f"({nuevas}, PARTITION p_futuro VALUES LESS THAN MAXVALUE)"
+    )
+    return len(dias)
+
+
+def compactar_actividad(connection, retencion_dias=RETENCION_DIAS_DEFAULT):
+    """Resumir en activity_log_daily las entradas de días anteriores a la retención y borrarlas.
+
+    Devuelve (entradas compactadas, particiones eliminadas).
+    """
+    cursor = connection.cursor()
+    corte = _hoy(cursor) - timedelta(days=retencion_dias)
+    corte_texto = corte.isoformat()
+
+    cursor.execute("SELECT COUNT(*) FROM activity_log WHERE timestamp < %s", (corte_texto,))
+    compactadas = cursor.fetchone()[0]
+    if compactadas:
+        cursor.execute(_SQL_RESUMIR, (corte_texto,))
+    connection.commit()
+
+    eliminadas = 0
+    particiones = None if es_sqlite(connection) else particiones_diarias(cursor)
+    if particiones:
+        # La partición del día d guarda timestamps < d + 1: vencida si d < corte
+        vencidas = [nombre for nombre, dia in particiones.items() if dia < corte]
+        if vencidas:
+            cursor.execute(f"ALTER TABLE activity_log DROP PARTITION {', '.join(vencidas)}")
+            eliminadas = len(vencidas)
+
+    # Lo que quede antes del corte (SQLite, base sin particiones o p_futuro) se borra por rango
+    if compactadas:
+        cursor.execute("DELETE FROM activity_log WHERE timestamp < %s", (corte_texto,))
+    connection.commit()
+    return compactadas, eliminadas
+
+
+def mantener_actividad(connection, retencion_dias=RETENCION_DIAS_DEFAULT, dias_adelantados=DIAS_ADELANTADOS):
+    """Compactar lo vencido y preparar las particiones de los próximos días"""
+    try:
+        print(f"🧹 Manteniendo activity_log (retención: {retencion_dias} días)...")
+        compactadas, eliminadas = compactar_actividad(connection, retencion_dias)
+        creadas = preparar_particiones(connection, dias_adelantados)
+        print(f"✅ {compactadas} entradas resumidas en activity_log_daily · "
+              f"{eliminadas} particiones eliminadas · {creadas} particiones nuevas")
+        return True
+    except Exception as e:
+        connection.rollback()
+        print(f"❌ Error manteniendo activity_log: {e}")
+        return False
+
+
+def actividad_reciente(connection, limite=LIMITE_RECIENTE):
+    """Las `limite` entradas más recientes como DataFrame"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(SQL_ACTIVIDAD_RECIENTE, (int(limite),))
+        filas = cursor.fetchall()
+    finally:
+        cursor.close()
+    return pd.DataFrame(filas, columns=['id', 'table_name', 'action_type', 'record_id', 'new_values', 'timestamp'])
+
+
+def actividad_diaria(connection, dias=RETENCION_DIAS_DEFAULT):
+    """Entradas por día, tabla y acción de los últimos `dias` días (resumen compactado + entradas vivas)"""
+    cursor = connection.cursor()
+    try:
+        desde = (_hoy(cursor) - timedelta(days=dias)).isoformat()
+        cursor.execute("""
+            SELECT day, table_name, action_type, entries
+            FROM activity_log_daily
+            WHERE day >= %s
+            UNION ALL
+            SELECT DATE(timestamp), table_name, action_type, COUNT(*)
+            FROM activity_log
+            WHERE timestamp >= %s
+            GROUP BY DATE(timestamp), table_name, action_type
+        """, (desde, desde))
+        filas = cursor.fetchall()
+    finally:
+        cursor.close()
+    df = pd.DataFrame(filas, columns=['day', 'table_name', 'action_type', 'entries'])
+    df['day'] = pd.to_datetime(df['day'])
+    return df.sort_values(['day', 'table_name', 'action_type'], ignore_index=True)
+
+
+def main():
+    """Función principal"""
+    from import_mejorado import conectar_bd  # Solo el mantenimiento por consola necesita la conexión de import
+
+    parser = argparse.ArgumentParser(description="Retención, compactación y particiones de activity_log")
+    parser.add_argument('--retencion-dias', type=int, default=RETENCION_DIAS_DEFAULT,
+                        help=f"Días de entradas que se conservan completas (default: {RETENCION_DIAS_DEFAULT})")
+    parser.add_argument('--dias-adelantados', type=int, default=DIAS_ADELANTADOS,
+                        help=f"Particiones diarias creadas por adelantado en MySQL (default: {DIAS_ADELANTADOS})")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql',
+                        help="Base de datos (default: mysql)")
+    parser.add_argument('--sqlite-path', default=SQLITE_PATH_DEFAULT,
+                        help=f"Archivo de la base SQLite (default: {SQLITE_PATH_DEFAULT})")
+    args = parser.parse_args()
+
+    connection = conectar_bd(backend=args.backend, sqlite_path=args.sqlite_path)
+    if not connection:
+        sys.exit(1)
+    try:
+        ok = mantener_actividad(connection, args.retencion_dias, args.dias_adelantados)
+    finally:
+        connection.close()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+# =====================================================
+# BACKENDS DE ALMACENAMIENTO - POKÉMON TEAM BUILDER
+# MySQL (servidor) o SQLite (embebido, sin servidor)
+# =====================================================
+
+import os
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+import pandas as pd
+
+SQLITE_PATH_DEFAULT = 'pokemon_team_builder.db'
+
+# --- ESQUEMA EQUIVALENTE PARA SQLITE ---
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS types (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS pokemon (
+    unique_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pokedex_number INTEGER NOT NULL,
+    name TEXT NOT NULL UNIQUE,
+    base_name TEXT NOT NULL,
+    form_type TEXT DEFAULT 'base' CHECK (form_type IN ('base', 'mega', 'primal', 'regional', 'special')),
+    type1_id INTEGER NOT NULL REFERENCES types(id),
+    type2_id INTEGER NULL REFERENCES types(id),
+    total_stats INTEGER NOT NULL,
+    hp INTEGER NOT NULL,
+    attack INTEGER NOT NULL,
+    defense INTEGER NOT NULL,
+    sp_attack INTEGER NOT NULL,
+    sp_defense INTEGER NOT NULL,
+    speed INTEGER NOT NULL,
+    generation INTEGER NOT NULL,
+    legendary INTEGER NOT NULL DEFAULT 0,
+    is_alternate INTEGER DEFAULT 0,
+    origin_region TEXT DEFAULT 'Kanto',
+    signature_id INTEGER NULL,
+    row_hash TEXT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pokedex ON pokemon (pokedex_number);
+CREATE INDEX IF NOT EXISTS idx_base_name ON pokemon (base_name);
+CREATE INDEX IF NOT EXISTS idx_form_type ON pokemon (form_type);
+CREATE INDEX IF NOT EXISTS idx_type1 ON pokemon (type1_id);
+CREATE INDEX IF NOT EXISTS idx_type2 ON pokemon (type2_id);
+CREATE INDEX IF NOT EXISTS idx_generation ON pokemon (generation);
+CREATE INDEX IF NOT EXISTS idx_legendary ON pokemon (legendary);
+CREATE INDEX IF NOT EXISTS idx_signature ON pokemon (signature_id);
+
+CREATE TABLE IF NOT EXISTS pokemon_types (
+    pokemon_unique_id INTEGER NOT NULL REFERENCES pokemon(unique_id) ON DELETE CASCADE,
+    slot INTEGER NOT NULL,
+    type_id INTEGER NOT NULL REFERENCES types(id),
+    total_stats INTEGER NOT NULL,
+    PRIMARY KEY (pokemon_unique_id, slot)
+);
+CREATE INDEX IF NOT EXISTS idx_type_stats ON pokemon_types (type_id, total_stats, pokemon_unique_id);
+
+CREATE TABLE IF NOT EXISTS pokemon_power_ranking (
+    unique_id INTEGER PRIMARY KEY REFERENCES pokemon(unique_id) ON DELETE CASCADE,
+    power_level REAL NOT NULL,
+    power_rank INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_power_rank ON pokemon_power_ranking (power_rank);
+
+CREATE TABLE IF NOT EXISTS type_effectiveness (
+    attacking_type_id INTEGER NOT NULL REFERENCES types(id),
+    defending_type_id INTEGER NOT NULL REFERENCES types(id),
+    effectiveness REAL NOT NULL,
+    PRIMARY KEY (attacking_type_id, defending_type_id)
+);
+CREATE INDEX IF NOT EXISTS idx_defending ON type_effectiveness (defending_type_id);
+
+CREATE TABLE IF NOT EXISTS type_signatures (
+    id INTEGER PRIMARY KEY,
+    type1_id INTEGER NOT NULL REFERENCES types(id),
+    type2_id INTEGER NULL REFERENCES types(id),
+    UNIQUE (type1_id, type2_id)
+);
+
+CREATE TABLE IF NOT EXISTS type_signature_profiles (
+    signature_id INTEGER NOT NULL REFERENCES type_signatures(id) ON DELETE CASCADE,
+    attacking_type_id INTEGER NOT NULL REFERENCES types(id),
+    multiplier REAL NOT NULL,
+    PRIMARY KEY (signature_id, attacking_type_id)
+);
+
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY,
+    version TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL CHECK (LENGTH(name) >= 3),
+    description TEXT,
+    allow_megas INTEGER DEFAULT 1,
+    allow_legendaries INTEGER DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_created ON teams (created_at);
+CREATE INDEX IF NOT EXISTS idx_name ON teams (name);
+
+CREATE TABLE IF NOT EXISTS team_members (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    pokemon_unique_id INTEGER NOT NULL REFERENCES pokemon(unique_id),
+    position INTEGER NOT NULL CHECK (position BETWEEN 1 AND 6),
+    nickname TEXT,
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (team_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_team ON team_members (team_id);
+CREATE INDEX IF NOT EXISTS idx_pokemon ON team_members (pokemon_unique_id);
+
+CREATE TABLE IF NOT EXISTS activity_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    action_type TEXT NOT NULL CHECK (action_type IN ('INSERT', 'UPDATE', 'DELETE')),
+    record_id INTEGER NOT NULL,
+    old_values TEXT,
+    new_values TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_table_action ON activity_log (table_name, action_type);
+CREATE INDEX IF NOT EXISTS idx_timestamp ON activity_log (timestamp);
+
+-- Sin particiones: actividad.py compacta las entradas vencidas en este resumen y las borra
+CREATE TABLE IF NOT EXISTS activity_log_daily (
+    day TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    entries INTEGER NOT NULL,
+    first_id INTEGER NOT NULL,
+    last_id INTEGER NOT NULL,
+    PRIMARY KEY (day, table_name, action_type)
+);
+"""
+
+# Vistas equivalentes (SQLite no tiene funciones ni procedimientos almacenados)
+OBJETOS_SQLITE = """
+-- Pokémon con los nombres de sus tipos (la tabla guarda los ids de `types`)
+DROP VIEW IF EXISTS vw_pokemon;
+CREATE VIEW vw_pokemon AS
+SELECT
+    p.unique_id, p.pokedex_number, p.name, p.base_name, p.form_type,
+    t1.name AS type1, t2.name AS type2, p.type1_id, p.type2_id,
+    p.total_stats, p.hp, p.attack, p.defense, p.sp_attack, p.sp_defense, p.speed,
+    p.generation, p.legendary, p.is_alternate, p.origin_region, p.signature_id
+FROM pokemon p
+JOIN types t1 ON t1.id = p.type1_id
+LEFT JOIN types t2 ON t2.id = p.type2_id;
+
+DROP VIEW IF EXISTS vw_mega_evolutions;
+CREATE VIEW vw_mega_evolutions AS
+SELECT
+    base.base_name,
+    base.name AS base_form,
+    base.total_stats AS base_stats,
+    mega.name AS mega_form,
+    mega.total_stats AS mega_stats,
+    (mega.total_stats - base.total_stats) AS power_increase,
+    ROUND(100.0 * (mega.total_stats - base.total_stats) / base.total_stats, 2) AS percentage_increase,
+    base.type1 AS base_type1,
+    base.type2 AS base_type2,
+    mega.type1 AS mega_type1,
+    mega.type2 AS mega_type2
+FROM vw_pokemon base
+JOIN vw_pokemon mega ON base.pokedex_number = mega.pokedex_number
+WHERE base.form_type = 'base' AND mega.form_type = 'mega'
+ORDER BY power_increase DESC;
+
+DROP VIEW IF EXISTS vw_fire_type_fighters;
+CREATE VIEW vw_fire_type_fighters AS
+SELECT
+    p.unique_id,
+    p.name,
+    p.form_type,
+    p.type1,
+    p.type2,
+    p.attack,
+    p.sp_attack,
+    p.total_stats,
+    p.generation,
+    p.legendary,
+    CASE
+        WHEN p.attack > p.sp_attack THEN 'Physical'
+        WHEN p.sp_attack > p.attack THEN 'Special'
+        ELSE 'Balanced'
+    END AS attack_style
+FROM vw_pokemon p
+JOIN types fuego ON fuego.name = 'Fire'
+WHERE (p.type1_id = fuego.id OR p.type2_id = fuego.id)
+AND (p.attack >= 80 OR p.sp_attack >= 80)
+ORDER BY MAX(p.attack, p.sp_attack) DESC;
+
+-- Lee el ranking materializado por el import (ranking_poder.py calcula los valores)
+DROP VIEW IF EXISTS vw_pokemon_power_ranking;
+CREATE VIEW vw_pokemon_power_ranking AS
+SELECT
+    p.unique_id, p.name, p.base_name, p.form_type, p.type1, p.type2,
+    p.total_stats, p.legendary, p.generation, r.power_level, r.power_rank
+FROM pokemon_power_ranking r
+JOIN vw_pokemon p ON p.unique_id = r.unique_id
+ORDER BY r.power_rank, r.unique_id;
+
+-- activity_log de team_members: lo escribe equipos.py por lotes, sin trigger por fila
+DROP TRIGGER IF EXISTS tr_team_activity_log;
+"""
+
+# Tablas de efectividad con los nombres de tipo, para construir MotorTipos
+SQL_EFECTIVIDAD = """
+    SELECT a.name AS attacking_type, d.name AS defending_type, e.effectiveness
+    FROM type_effectiveness e
+    JOIN types a ON a.id = e.attacking_type_id
+    JOIN types d ON d.id = e.defending_type_id
+"""
+SQL_PERFILES = """
+    SELECT p.signature_id, t.name AS attacking_type, p.multiplier
+    FROM type_signature_profiles p
+    JOIN types t ON t.id = p.attacking_type_id
+"""
+
+# Procedimientos almacenados de MySQL reescritos como consultas con parámetros
+PROCEDIMIENTOS_SQLITE = {
+    'sp_find_pokemon_by_type': """
+        SELECT
+            p.unique_id,
+            p.name,
+            p.form_type,
+            p.type1,
+            p.type2,
+            p.total_stats,
+            p.attack,
+            p.sp_attack,
+            p.legendary,
+            p.generation
+        FROM pokemon_types pt
+        JOIN vw_pokemon p ON p.unique_id = pt.pokemon_unique_id
+        WHERE pt.type_id = (SELECT id FROM types WHERE name = ?)
+        AND pt.total_stats >= ?
+        ORDER BY p.total_stats DESC, p.name
+    """,
+}
+_ARGUMENTOS_SQLITE = {
+    'sp_find_pokemon_by_type': lambda p_type, p_min_stats: (p_type, p_min_stats),
+}
+
+# Tablas en orden de borrado (las que tienen FOREIGN KEY primero)
+_TABLAS_SQLITE = [
+    'activity_log_daily', 'activity_log', 'team_members', 'teams', 'data_version', 'type_signature_profiles',
+    'type_signatures', 'type_effectiveness', 'pokemon_power_ranking', 'pokemon_types', 'pokemon', 'types'
+]
+
+
+@lru_cache(maxsize=512)
+def traducir_sql(query):
+    """Adaptar las sentencias de import_mejorado.py (dialecto MySQL) a SQLite.
+
+    Las mismas sentencias se repiten por fila (INSERT de equipos, lotes): la traducción se guarda.
+    """
+    query = query.replace('%s', '?')
+    query = re.sub(r'\bINSERT IGNORE\b', 'INSERT OR IGNORE', query)
+    query = re.sub(r'\bON DUPLICATE KEY UPDATE\b', 'ON CONFLICT DO UPDATE SET', query)
+    return re.sub(r'\bVALUES\((\w+)\)', r'excluded.\1', query)
+
+
+class _CursorSQLite:
+    """Cursor con la interfaz de mysql.connector (placeholders %s) sobre sqlite3"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        self._cursor.execute(traducir_sql(query), params or ())
+
+    def executemany(self, query, seq_params):
+        self._cursor.executemany(traducir_sql(query), seq_params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class ConexionSQLite:
+    """Conexión SQLite con la interfaz mínima que usa import_mejorado.py"""
+
+    dialecto = 'sqlite'
+
+    def __init__(self, path=SQLITE_PATH_DEFAULT):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+
+    def cursor(self, dictionary=False):
+        cursor = self._conn.cursor()
+        if dictionary:
+            cursor.row_factory = sqlite3.Row
+        return _CursorSQLite(cursor)
+
+    def executescript(self, script):
+        self._conn.executescript(script)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        try:
+            self._conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self._conn.close()
+
+    @property
+    def raw(self):
+        """Conexión sqlite3 subyacente (para pandas.read_sql)"""
+        return self._conn
+
+
+def es_sqlite(connection):
+    """True si la conexión es del backend embebido"""
+    return getattr(connection, 'dialecto', 'mysql') == 'sqlite'
+
+
+def crear_esquema_sqlite(connection, reiniciar=True):
+    """Crear tablas y vistas en SQLite (reiniciar=True borra lo existente)"""
+    if reiniciar:
+        connection.executescript(
+            "DROP VIEW IF EXISTS vw_mega_evolutions;"
+            "DROP VIEW IF EXISTS vw_fire_type_fighters;"
+            "DROP VIEW IF EXISTS vw_pokemon_power_ranking;"
+            "DROP VIEW IF EXISTS vw_pokemon;"
+            + ''.join(f"DROP TABLE IF EXISTS {tabla};" for tabla in _TABLAS_SQLITE)
+        )
+    connection.executescript(ESQUEMA_SQLITE)
+
+
+class BackendMySQL:
+    """Backend MySQL: consultas y procedimientos a través del pool de conexiones"""
+
+    nombre = 'mysql'
+
+    def __init__(self, config, pool_size=5):
+        from acceso_bd import PoolConexiones  # Solo se necesita mysql-connector con este backend
+        self.pool = PoolConexiones(config, pool_size=pool_size)
+
+    def consultar(self, query, params=None):
+        """Ejecutar un SELECT y devolver un DataFrame"""
+        return self.pool.ejecutar(lambda conn: pd.read_sql(query, conn, params=params))
+
+    def llamar_procedimiento(self, nombre, args):
+        """CALL de un procedimiento almacenado con parámetros enlazados"""
+        def ejecutar(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.callproc(nombre, tuple(args))
+                for resultado in cursor.stored_results():
+                    return pd.DataFrame(resultado.fetchall(), columns=resultado.column_names)
+                return pd.DataFrame()
+            finally:
+                cursor.close()
+        return self.pool.ejecutar(ejecutar)
+
+    def ejecutar(self, funcion):
+        """Ejecutar funcion(conn) con una conexión del pool; funcion hace su propio commit y no se reintenta"""
+        return self.pool.ejecutar(funcion, reintentar=False)
+
+    def metricas(self):
+        return self.pool.metricas()
+
+
+class BackendSQLite:
+    """Backend embebido: un archivo SQLite y un pool acotado de conexiones de solo lectura"""
+
+    nombre = 'sqlite'
+
+    def __init__(self, path=SQLITE_PATH_DEFAULT, pool_size=5):
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"No existe {path}: ejecuta 'python import_mejorado.py --backend sqlite' primero"
+            )
+        self.path = path
+        self.pool_size = pool_size
+        # Una conexión por hilo quedaría abierta con cada hilo de sesión que muere:
+        # las conexiones se comparten y como mucho hay pool_size abiertas
+        self._libres = queue.LifoQueue()
+        self._disponibles = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._conexiones = 0
+        self._consultas = 0
+
+    @contextmanager
+    def _conexion(self):
+        """Tomar una conexión de solo lectura del pool (o abrirla) y devolverla al terminar"""
+        self._disponibles.acquire()
+        try:
+            try:
+                conn = self._libres.get_nowait()
+            except queue.Empty:
+                conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+                with self._lock:
+                    self._conexiones += 1
+            try:
+                yield conn
+            finally:
+                self._libres.put(conn)
+        finally:
+            self._disponibles.release()
+
+    def consultar(self, query, params=None):
+        """Ejecutar un SELECT y devolver un DataFrame"""
+        with self._lock:
+            self._consultas += 1
+        with self._conexion() as conn:
+            return pd.read_sql(traducir_sql(query), conn, params=params)
+
+    def llamar_procedimiento(self, nombre, args):
+        """Equivalente en SQL de un procedimiento almacenado de MySQL"""
+        if nombre not in PROCEDIMIENTOS_SQLITE:
+            raise ValueError(f"Procedimiento no disponible en SQLite: {nombre}")
+        params = _ARGUMENTOS_SQLITE[nombre](*args)
+        return self.consultar(PROCEDIMIENTOS_SQLITE[nombre], params)
+
+    def ejecutar(self, funcion):
+        """Ejecutar funcion(conn) con una conexión propia que permite escribir (las de consulta son de solo lectura)"""
+        connection = ConexionSQLite(self.path)
+        try:
+            return funcion(connection)
+        finally:
+            connection.close()
+
+    def metricas(self):
+        with self._lock:
+            return {'conexiones': self._conexiones, 'consultas': self._consultas}
+
+    def cerrar(self):
+        """Cerrar las conexiones libres del pool"""
+        while True:
+            try:
+                self._libres.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def crear_backend(nombre, config=None, pool_size=5, sqlite_path=SQLITE_PATH_DEFAULT):
+    """Crear el backend configurado ('mysql' o 'sqlite')"""
+    if nombre == 'sqlite':
+        return BackendSQLite(sqlite_path, pool_size=pool_size)
+    if nombre == 'mysql':
+        return BackendMySQL(config, pool_size=pool_size)
+    raise ValueError(f"Backend desconocido: {nombre}")
@@ -1,11 +1,21 @@
 # Archivo: app.py (Versión 100% COMPLETA Y FUNCIONAL - CORREGIDA)
 
+import os
+import time
 import streamlit as st
 import pandas as pd
-import mysql.connector
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from motor_tipos import MotorTipos, TIPOS
+from busqueda_equipos import suggest_team
+from almacenamiento import crear_backend, SQLITE_PATH_DEFAULT, SQL_EFECTIVIDAD, SQL_PERFILES
+from cache_consultas import CacheConsultas
+from metricas_consultas import MetricasConsultas, bytes_resultado, etiqueta_consulta
+from roster_columnar import RosterColumnar
+from matriz_enfrentamientos import MATRIZ_DIR_DEFAULT, MatrizEnfrentamientos
+from equipos import SQL_LISTAR_EQUIPOS, cargar_equipo, guardar_equipo
+from actividad import SQL_ACTIVIDAD_RECIENTE
 
 # --- CONFIGURACIÓN DE LA BASE DE DATOS ---
 # ¡¡¡RECUERDA CAMBIAR ESTO POR TU CONTRASEÑA!!!
@@ -15,37 +25,119 @@ DB_CONFIG = {
     'password': '2076O8233e*', 
     'database': 'pokemon_team_builder'
 }
+DB_POOL_SIZE = 5  # Conexiones compartidas entre todas las sesiones
+# 'mysql' o 'sqlite' (embebido, sin servidor: python import_mejorado.py --backend sqlite)
+DB_BACKEND = os.environ.get('POKEMON_DB_BACKEND', 'mysql')
+SQLITE_PATH = os.environ.get('POKEMON_SQLITE_PATH', SQLITE_PATH_DEFAULT)
+QUERY_CACHE_SIZE = 256  # Resultados guardados como máximo (LRU)
+QUERY_CACHE_TTL = 600  # Segundos antes de volver a consultar un resultado
+QUERY_METRICS_SAMPLES = 2000  # Muestras guardadas por etiqueta para los percentiles
+QUERY_METRICS_LOG = os.environ.get('POKEMON_QUERY_LOG')  # JSONL opcional para monitoreo
+# Matriz de enfrentamientos todos contra todos, un archivo .npy por versión de datos
+MATCHUP_DIR = os.environ.get('POKEMON_MATCHUP_DIR', MATRIZ_DIR_DEFAULT)
+MULTISELECT_MAX_OPTIONS = 2000  # Rosters más grandes se eligen a través del buscador
+SEARCH_RESULTS = 50  # Resultados del buscador de nombres que se ofrecen en el multiselect
+SAVED_TEAMS_LIST = 50  # Equipos guardados que se ofrecen para cargar (los más recientes)
+RECENT_ACTIVITY = 20  # Entradas de activity_log en la barra lateral (lectura acotada)
+# Panel de rendimiento oculto: se muestra con ?perf=1 en la URL o POKEMON_PERF_PANEL=1
+PERF_PANEL = os.environ.get('POKEMON_PERF_PANEL') == '1'
 
 # --- Funciones para acceder a la BD (con caché para velocidad) ---
 @st.cache_resource
-def get_connection():
-    """Establece conexión con la base de datos."""
-    return mysql.connector.connect(**DB_CONFIG)
+def get_backend():
+    """Crea el backend de datos (pool MySQL o SQLite) compartido por todas las sesiones."""
+    return crear_backend(DB_BACKEND, config=DB_CONFIG, pool_size=DB_POOL_SIZE, sqlite_path=SQLITE_PATH)
 
-@st.cache_data
-def run_query(query, params=None):
-    """Ejecuta una consulta SQL y devuelve los resultados como un DataFrame."""
+@st.cache_resource
+def get_query_cache():
+    """Crea la caché de resultados compartida por todas las sesiones."""
+    return CacheConsultas(max_entradas=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+
+@st.cache_resource
+def get_query_metrics():
+    """Crea el registro de métricas por consulta compartido por todas las sesiones."""
+    return MetricasConsultas(max_muestras=QUERY_METRICS_SAMPLES, archivo_jsonl=QUERY_METRICS_LOG)
+
+def _read_data_version():
+    """Lee la versión de datos que escribe import_mejorado.py al terminar."""
+    inicio = time.perf_counter()
+    try:
+        df = get_backend().consultar("SELECT version FROM data_version WHERE id = 1")
+    except Exception:
+        get_query_metrics().registrar('data_version', time.perf_counter() - inicio, error=True)
+        return None
+    get_query_metrics().registrar('data_version', time.perf_counter() - inicio, len(df), bytes_resultado(df))
+    return None if df.empty else df['version'].iloc[0]
+
+def get_data_version():
+    """Versión actual de los datos; si cambia, la caché se invalida sola."""
+    return get_query_cache().version_actual(_read_data_version)
+
+def run_query(query, params=None, label=None, use_cache=True):
+    """Ejecuta una consulta SQL y devuelve los resultados como un DataFrame.
+
+    Cada ejecución se registra con su etiqueta (tiempo, filas, bytes y hit/miss de caché).
+    Con use_cache=False el resultado no se guarda en la caché de resultados.
+    """
+    cache = get_query_cache()
+    get_data_version()  # Si hubo un import nuevo, la caché se vacía aquí
+    clave = (query, tuple(params) if params is not None else None)
+    label = label or etiqueta_consulta(query)
+    inicio = time.perf_counter()
     try:
-        conn = get_connection()
-        df = pd.read_sql(query, conn, params=params)
-        return df
+        if use_cache:
+            df, hit = cache.obtener_con_estado(clave, lambda: get_backend().consultar(query, params))
+        else:
+            df, hit = get_backend().consultar(query, params), None
     except Exception as e:
+        get_query_metrics().registrar(label, time.perf_counter() - inicio, error=True)
         st.error(f"Error en la consulta a la base de datos: {e}")
         return pd.DataFrame()
-
-def call_stored_procedure(query):
-    """Función para llamar procedimientos almacenados"""
+    # En un hit no se transfiere nada desde la base de datos
+    get_query_metrics().registrar(label, time.perf_counter() - inicio, len(df),
+                                  0 if hit else bytes_resultado(df), cache_hit=hit)
+    return df
+
+@st.cache_resource(max_entries=1)
+def get_type_engine(data_version):
+    """Carga type_effectiveness y los perfiles por firma de tipo una vez por versión de datos."""
+    df_efectividad = run_query(SQL_EFECTIVIDAD, label='type_effectiveness')
+    if df_efectividad.empty:
+        return None
+    df_perfiles = run_query(SQL_PERFILES, label='type_signature_profiles')
+    return MotorTipos.desde_dataframe(df_efectividad, df_perfiles)
+
+@st.cache_resource(max_entries=1)
+def get_roster(data_version):
+    """Roster columnar de solo lectura, uno por versión de datos y compartido por todas las sesiones.
+
+    El DataFrame de la consulta se descarta tras construirlo (no pasa por la caché de resultados).
+    """
+    df = run_query("SELECT * FROM vw_pokemon ORDER BY pokedex_number, unique_id", label='roster', use_cache=False)
+    return RosterColumnar(df) if not df.empty else None
+
+@st.cache_resource(max_entries=1)
+def get_matchups(data_version):
+    """Matriz de enfrentamientos mapeada en memoria: se calcula una vez por versión de datos
+    y los demás procesos solo abren el archivo."""
+    roster = get_roster(data_version)
+    type_engine = get_type_engine(data_version)
+    if roster is None or type_engine is None:
+        return None
+    return MatrizEnfrentamientos.obtener(type_engine, roster.unique_id, roster.signature_id,
+                                         data_version, directorio=MATCHUP_DIR)
+
+def call_stored_procedure(name, args):
+    """Función para llamar procedimientos almacenados (con parámetros enlazados)"""
+    inicio = time.perf_counter()
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(query)
-        result = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return pd.DataFrame(result)
+        df = get_backend().llamar_procedimiento(name, args)
     except Exception as e:
+        get_query_metrics().registrar(name, time.perf_counter() - inicio, error=True)
         st.error(f"Error ejecutando procedimiento: {e}")
         return pd.DataFrame()
+    get_query_metrics().registrar(name, time.perf_counter() - inicio, len(df), bytes_resultado(df))
+    return df
 
 # --- INICIO DE LA APP ---
 st.set_page_config(layout="wide", page_title="Pokémon Team Builder")
@@ -59,137 +151,279 @@ except:
 
 st.markdown("Una aplicación que aprovecha una base de datos relacional para analizar las formas alternativas y debilidades de equipos Pokémon.")
 
-# Cargar todos los datos una vez
-df_pokemon = run_query("SELECT * FROM pokemon ORDER BY pokedex_number, unique_id")
+# Cargar todos los datos una vez por versión de datos (el mismo objeto para todas las sesiones)
+roster = get_roster(get_data_version())
 
-if df_pokemon.empty:
+if roster is None:
     st.error("⚠️ No se pudieron cargar los datos de la base. Verifica la conexión.")
     st.stop()
 
+# --- EQUIPOS GUARDADOS (teams + team_members) ---
+def run_db_operation(label, operation):
+    """Ejecuta operation(conn) con una conexión que permite escribir y registra su métrica."""
+    inicio = time.perf_counter()
+    try:
+        resultado = get_backend().ejecutar(operation)
+    except Exception as e:
+        get_query_metrics().registrar(label, time.perf_counter() - inicio, error=True)
+        st.error(f"Error en la base de datos: {e}")
+        return None
+    get_query_metrics().registrar(label, time.perf_counter() - inicio,
+                                  len(resultado) if isinstance(resultado, pd.DataFrame) else 1)
+    return resultado
+
+def load_saved_team(roster, team_id):
+    """Callback de 'Cargar': reemplaza la selección antes de que se dibuje el multiselect."""
+    team = run_db_operation('team_load', lambda conn: cargar_equipo(conn, team_id))
+    if team is not None:
+        st.session_state['team_selection'] = [roster.name[f] for f in roster.filas_por_id(team['miembros'])]
+        # Una clave nueva crea otro multiselect, que arranca con el equipo cargado como default
+        st.session_state['team_loads'] = st.session_state.get('team_loads', 0) + 1
+
+def saved_teams_section(roster, team_pokemon_names):
+    """Guardar el equipo seleccionado y cargar uno guardado."""
+    with st.expander("💾 Equipos Guardados"):
+        col_name, col_save = st.columns([3, 1])
+        team_name = col_name.text_input("Nombre del equipo:", max_chars=100)
+        if col_save.button("💾 Guardar equipo", disabled=not team_pokemon_names or len(team_name.strip()) < 3):
+            pokemon_ids = roster.unique_id[roster.filas(team_pokemon_names)].tolist()
+            team_id = run_db_operation('team_save', lambda conn: guardar_equipo(conn, team_name.strip(), pokemon_ids))
+            if team_id is not None:
+                st.success(f"✅ Equipo '{team_name.strip()}' guardado (id {team_id}).")
+
+        # Lectura por el pool de consultas (sin caché: cambia con cada guardado), no por una conexión de escritura
+        df_teams = run_query(SQL_LISTAR_EQUIPOS, (SAVED_TEAMS_LIST,), label='team_list', use_cache=False)
+        if df_teams.empty:
+            st.info("Todavía no hay equipos guardados.")
+            return
+        labels = {row.id: f"{row.name} ({row.members} Pokémon)" for row in df_teams.itertuples(index=False)}
+        col_team, col_load = st.columns([3, 1])
+        team_id = col_team.selectbox("Equipos recientes:", list(labels), format_func=labels.get)
+        col_load.button("📂 Cargar", on_click=load_saved_team, args=(roster, team_id))
+
 # --- SECCIÓN 1: CONSTRUCTOR Y ANÁLISIS DE EQUIPO ---
-st.header("⚔️ Construye y Analiza tu Equipo")
-
-team_pokemon_names = st.multiselect(
-    "Elige hasta 6 Pokémon para formar tu equipo:",
-    options=df_pokemon['name'].tolist(),
-    max_selections=6
-)
-
-# --- SECCIÓN 2: ANÁLISIS DE EQUIPO (con Matriz de Vulnerabilidad) ---
-if len(team_pokemon_names) > 0:
-    team_df = df_pokemon[df_pokemon['name'].isin(team_pokemon_names)]
-    st.subheader("Tu Equipo Seleccionado")
-    cols_to_show = ['pokedex_number', 'name', 'form_type', 'type1', 'type2', 'total_stats', 'hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed', 'generation', 'legendary']
-    st.dataframe(team_df[cols_to_show])
-
-    # --- CONSULTA SQL AVANZADA PARA LA MATRIZ DE VULNERABILIDAD ---
-    st.subheader("📊 Análisis de Vulnerabilidad del Equipo")
-    
-    team_ids = team_df['unique_id'].tolist()
-    placeholders = ','.join(['%s'] * len(team_ids))
-    
-    # CONSULTA CORREGIDA - Mejor lógica para calcular vulnerabilidades
-    score_query = f"""
-        SELECT
-            te.attacking_type,
-            SUM(
-                CASE
-                    WHEN te.effectiveness = 2.0 THEN 1
-                    WHEN te.effectiveness = 0.5 THEN -1
-                    WHEN te.effectiveness = 0.0 THEN -2
-                    ELSE 0
-                END
-            ) AS team_score,
-            COUNT(DISTINCT p.unique_id) AS pokemon_affected
-        FROM
-            pokemon p
-        JOIN
-            type_effectiveness te ON (p.type1 = te.defending_type OR p.type2 = te.defending_type)
-        WHERE
-            p.unique_id IN ({placeholders})
-        GROUP BY
-            te.attacking_type
-        ORDER BY
-            team_score DESC;
-    """
+@st.fragment
+def team_builder_section(roster):
+    """Constructor y análisis del equipo: al cambiar la selección solo se re-ejecuta este fragmento."""
+    st.header("⚔️ Construye y Analiza tu Equipo")
+
+    # Con rosters grandes el multiselect solo recibe la selección actual y los resultados del índice de nombres
+    selected = st.session_state.get('team_selection', [])
+    search = st.text_input("🔎 Buscar Pokémon (nombre o especie; tolera errores de tipeo):")
+    if search:
+        candidates = roster.busqueda.buscar(search, limite=SEARCH_RESULTS)
+    elif len(roster) <= MULTISELECT_MAX_OPTIONS:
+        candidates = roster.nombres
+    else:
+        candidates = roster.nombres[:SEARCH_RESULTS]
+    team_pokemon_names = st.multiselect(
+        "Elige hasta 6 Pokémon para formar tu equipo:",
+        options=selected + [nombre for nombre in candidates if nombre not in selected],
+        default=selected,
+        max_selections=6,
+        key=f"team_multiselect_{st.session_state.get('team_loads', 0)}"
+    )
+    st.session_state['team_selection'] = team_pokemon_names
+    saved_teams_section(roster, team_pokemon_names)
+
+    # --- SECCIÓN 2: ANÁLISIS DE EQUIPO (con Matriz de Vulnerabilidad) ---
+    if len(team_pokemon_names) > 0:
+        team_rows = roster.filas(team_pokemon_names)
+        team_df = roster.dataframe(team_rows)
+        st.subheader("Tu Equipo Seleccionado")
+        cols_to_show = ['pokedex_number', 'name', 'form_type', 'type1', 'type2', 'total_stats', 'hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed', 'generation', 'legendary']
+        st.dataframe(team_df[cols_to_show])
+
+        # --- MATRIZ DE VULNERABILIDAD (MOTOR DE TIPOS EN MEMORIA) ---
+        st.subheader("📊 Análisis de Vulnerabilidad del Equipo")
     
-    df_scores = run_query(score_query, team_ids)
-
-    if not df_scores.empty:
-        col1, col2 = st.columns([1, 1.5]) 
-
-        with col1:
-            st.write("**Matriz de Vulnerabilidad:**")
-            st.caption("Score > 0 = Debilidad, Score < 0 = Resistencia")
+        # Cada Pokémon apunta a su firma de tipo: el análisis es una búsqueda del perfil
+        # precalculado más una suma, sin consultar MySQL. Los tipos dobles multiplican (x4, x0.25).
+        inicio = time.perf_counter()
+        type_engine = get_type_engine(get_data_version())
+        df_scores = type_engine.analizar_equipo(team_df) if type_engine else pd.DataFrame()
+        get_query_metrics().registrar('vulnerability', time.perf_counter() - inicio, len(df_scores),
+                                      bytes_resultado(df_scores), error=type_engine is None)
+
+        if not df_scores.empty:
+            col1, col2 = st.columns([1, 1.5]) 
+
+            with col1:
+                st.write("**Matriz de Vulnerabilidad:**")
+                st.caption("Score > 0 = Debilidad, Score < 0 = Resistencia")
             
-            # Crear tabla estilizada
-            df_display = df_scores.copy()
-            df_display['Estado'] = df_display['team_score'].apply(
-                lambda x: '🔴 Débil' if x > 0 else '🟢 Resistente' if x < 0 else '⚪ Neutral'
-            )
+                # Crear tabla estilizada
+                df_display = df_scores.copy()
+                df_display['Estado'] = df_display['team_score'].apply(
+                    lambda x: '🔴 Débil' if x > 0 else '🟢 Resistente' if x < 0 else '⚪ Neutral'
+                )
             
-            st.dataframe(
-                df_display[['attacking_type', 'team_score', 'pokemon_affected', 'Estado']]
-                .rename(columns={
-                    'attacking_type': 'Tipo Atacante',
-                    'team_score': 'Score',
-                    'pokemon_affected': 'Pokémon Afectados',
-                    'Estado': 'Estado'
-                }),
-                use_container_width=True
-            )
+                st.dataframe(
+                    df_display[['attacking_type', 'team_score', 'pokemon_affected', 'Estado']]
+                    .rename(columns={
+                        'attacking_type': 'Tipo Atacante',
+                        'team_score': 'Score',
+                        'pokemon_affected': 'Pokémon Afectados',
+                        'Estado': 'Estado'
+                    }),
+                    use_container_width=True
+                )
 
-        with col2:
-            st.write("**Gráfico de Vulnerabilidades:**")
+            with col2:
+                st.write("**Gráfico de Vulnerabilidades:**")
             
-            # Crear colores según el score
-            colors = ['crimson' if x > 0 else 'mediumseagreen' if x < 0 else 'gray' 
-                     for x in df_scores['team_score']]
+                # Crear colores según el score
+                colors = ['crimson' if x > 0 else 'mediumseagreen' if x < 0 else 'gray' 
+                         for x in df_scores['team_score']]
             
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=df_scores['attacking_type'],
-                    y=df_scores['team_score'],
-                    marker_color=colors,
-                    text=df_scores['team_score'],
-                    textposition='outside'
-                )
-            ])
+                fig = go.Figure(data=[
+                    go.Bar(
+                        x=df_scores['attacking_type'],
+                        y=df_scores['team_score'],
+                        marker_color=colors,
+                        text=df_scores['team_score'],
+                        textposition='outside'
+                    )
+                ])
             
-            fig.update_layout(
-                title='Vulnerabilidades del Equipo por Tipo',
-                xaxis_title='Tipo de Ataque',
-                yaxis_title='Score de Vulnerabilidad',
-                xaxis_tickangle=-45,
-                showlegend=False
-            )
+                fig.update_layout(
+                    title='Vulnerabilidades del Equipo por Tipo',
+                    xaxis_title='Tipo de Ataque',
+                    yaxis_title='Score de Vulnerabilidad',
+                    xaxis_tickangle=-45,
+                    showlegend=False
+                )
             
-            # Agregar línea de referencia en 0
-            fig.add_hline(y=0, line_dash="dash", line_color="black", opacity=0.5)
+                # Agregar línea de referencia en 0
+                fig.add_hline(y=0, line_dash="dash", line_color="black", opacity=0.5)
             
-            st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True)
             
+        else:
+            st.error("No se pudo calcular el análisis de vulnerabilidad.")
+
+        # --- COBERTURA OFENSIVA (TIPOS STAB CONTRA LAS 171 FIRMAS) ---
+        if type_engine is not None:
+            st.subheader("🎯 Cobertura Ofensiva del Equipo")
+            st.caption("Mejor multiplicador que el equipo logra con sus tipos STAB contra cada combinación de tipos, "
+                       "ponderado por cuántos Pokémon del roster la tienen.")
+            inicio = time.perf_counter()
+            df_coverage = type_engine.analizar_cobertura(roster.tipos_stab(team_rows), roster.frecuencia_firmas)
+            get_query_metrics().registrar('coverage', time.perf_counter() - inicio, len(df_coverage),
+                                          bytes_resultado(df_coverage))
+
+            uncovered = df_coverage[~df_coverage['covered']]
+            col_cov, col_unc = st.columns(2)
+            col_cov.metric("Roster golpeado x2 o más", f"{df_coverage.loc[df_coverage['covered'], 'roster_share'].sum():.0%}")
+            col_unc.metric("Combinaciones sin cubrir", f"{len(uncovered)} / {len(df_coverage)}")
+            if not uncovered.empty:
+                st.write("**Combinaciones sin cubrir más frecuentes en el roster:**")
+                st.dataframe(
+                    uncovered.head(15)[['defending_types', 'best_multiplier', 'roster_share']]
+                    .rename(columns={
+                        'defending_types': 'Tipos Defensores',
+                        'best_multiplier': 'Mejor Multiplicador',
+                        'roster_share': '% del Roster'
+                    })
+                    .style.format({'% del Roster': '{:.1%}', 'Mejor Multiplicador': 'x{:g}'}),
+                    use_container_width=True
+                )
+
     else:
-        st.error("No se pudo calcular el análisis de vulnerabilidad.")
+        st.info("Selecciona al menos un Pokémon para analizar tu equipo.")
 
-else:
-    st.info("Selecciona al menos un Pokémon para analizar tu equipo.")
+team_builder_section(roster)
+
+# --- SUGERENCIA DE EQUIPO ÓPTIMO ---
+@st.fragment
+def team_suggestion_section(roster):
+    """Búsqueda del equipo con menor vulnerabilidad, aislada del resto de la página."""
+    with st.expander("💡 Sugerir el Equipo con Menor Vulnerabilidad"):
+        st.write("Busca entre todo el roster los equipos de 6 con menos debilidades sin cubrir (desempate: más stats totales).")
+    
+        col_megas, col_legend, col_min = st.columns(3)
+        allow_megas = col_megas.checkbox("Permitir Megas", value=True)
+        allow_legendaries = col_legend.checkbox("Permitir Legendarios", value=True)
+        min_member_stats = col_min.slider("Stats mínimos por miembro:", 0, 700, 0, step=50)
+    
+        if st.button("🧠 Buscar equipos"):
+            type_engine = get_type_engine(get_data_version())
+            if type_engine is None:
+                st.error("No se pudo cargar la tabla de efectividad de tipos.")
+            else:
+                equipos, completo = suggest_team(
+                    roster.dataframe(), type_engine,
+                    min_total_stats=min_member_stats,
+                    allow_megas=allow_megas,
+                    allow_legendaries=allow_legendaries
+                )
+                if not completo:
+                    st.warning("Se agotó el tiempo de búsqueda: se muestran los mejores equipos encontrados.")
+                if not equipos:
+                    st.info("Ningún Pokémon cumple esas restricciones.")
+                for posicion, equipo in enumerate(equipos, start=1):
+                    debilidades = [tipo for tipo, score in zip(TIPOS, equipo['team_score']) if score > 0]
+                    st.write(f"**#{posicion}** · Vulnerabilidad: {equipo['vulnerability']:.0f} · "
+                             f"Stats totales: {equipo['total_stats']} · "
+                             f"Débil a: {', '.join(debilidades) if debilidades else 'ninguno'}")
+                    st.dataframe(equipo['pokemon'][['name', 'form_type', 'type1', 'type2', 'total_stats', 'legendary']],
+                                 use_container_width=True)
+
+team_suggestion_section(roster)
+
+# --- COUNTERS POR TIPO (MATRIZ DE ENFRENTAMIENTOS) ---
+@st.fragment
+def counters_section(roster):
+    """Mejores counters de un Pokémon leyendo una sola fila de la matriz de enfrentamientos."""
+    with st.expander("🥊 Counters por Tipo"):
+        st.write("Pokémon del roster que más daño STAB le hacen al elegido y menos reciben de él (desempate: más stats).")
+        search = st.text_input("Buscar Pokémon:", key='counters_search')
+        options = roster.busqueda.buscar(search, limite=SEARCH_RESULTS) if search else roster.nombres[:SEARCH_RESULTS]
+        # Sin selección por defecto: la matriz (hasta n² bytes) solo se construye al elegir un Pokémon
+        target = st.selectbox("Pokémon a contrarrestar:", options, index=None, placeholder="Elige un Pokémon")
+        if not target:
+            return
+
+        data_version = get_data_version()
+        inicio = time.perf_counter()
+        matchups = get_matchups(data_version)
+        if matchups is None:
+            st.error("No se pudo cargar la tabla de efectividad de tipos.")
+            return
+        row = roster.fila_por_nombre[target]
+        counters = matchups.counters(row, n=10, desempate=roster.stats['total_stats'])
+        dealt, received = matchups.enfrentamientos(row)
+        get_query_metrics().registrar('counters', time.perf_counter() - inicio, len(counters))
+
+        df_counters = roster.dataframe(counters)[['name', 'type1', 'type2', 'total_stats']]
+        df_counters['Le hace'] = [f"x{m:g}" for m in received[counters]]
+        df_counters['Recibe'] = [f"x{m:g}" for m in dealt[counters]]
+        st.dataframe(df_counters, use_container_width=True)
+        st.caption(f"{target} golpea x2 o más a {(dealt >= 2).sum():,} y recibe x2 o más de {(received >= 2).sum():,} "
+                   f"de {len(roster):,} Pokémon.")
+
+counters_section(roster)
 
 # --- SECCIÓN 3: DASHBOARD Y ANÁLISIS GENERAL ---
-with st.expander("📊 Ver Dashboard y Análisis Avanzado"):
+@st.fragment
+def dashboard_section(roster):
+    """Dashboard general: sus consultas y gráficos solo se calculan si está abierto."""
+    if not st.toggle("📊 Ver Dashboard y Análisis Avanzado"):
+        return
+
     st.header("📊 Dashboard General")
     
     # Métricas principales
+    conteos = roster.resumen()
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total de Entradas", f"{len(df_pokemon)}")
+        st.metric("Total de Entradas", f"{conteos['entradas']}")
     with col2:
-        st.metric("Pokémon Base", f"{df_pokemon['pokedex_number'].nunique()}")
+        st.metric("Pokémon Base", f"{conteos['especies']}")
     with col3:
-        st.metric("Formas Alternativas", f"{len(df_pokemon[df_pokemon['form_type'] != 'base'])}")
+        st.metric("Formas Alternativas", f"{conteos['formas_alternativas']}")
     with col4:
-        legendarios = len(df_pokemon[df_pokemon['legendary'] == True])
-        st.metric("Pokémon Legendarios", f"{legendarios}")
+        st.metric("Pokémon Legendarios", f"{conteos['legendarios']}")
     
     # --- GRÁFICO 1: INCREMENTO DE PODER POR MEGA EVOLUCIÓN ---
     st.subheader("🚀 Incremento de Poder por Mega Evolución")
@@ -199,14 +433,14 @@ with st.expander("📊 Ver Dashboard y Análisis Avanzado"):
             base.total_stats as stats_base,
             mega.total_stats as stats_mega,
             (mega.total_stats - base.total_stats) as incremento,
-            ROUND(((mega.total_stats - base.total_stats) / base.total_stats * 100), 2) as porcentaje_incremento
+            ROUND(100.0 * (mega.total_stats - base.total_stats) / base.total_stats, 2) as porcentaje_incremento
         FROM pokemon base
         JOIN pokemon mega ON base.pokedex_number = mega.pokedex_number
         WHERE base.form_type = 'base' AND mega.form_type = 'mega'
         ORDER BY incremento DESC 
         LIMIT 15;
     """
-    df_mega_boost = run_query(mega_boost_query)
+    df_mega_boost = run_query(mega_boost_query, label='mega_boost')
 
     if not df_mega_boost.empty:
         fig_mega = px.bar(
@@ -232,7 +466,7 @@ with st.expander("📊 Ver Dashboard y Análisis Avanzado"):
     # Añadimos LIMIT 10 para cumplir tu requisito de mostrar los 10 principales.
     forms_view_query = "SELECT * FROM vw_pokemon_with_most_forms LIMIT 10;"
 
-    df_forms = run_query(forms_view_query)
+    df_forms = run_query(forms_view_query, label='forms_view')
 
     if not df_forms.empty:
         st.write("Este gráfico se genera consultando la VISTA `vw_pokemon_with_most_forms` en la base de datos.")
@@ -260,7 +494,7 @@ with st.expander("📊 Ver Dashboard y Análisis Avanzado"):
         GROUP BY generation, form_type
         ORDER BY generation, form_type;
     """
-    df_generations = run_query(generation_query)
+    df_generations = run_query(generation_query, label='generations')
     
     if not df_generations.empty:
         fig_gen = px.bar(
@@ -273,36 +507,45 @@ with st.expander("📊 Ver Dashboard y Análisis Avanzado"):
         )
         st.plotly_chart(fig_gen, use_container_width=True)
 
+dashboard_section(roster)
+
 # --- SECCIÓN 4: DEMOSTRACIÓN DE OBJETOS SQL AVANZADOS ---
-st.header("⚙️ Demostración de Objetos SQL Avanzados")
+@st.fragment
+def stored_procedure_section(roster):
+    """Búsqueda con el procedimiento almacenado sp_find_pokemon_by_type."""
+    st.header("⚙️ Demostración de Objetos SQL Avanzados")
 
-# --- PROCEDIMIENTOS ALMACENADOS ---
-st.subheader("🔧 Búsqueda con Procedimiento Almacenado")
-st.write("Esta función llama directamente al procedimiento `sp_find_pokemon_by_type` en MySQL.")
+    # --- PROCEDIMIENTOS ALMACENADOS ---
+    st.subheader("🔧 Búsqueda con Procedimiento Almacenado")
+    st.write("Esta función llama directamente al procedimiento `sp_find_pokemon_by_type` en MySQL (o a su equivalente en SQLite).")
 
-col_type, col_stats = st.columns(2)
-all_types = sorted(pd.concat([df_pokemon['type1'], df_pokemon['type2']]).dropna().unique())
-selected_type = col_type.selectbox("Elige un tipo:", all_types)
-min_stats = col_stats.slider("Stats Totales Mínimos:", 300, 800, 500, step=50)
+    col_type, col_stats = st.columns(2)
+    selected_type = col_type.selectbox("Elige un tipo:", roster.tipos_presentes)
+    min_stats = col_stats.slider("Stats Totales Mínimos:", 300, 800, 500, step=50)
 
-if st.button("🔍 Buscar con Procedimiento Almacenado"):
-    query = f"CALL sp_find_pokemon_by_type('{selected_type}', {min_stats});"
-    df_procedure_result = call_stored_procedure(query)
+    if st.button("🔍 Buscar con Procedimiento Almacenado"):
+        df_procedure_result = call_stored_procedure('sp_find_pokemon_by_type', (selected_type, min_stats))
 
-    if not df_procedure_result.empty:
-        st.success(f"Encontrados {len(df_procedure_result)} Pokémon del tipo '{selected_type}' con más de {min_stats} stats totales:")
-        st.dataframe(df_procedure_result)
-    else:
-        st.info("No se encontraron Pokémon con esos criterios.")
+        if not df_procedure_result.empty:
+            st.success(f"Encontrados {len(df_procedure_result)} Pokémon del tipo '{selected_type}' con más de {min_stats} stats totales:")
+            st.dataframe(df_procedure_result)
+        else:
+            st.info("No se encontraron Pokémon con esos criterios.")
+
+stored_procedure_section(roster)
 
 # --- VISTAS ---
-with st.expander("📋 Análisis usando Vistas de la Base de Datos"):
-    
+@st.fragment
+def views_section():
+    """Consultas a las vistas: solo se ejecutan si la sección está abierta."""
+    if not st.toggle("📋 Análisis usando Vistas de la Base de Datos"):
+        return
+
     st.subheader("🚀 Vista: Análisis de Mega Evoluciones")
     st.code("SELECT * FROM vw_mega_evolutions ORDER BY power_increase DESC;")
     
     mega_view_query = "SELECT * FROM vw_mega_evolutions ORDER BY power_increase DESC;"
-    df_mega_view = run_query(mega_view_query)
+    df_mega_view = run_query(mega_view_query, label='vw_mega_evolutions')
 
     if not df_mega_view.empty:
         col_chart, col_data = st.columns([1.5, 1])
@@ -330,7 +573,7 @@ with st.expander("📋 Análisis usando Vistas de la Base de Datos"):
     st.code("SELECT * FROM vw_fire_type_fighters ORDER BY attack DESC;")
     
     fire_view_query = "SELECT * FROM vw_fire_type_fighters ORDER BY attack DESC;"
-    df_fire_view = run_query(fire_view_query)
+    df_fire_view = run_query(fire_view_query, label='vw_fire_type_fighters')
     
     if not df_fire_view.empty:
         st.dataframe(df_fire_view, use_container_width=True)
@@ -350,6 +593,60 @@ with st.expander("📋 Análisis usando Vistas de la Base de Datos"):
     else:
         st.warning("No se encontraron datos en la vista vw_fire_type_fighters.")
 
+views_section()
+
+# --- MÉTRICAS DEL POOL DE CONEXIONES ---
+with st.sidebar.expander(f"🔌 Backend de Datos ({get_backend().nombre})"):
+    metricas_backend = get_backend().metricas()
+    if 'pool_size' in metricas_backend:
+        st.metric("Conexiones activas", f"{metricas_backend['activas']} / {metricas_backend['pool_size']}")
+        st.metric("Checkouts", metricas_backend['checkouts'])
+        st.metric("Espera media", f"{metricas_backend['espera_media_ms']:.1f} ms")
+        st.caption(f"Espera máxima: {metricas_backend['espera_max_ms']:.1f} ms · "
+                   f"Reconexiones: {metricas_backend['reconexiones']} · Errores: {metricas_backend['errores']}")
+    else:
+        st.caption(f"Archivo: {SQLITE_PATH}")
+        st.metric("Consultas", metricas_backend['consultas'])
+        st.metric("Conexiones abiertas", metricas_backend['conexiones'])
+    st.caption(f"Roster en memoria: {len(roster):,} filas · {roster.memoria_bytes() / 1024:.0f} KB en columnas (compartido)")
+
+with st.sidebar.expander("📜 Actividad Reciente"):
+    # Sin caché: LIMIT sobre la clave primaria, cuesta lo mismo con cualquier tamaño de activity_log
+    df_activity = run_query(SQL_ACTIVIDAD_RECIENTE, (RECENT_ACTIVITY,), label='recent_activity', use_cache=False)
+    if df_activity.empty:
+        st.caption("Sin actividad registrada.")
+    else:
+        st.dataframe(df_activity[['timestamp', 'table_name', 'action_type', 'record_id']], hide_index=True)
+
+with st.sidebar.expander("🗃️ Caché de Consultas"):
+    metricas_cache = get_query_cache().metricas()
+    st.metric("Hit rate", f"{metricas_cache['hit_rate']:.0%}")
+    st.metric("Entradas", f"{metricas_cache['entradas']} / {metricas_cache['max_entradas']}")
+    st.caption(f"Hits: {metricas_cache['hits']} · Misses: {metricas_cache['misses']} · "
+               f"Evictions: {metricas_cache['evictions']} · Expiradas: {metricas_cache['expiradas']} · "
+               f"Invalidaciones: {metricas_cache['invalidaciones']}")
+    st.caption(f"Versión de datos: {metricas_cache['version'] or 'desconocida'}")
+
+# --- PANEL DE RENDIMIENTO POR CONSULTA (OCULTO) ---
+@st.fragment
+def performance_panel():
+    """Percentiles por etiqueta de consulta de este proceso, con exportación JSONL."""
+    with st.sidebar.expander("⏱️ Rendimiento por Consulta", expanded=True):
+        st.button("🔄 Actualizar")
+        resumen = get_query_metrics().resumen()
+        if not resumen:
+            st.caption("Todavía no hay consultas registradas.")
+            return
+        st.dataframe(
+            pd.DataFrame(resumen)[['label', 'n', 'p50_ms', 'p95_ms', 'p99_ms', 'filas_media', 'hit_rate']],
+            hide_index=True, use_container_width=True
+        )
+        st.download_button("💾 Exportar JSONL", get_query_metrics().a_jsonl(),
+                           file_name="query_metrics.jsonl", mime="application/jsonl")
+
+if PERF_PANEL or st.query_params.get('perf') == '1':
+    performance_panel()
+
 # --- PIE DE PÁGINA CON INFORMACIÓN TÉCNICA ---
 st.markdown("---")
 st.markdown("### 🛠️ Información Técnica del Proyecto")
@@ -359,10 +656,9 @@ with col1:
     st.info("""
     **Base de Datos:**
     - MySQL 8.0+
-    - Tablas: 4
-    - Vistas: 2
-    - Procedimientos: 1
-    - Triggers: 1
+    - Tablas: 12
+    - Vistas: 4
+    - Procedimientos: 2
     """)
 
 with col2:
@@ -0,0 +1,436 @@
+# =====================================================
+# BENCHMARKS - POKÉMON TEAM BUILDER
+# Importación, análisis de equipo y consultas del dashboard a varias escalas
+# =====================================================
+#
+# Uso:
+#   python benchmark.py                                  # escalas 1, 10, 100 y 1000
+#   python benchmark.py --escalas 1 10 -o bench.json
+#
+# Cada escala crea una base SQLite temporal (el backend embebido, sin servidor)
+# con el roster de Pokemon.csv replicado N veces y mide cada etapa por separado.
+# El resultado es un JSON con la versión de git, para comparar entre commits.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import import_mejorado
+from almacenamiento import SQL_EFECTIVIDAD, SQL_PERFILES, BackendSQLite, ConexionSQLite
+from busqueda_nombres import IndiceNombres
+from equipos import TAMANO_EQUIPO, guardar_equipos
+from motor_tipos import MotorTipos
+from roster_columnar import RosterColumnar
+
+ESCALAS_DEFAULT = [1, 10, 100, 1000]
+
+# Las mismas consultas que ejecuta app.py (dashboard, vistas y procedimiento)
+CONSULTAS_DASHBOARD = {
+    'roster_completo': "SELECT * FROM vw_pokemon ORDER BY pokedex_number, unique_id",
+    'mega_boost': """
+        SELECT
+            base.base_name,
+            base.total_stats as stats_base,
+            mega.total_stats as stats_mega,
+            (mega.total_stats - base.total_stats) as incremento,
+            ROUND(100.0 * (mega.total_stats - base.total_stats) / base.total_stats, 2) as porcentaje_incremento
+        FROM pokemon base
+        JOIN pokemon mega ON base.pokedex_number = mega.pokedex_number
+        WHERE base.form_type = 'base' AND mega.form_type = 'mega'
+        ORDER BY incremento DESC
+        LIMIT 15;
+    """,
+    'generaciones': """
+        SELECT generation, form_type, COUNT(*) as cantidad
+        FROM pokemon
+        GROUP BY generation, form_type
+        ORDER BY generation, form_type;
+    """,
+    'vw_mega_evolutions': "SELECT * FROM vw_mega_evolutions ORDER BY power_increase DESC;",
+    'vw_fire_type_fighters': "SELECT * FROM vw_fire_type_fighters ORDER BY attack DESC;",
+    'vw_pokemon_power_ranking': "SELECT * FROM vw_pokemon_power_ranking LIMIT 50;",
+}
+PROCEDIMIENTOS_DASHBOARD = {
+    'sp_find_pokemon_by_type': ('Fire', 500),
+}
+
+# tr_team_activity_log tal como era antes de equipos.py (dos SELECT por miembro),
+# solo para comparar el guardado fila por fila con el guardado por lotes
+TRIGGER_POR_FILA = """
+CREATE TRIGGER tr_team_activity_log
+AFTER INSERT ON team_members
+BEGIN
+    INSERT INTO activity_log (table_name, action_type, record_id, new_values)
+    VALUES (
+        'team_members',
+        'INSERT',
+        NEW.id,
+        json_object(
+            'team_id', NEW.team_id,
+            'team_name', (SELECT t.name FROM teams t WHERE t.id = NEW.team_id),
+            'pokemon_unique_id', NEW.pokemon_unique_id,
+            'pokemon_name', (SELECT p.name FROM pokemon p WHERE p.unique_id = NEW.pokemon_unique_id),
+            'position', NEW.position,
+            'nickname', NEW.nickname
+        )
+    );
+END;
+"""
+
+def clasificar_formas_anterior(nombres):
+    """Clasificador anterior a import_mejorado.clasificar_formas (cuatro str.contains, str.replace y str.strip)"""
+    is_mega = nombres.str.contains('Mega', na=False, case=False)
+    is_primal = nombres.str.contains('Primal', na=False, case=False)
+    is_regional = nombres.str.contains('Alolan|Galarian', na=False, case=False)
+    is_alternate = nombres.str.contains(
+        'Mega|Primal|Alolan|Galarian|Super Size|Confined|Unbound|Attack Forme|Defense Forme',
+        na=False, case=False
+    )
+    form_type = pd.Series('base', index=nombres.index)
+    form_type[is_mega] = 'mega'
+    form_type[is_primal] = 'primal'
+    form_type[is_regional] = 'regional'
+    form_type[is_alternate & (form_type == 'base')] = 'special'
+    base_name = nombres.str.replace(
+        r'Mega |Primal |Alolan |Galarian |Super Size|Confined|Unbound|Attack Forme|Defense Forme',
+        '', regex=True
+    ).str.strip()
+    return form_type, is_alternate, base_name
+
+
+def medir_clasificador_formas(nombres_csv, filas, repeticiones=5):
+    """Filas/s del clasificador de formas anterior (6 pasadas) y del actual (str.contains + str.extract).
+
+    Los nombres se miden con el dtype que devuelve read_csv, el mismo que ve el import
+    (en pandas 3, textos Arrow); test_formas.py verifica la clasificación.
+    """
+    nombres = pd.Series(np.resize(nombres_csv.to_numpy(dtype=object), filas)).astype(nombres_csv.dtype)
+    resultados = {'filas': filas, 'dtype': str(nombres.dtype)}
+    for etiqueta, clasificar, pasadas in (('anterior', clasificar_formas_anterior, 6),
+                                          ('una_pasada', import_mejorado.clasificar_formas, 2)):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            clasificar(nombres)
+            tiempos.append(time.perf_counter() - inicio)
+        resultados[etiqueta] = {'pasadas': pasadas, 'segundos': min(tiempos), 'filas_s': filas / max(min(tiempos), 1e-9)}
+    return resultados
+
+
+def percentiles(tiempos):
+    """Resumen en milisegundos de una lista de duraciones en segundos"""
+    ms = np.asarray(tiempos) * 1000
+    return {
+        'n': len(ms),
+        'media_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'max_ms': float(ms.max()),
+    }
+
+
+def escalar_roster(df, escala):
+    """Replicar el roster `escala` veces con nombres y números de Pokédex únicos"""
+    if escala == 1:
+        return df.copy()
+    desplazamiento = int(df['pokedex_number'].max())
+    copias = []
+    for k in range(escala):
+        copia = df.copy()
+        if k:
+            # Cada copia es un "roster" distinto: así los JOIN por especie no se
+            # vuelven cuadráticos y la restricción UNIQUE(name) se cumple
+            copia['name'] = copia['name'] + f" #{k}"
+            copia['pokedex_number'] = copia['pokedex_number'] + k * desplazamiento
+        copias.append(copia)
+    return pd.concat(copias, ignore_index=True)
+
+
+def medir_importacion(ruta_db, df, chunk_size):
+    """Crear la base desde cero e importar el roster escalado"""
+    connection = ConexionSQLite(ruta_db)
+    try:
+        # La salida por lote de los import se descarta: solo interesa el tiempo
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            ok = import_mejorado.ejecutar_sql_completo(connection)
+            ok = ok and import_mejorado.crear_vistas_y_procedimientos(connection)
+            esquema = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            ok = ok and import_mejorado.importar_pokemon_data(connection, df, chunk_size)
+            ok = ok and import_mejorado.importar_tipos_pokemon(connection)
+            ok = ok and import_mejorado.refrescar_ranking_poder(connection, chunk_size)
+            pokemon = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            ok = ok and import_mejorado.importar_efectividad_tipos(connection)
+            ok = ok and import_mejorado.importar_perfiles_defensivos(connection)
+            ok = ok and import_mejorado.registrar_version_datos(connection)
+            tipos = time.perf_counter() - inicio
+        if not ok:
+            raise RuntimeError("la importación falló (ejecuta import_mejorado.py para ver el detalle)")
+    finally:
+        connection.close()
+
+    return {
+        'filas': len(df),
+        'esquema_s': esquema,
+        'pokemon_s': pokemon,
+        'filas_s': len(df) / max(pokemon, 1e-9),
+        'tipos_y_perfiles_s': tipos,
+    }
+
+
+def medir_analisis(backend, equipos, semilla):
+    """Latencia del análisis de un equipo tal como lo hace app.py (RosterColumnar + MotorTipos)"""
+    inicio = time.perf_counter()
+    roster = RosterColumnar(backend.consultar(CONSULTAS_DASHBOARD['roster_completo']))
+    df_efectividad = backend.consultar(SQL_EFECTIVIDAD)
+    df_perfiles = backend.consultar(SQL_PERFILES)
+    motor = MotorTipos.desde_dataframe(df_efectividad, df_perfiles)
+    carga = time.perf_counter() - inicio
+
+    rng = np.random.default_rng(semilla)
+    tiempos = []
+    for _ in range(equipos):
+        seleccion = rng.choice(roster.nombres, size=6, replace=False).tolist()
+        inicio = time.perf_counter()
+        filas = roster.filas(seleccion)
+        motor.analizar_equipo(roster.dataframe(filas))
+        motor.analizar_cobertura(roster.tipos_stab(filas), roster.frecuencia_firmas)
+        tiempos.append(time.perf_counter() - inicio)
+
+    return {'carga_roster_y_motor_s': carga, **percentiles(tiempos)}
+
+
+def medir_busqueda(backend, consultas, semilla):
+    """Construcción del índice de nombres y latencia de búsquedas por prefijo y con errores"""
+    df_pokemon = backend.consultar(CONSULTAS_DASHBOARD['roster_completo'])
+    inicio = time.perf_counter()
+    indice = IndiceNombres(df_pokemon['name'], df_pokemon['base_name'], df_pokemon['form_type'] == 'base')
+    construccion = time.perf_counter() - inicio
+
+    rng = np.random.default_rng(semilla)
+    nombres = rng.choice(df_pokemon['name'].to_numpy(), size=consultas)
+    largos = rng.integers(1, 9, size=consultas)
+    resultados = {'construccion_s': construccion}
+    # Prefijos como al escribir, y nombres con una letra de menos (errores de tipeo)
+    for etiqueta, textos in (('prefijo', [n[:k] for n, k in zip(nombres, largos)]),
+                             ('con_error', [n[:3] + n[4:] for n in nombres])):
+        tiempos = []
+        for texto in textos:
+            inicio = time.perf_counter()
+            indice.buscar(texto, limite=50)
+            tiempos.append(time.perf_counter() - inicio)
+        resultados[etiqueta] = percentiles(tiempos)
+    return resultados
+
+
+def equipos_aleatorios(unique_ids, cantidad, semilla):
+    """DataFrames teams y team_members con `cantidad` equipos de 6 Pokémon distintos"""
+    rng = np.random.default_rng(semilla)
+    ids = np.arange(1, cantidad + 1)
+    posiciones = rng.integers(len(unique_ids), size=(cantidad, TAMANO_EQUIPO))
+    # Volver a sortear solo los equipos con algún Pokémon repetido
+    pendientes = np.arange(cantidad)
+    while len(pendientes):
+        ordenados = np.sort(posiciones[pendientes], axis=1)
+        pendientes = pendientes[(ordenados[:, 1:] == ordenados[:, :-1]).any(axis=1)]
+        posiciones[pendientes] = rng.integers(len(unique_ids), size=(len(pendientes), TAMANO_EQUIPO))
+    teams = pd.DataFrame({'id': ids, 'name': [f'Equipo Benchmark {i}' for i in ids]})
+    team_members = pd.DataFrame({
+        'team_id': np.repeat(ids, TAMANO_EQUIPO),
+        'pokemon_unique_id': np.asarray(unique_ids)[posiciones].ravel(),
+        'position': np.tile(np.arange(1, TAMANO_EQUIPO + 1), cantidad),
+    })
+    return teams, team_members
+
+
+def medir_guardado_equipos(ruta_db, cantidad, chunk_size, semilla):
+    """Equipos guardados por segundo: fila por fila con el trigger anterior y por lotes con equipos.py"""
+    connection = ConexionSQLite(ruta_db)
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT unique_id FROM pokemon")
+        unique_ids = np.array([uid for (uid,) in cursor.fetchall()])
+        teams, team_members = equipos_aleatorios(unique_ids, cantidad, semilla)
+        filas = team_members[['team_id', 'pokemon_unique_id', 'position']].to_numpy().tolist()
+
+        # Antes: un INSERT por miembro, y el trigger hace dos SELECT y un INSERT por cada uno
+        connection.executescript(TRIGGER_POR_FILA)
+        inicio = time.perf_counter()
+        for lote in range(0, cantidad, chunk_size):
+            for equipo in teams.iloc[lote:lote + chunk_size].itertuples(index=False):
+                cursor.execute("INSERT INTO teams (name) VALUES (%s)", (equipo.name,))
+                team_id = cursor.lastrowid
+                for _, pokemon_id, posicion in filas[(equipo.id - 1) * TAMANO_EQUIPO:equipo.id * TAMANO_EQUIPO]:
+                    cursor.execute(
+                        "INSERT INTO team_members (team_id, pokemon_unique_id, position) VALUES (%s, %s, %s)",
+                        (team_id, pokemon_id, posicion)
+                    )
+            connection.commit()
+        por_fila = time.perf_counter() - inicio
+        connection.executescript("DROP TRIGGER IF EXISTS tr_team_activity_log;")
+
+        # Después: miembros con un executemany por lote y activity_log con un INSERT ... SELECT
+        inicio = time.perf_counter()
+        guardar_equipos(connection, teams, team_members, chunk_size)
+        por_lotes = time.perf_counter() - inicio
+    finally:
+        connection.close()
+
+    return {
+        'equipos': cantidad,
+        'por_fila_s': por_fila,
+        'por_fila_equipos_s': cantidad / max(por_fila, 1e-9),
+        'por_lotes_s': por_lotes,
+        'por_lotes_equipos_s': cantidad / max(por_lotes, 1e-9),
+    }
+
+
+def medir_consultas(backend, repeticiones):
+    """Latencia de cada consulta del dashboard, vista y procedimiento"""
+    resultados = {}
+    for etiqueta, query in CONSULTAS_DASHBOARD.items():
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            df = backend.consultar(query)
+            tiempos.append(time.perf_counter() - inicio)
+        resultados[etiqueta] = {'filas': len(df), **percentiles(tiempos)}
+
+    for nombre, args in PROCEDIMIENTOS_DASHBOARD.items():
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            df = backend.llamar_procedimiento(nombre, args)
+            tiempos.append(time.perf_counter() - inicio)
+        resultados[nombre] = {'filas': len(df), **percentiles(tiempos)}
+    return resultados
+
+
+def version_git():
+    """Commit actual, para poder comparar resultados entre versiones"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar_benchmark(escalas, repeticiones=10, equipos=200, chunk_size=1000, semilla=0, directorio=None,
+                       equipos_guardados=100_000, filas_formas=1_000_000):
+    """Ejecutar todas las etapas en cada escala y devolver los resultados"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_base = import_mejorado.procesar_pokemon_data()
+    if df_base is None:
+        raise RuntimeError("no se pudo leer Pokemon.csv")
+
+    resultados = {
+        'commit': version_git(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'sqlite': sqlite3.sqlite_version,
+        'parametros': {
+            'repeticiones': repeticiones,
+            'equipos': equipos,
+            'chunk_size': chunk_size,
+            'semilla': semilla,
+            'equipos_guardados': equipos_guardados,
+            'filas_formas': filas_formas,
+        },
+        'escalas': [],
+    }
+
+    formas = medir_clasificador_formas(pd.read_csv('Pokemon.csv')['Name'], filas_formas)
+    print(f"⏱️  Clasificador de formas ({filas_formas:,} nombres {formas['dtype']}): "
+          f"anterior {formas['anterior']['filas_s']:,.0f} filas/s · una pasada {formas['una_pasada']['filas_s']:,.0f} filas/s")
+    resultados['clasificador_formas'] = formas
+
+    with tempfile.TemporaryDirectory(dir=directorio) as tmp:
+        for escala in escalas:
+            print(f"⏱️  Escala {escala}x...")
+            df = escalar_roster(df_base, escala)
+            ruta_db = os.path.join(tmp, f"bench_{escala}.db")
+
+            importacion = medir_importacion(ruta_db, df, chunk_size)
+            print(f"   Importación: {importacion['filas']} filas en {importacion['pokemon_s']:.2f}s "
+                  f"({importacion['filas_s']:,.0f} filas/s)")
+
+            backend = BackendSQLite(ruta_db)
+            analisis = medir_analisis(backend, equipos, semilla)
+            print(f"   Análisis de equipo: p50 {analisis['p50_ms']:.2f} ms · p95 {analisis['p95_ms']:.2f} ms")
+
+            busqueda = medir_busqueda(backend, equipos, semilla)
+            print(f"   Búsqueda de nombres: índice en {busqueda['construccion_s']:.2f}s · "
+                  f"prefijo p95 {busqueda['prefijo']['p95_ms']:.3f} ms · con error p95 {busqueda['con_error']['p95_ms']:.3f} ms")
+
+            consultas = medir_consultas(backend, repeticiones)
+            for etiqueta, medida in consultas.items():
+                print(f"   {etiqueta}: p50 {medida['p50_ms']:.2f} ms ({medida['filas']} filas)")
+            backend.cerrar()
+
+            guardado = medir_guardado_equipos(ruta_db, equipos_guardados, chunk_size, semilla)
+            print(f"   Guardado de {equipos_guardados:,} equipos: fila por fila {guardado['por_fila_equipos_s']:,.0f} equipos/s · "
+                  f"por lotes {guardado['por_lotes_equipos_s']:,.0f} equipos/s")
+
+            resultados['escalas'].append({
+                'escala': escala,
+                'importacion': importacion,
+                'analisis_equipo': analisis,
+                'busqueda_nombres': busqueda,
+                'consultas': consultas,
+                'guardado_equipos': guardado,
+            })
+
+    return resultados
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmarks de importación, análisis y consultas")
+    parser.add_argument('--escalas', type=int, nargs='+', default=ESCALAS_DEFAULT,
+                        help="Veces que se replica el roster (default: 1 10 100 1000)")
+    parser.add_argument('--repeticiones', type=int, default=10, help="Ejecuciones de cada consulta")
+    parser.add_argument('--equipos', type=int, default=200, help="Equipos aleatorios a analizar")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Filas por lote de importación")
+    parser.add_argument('--equipos-guardados', type=int, default=100_000,
+                        help="Equipos a guardar en teams/team_members (fila por fila y por lotes)")
+    parser.add_argument('--filas-formas', type=int, default=1_000_000,
+                        help="Nombres para medir el clasificador de formas")
+    parser.add_argument('--semilla', type=int, default=0, help="Semilla de los equipos aleatorios")
+    parser.add_argument('--tmp', default=None, help="Directorio para las bases temporales")
+    parser.add_argument('-o', '--salida', default='benchmark_results.json', help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    try:
+        resultados = ejecutar_benchmark(args.escalas, args.repeticiones, args.equipos,
+                                        args.chunk_size, args.semilla, args.tmp, args.equipos_guardados,
+                                        args.filas_formas)
+    except RuntimeError as e:
+        print(f"❌ Error en el benchmark: {e}")
+        sys.exit(1)
+
+    with open(args.salida, 'w', encoding='utf-8') as salida:
+        json.dump(resultados, salida, indent=2, ensure_ascii=False)
+    print(f"💾 Resultados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
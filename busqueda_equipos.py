@@ -0,0 +1,176 @@
+# =====================================================
+# BÚSQUEDA DE EQUIPO ÓPTIMO - POKÉMON TEAM BUILDER
+# Ramificación y poda sobre firmas de tipo (no sobre Pokémon individuales)
+# =====================================================
+
+import heapq
+import time
+
+import numpy as np
+import pandas as pd
+
+from motor_tipos import firmas_dataframe, puntuar_multiplicadores
+
+
+def vulnerabilidad(scores):
+    """Score de vulnerabilidad de un equipo: suma de las debilidades sin cubrir"""
+    return float(np.maximum(scores, 0).sum())
+
+
+def _candidatos(df_pokemon, team_size, min_total_stats, allow_megas, allow_legendaries):
+    """Filtrar el roster y agrupar por firma de tipo, conservando los de más stats"""
+    df = df_pokemon[df_pokemon['total_stats'] >= min_total_stats]
+    if not allow_megas:
+        df = df[df['form_type'] != 'mega']
+    if not allow_legendaries:
+        df = df[~df['legendary'].astype(bool)]
+
+    df = df.assign(_firma=firmas_dataframe(df))
+    df = df[df['_firma'] >= 0]
+
+    # Dos Pokémon con la misma firma tienen el mismo perfil: solo importan los
+    # `team_size` con más stats (uno por especie), así el tamaño del roster no
+    # cambia el espacio de búsqueda (como mucho 171 firmas)
+    df = (df.sort_values('total_stats', ascending=False, kind='stable')
+            .drop_duplicates(['_firma', 'pokedex_number'])
+            .groupby('_firma', sort=False)
+            .head(team_size))
+    return df
+
+
+def suggest_team(df_pokemon, motor, team_size=6, top_k=5, min_total_stats=0,
+                 allow_megas=True, allow_legendaries=True, time_budget=1.0):
+    """Buscar los `top_k` equipos con menor vulnerabilidad (desempate: más stats totales).
+
+    Devuelve (equipos, completo): cada equipo es un dict con 'pokemon' (DataFrame),
+    'vulnerability', 'team_score' (vector por tipo atacante) y 'total_stats';
+    `completo` es False si se agotó `time_budget` antes de terminar la búsqueda.
+
+    Por firma solo se consideran sus `team_size` Pokémon con más stats (uno por especie).
+    Si alguno choca con una especie ya elegida se usan los siguientes de esa firma, pero
+    la elección es voraz: no se reserva una especie para una firma que se explora después.
+    """
+    df = _candidatos(df_pokemon, team_size, min_total_stats, allow_megas, allow_legendaries)
+    if df.empty:
+        return [], True
+    team_size = min(team_size, len(df))
+
+    grupos = {firma: g for firma, g in df.groupby('_firma', sort=False)}
+    firmas = np.array(list(grupos), dtype=np.intp)
+    scores = puntuar_multiplicadores(motor.perfiles_firmas[firmas])
+    stats = [g['total_stats'].to_numpy(dtype=np.int64) for g in grupos.values()]
+    especies = [g['pokedex_number'].tolist() for g in grupos.values()]
+
+    # Explorar primero las firmas con más stats: los primeros equipos completos ya
+    # son buenos y la cota de stats poda pronto el resto del árbol
+    orden = sorted(range(len(firmas)), key=lambda i: (-stats[i][0], vulnerabilidad(scores[i])))
+    scores = scores[orden]
+    stats = [stats[i] for i in orden]
+    especies = [especies[i] for i in orden]
+    firmas = firmas[orden]
+    n = len(firmas)
+
+    # Cotas por sufijo: lo mejor que puede aportar cada miembro restante
+    min_score_sufijo = np.minimum.accumulate(scores[::-1], axis=0)[::-1]
+    # mejores_sufijo[i]: (stats, especie) de las firmas i..n-1, el mejor por especie y de mayor
+    # a menor. Cada especie usada quita como mucho una entrada, así que con 2 * team_size - 1
+    # siempre quedan los `restantes` mayores entre las especies libres
+    mejores_sufijo = [None] * (n + 1)
+    mejores_sufijo[n] = []
+    for i in range(n - 1, -1, -1):
+        vistas = set()
+        mejores_sufijo[i] = [
+            (total, especie) for total, especie
+            in sorted(mejores_sufijo[i + 1] + list(zip(stats[i].tolist(), especies[i])), reverse=True)
+            if not (especie in vistas or vistas.add(especie))
+        ][:2 * team_size - 1]
+
+    mejores = []  # heap de (-vulnerabilidad, stats, contador, seleccion)
+    contador = 0
+    nodos = 0
+    limite = time.perf_counter() + time_budget
+    completo = True
+
+    def peor_clave():
+        return (-mejores[0][0], -mejores[0][1]) if len(mejores) >= top_k else None
+
+    def registrar(seleccion, score, total):
+        nonlocal contador
+        clave = (vulnerabilidad(score), -total)
+        peor = peor_clave()
+        if peor is not None and clave >= peor:
+            return
+        contador += 1
+        item = (-clave[0], total, contador, tuple(seleccion), score.copy())
+        if len(mejores) >= top_k:
+            heapq.heapreplace(mejores, item)
+        else:
+            heapq.heappush(mejores, item)
+
+    # DFS iterativa: cada marco es (firma, score parcial, stats, selección, especies usadas)
+    pila = [(0, np.zeros(scores.shape[1]), 0, [], frozenset())]
+    while pila:
+        nodos += 1
+        if nodos % 1024 == 0 and time.perf_counter() > limite:
+            completo = False
+            break
+
+        i, score, total, seleccion, usados = pila.pop()
+        restantes = team_size - len(usados)
+        if restantes == 0:
+            registrar(seleccion, score, total)
+            continue
+        if i >= n:
+            continue
+
+        # Cota inferior: cada miembro restante aporta como mínimo el mejor score por tipo
+        cota = vulnerabilidad(score + restantes * min_score_sufijo[i])
+        libres = [total_miembro for total_miembro, especie in mejores_sufijo[i] if especie not in usados]
+        if len(libres) < restantes:
+            continue  # No quedan especies suficientes para completar el equipo
+        cota_stats = total + sum(libres[:restantes])
+        peor = peor_clave()
+        if peor is not None and (cota, -cota_stats) >= peor:
+            continue
+
+        if restantes == 1:
+            # Último miembro: puntuar de una vez todas las firmas que quedan y registrar
+            # (en el orden de la DFS) solo las que pueden entrar entre los mejores
+            vulns = np.maximum(score + scores[i:], 0).sum(axis=1)
+            for j in np.flatnonzero(vulns <= peor[0]) + i if peor is not None else range(i, n):
+                p = next((p for p, especie in enumerate(especies[j]) if especie not in usados), None)
+                if p is not None:
+                    registrar(seleccion + [(j, (p,))], score + scores[j], total + int(stats[j][p]))
+            continue
+
+        # Ramas: saltar la firma i, o tomar sus 1..k mejores representantes.
+        # Cláusula de especie: no repetir pokedex_number entre firmas distintas;
+        # si hay choque se pasa a los siguientes de la firma
+        pila.append((i + 1, score, total, seleccion, usados))
+        disponibles = [p for p, especie in enumerate(especies[i]) if especie not in usados]
+        for c in range(min(restantes, len(disponibles)), 0, -1):
+            posiciones = disponibles[:c]
+            nuevo_total = total + int(stats[i][posiciones].sum())
+            # Un equipo completo no puede bajar de `cota`: si ni así entra, no hace falta puntuarlo
+            if c == restantes and peor is not None and (cota, -nuevo_total) >= peor:
+                continue
+            pila.append((
+                i + 1,
+                score + c * scores[i],
+                nuevo_total,
+                seleccion + [(i, tuple(posiciones))],
+                usados.union(especies[i][p] for p in posiciones),
+            ))
+
+    equipos = []
+    for neg_vuln, total, _, seleccion, score in sorted(mejores, key=lambda x: (-x[0], -x[1])):
+        miembros = pd.concat([
+            grupos[firmas[i]].iloc[list(posiciones)] for i, posiciones in seleccion
+        ]).drop(columns='_firma')
+        equipos.append({
+            'pokemon': miembros,
+            'vulnerability': -neg_vuln,
+            'team_score': score,
+            'total_stats': total,
+        })
+    return equipos, completo
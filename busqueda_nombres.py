@@ -0,0 +1,207 @@
+# =====================================================
+# BÚSQUEDA DE NOMBRES - POKÉMON TEAM BUILDER
+# Índice de prefijos (claves ordenadas + bisect) y trigramas para errores de tipeo
+# =====================================================
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+import numpy as np
+
+# Orden de los resultados: cuanto menor el nivel, antes aparece
+NIVEL_NOMBRE_EXACTO = 0
+NIVEL_ESPECIE_EXACTA = 1
+NIVEL_NOMBRE_PREFIJO = 2
+NIVEL_ESPECIE_PREFIJO = 3
+NIVEL_PALABRA_EXACTA = 4
+NIVEL_PALABRA_PREFIJO = 5
+NIVEL_APROXIMADO = 6
+
+# Tipo de cada clave del índice de prefijos
+CLAVE_NOMBRE, CLAVE_ESPECIE, CLAVE_PALABRA = 0, 1, 2
+_NIVEL_EXACTO = np.array([NIVEL_NOMBRE_EXACTO, NIVEL_ESPECIE_EXACTA, NIVEL_PALABRA_EXACTA])
+_NIVEL_PREFIJO = np.array([NIVEL_NOMBRE_PREFIJO, NIVEL_ESPECIE_PREFIJO, NIVEL_PALABRA_PREFIJO])
+
+SIMILITUD_MINIMA = 0.3  # Jaccard de trigramas para aceptar un resultado aproximado
+# Mínimos de trigramas compartidos que se prueban, de más estricto a SIMILITUD_MINIMA
+FRACCIONES_APROXIMADO = (0.75, 0.5, SIMILITUD_MINIMA)
+# Prefijos con más claves que esto ('b', 'ch', ...) guardan sus mejores resultados al construir
+UMBRAL_PRECALCULO = 2048
+LIMITE_PRECALCULO = 100
+
+
+def normalizar_nombre(texto):
+    """Minúsculas y sin acentos: 'Flabébé' -> 'flabebe'"""
+    texto = unicodedata.normalize('NFKD', str(texto).strip().lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def palabras(nombre):
+    """Palabras de un nombre, separando también las pegadas: 'VenusaurMega Venusaur' -> venusaur, mega, venusaur"""
+    return [normalizar_nombre(p) for p in re.findall(r'[A-ZÀ-Ý]?[a-zß-ÿ\'.♀♂]+|[A-ZÀ-Ý]+(?![a-z])|\d+', str(nombre))]
+
+
+def trigramas(clave):
+    """Trigramas de una clave normalizada, con bordes: 'abc' -> $ab, abc, bc$"""
+    clave = f'${clave}$'
+    return {clave[i:i + 3] for i in range(len(clave) - 2)}
+
+
+class IndiceNombres:
+    """Índice de búsqueda sobre los nombres del roster.
+
+    Prefijos: todas las claves (nombre, especie y cada palabra del nombre) en una
+    lista ordenada; un prefijo es el rango [bisect_left(q), bisect_left(q + '\\uffff'))
+    y se resuelve en O(log n) más el tamaño del rango, igual que bajar por un trie.
+    Los prefijos muy frecuentes (los nodos grandes del trie) guardan sus primeros
+    resultados al construir el índice, así ninguna búsqueda recorre un rango enorme.
+    Errores de tipeo: índice invertido de trigramas del nombre; solo se consulta si
+    ninguna clave empieza por la consulta.
+
+    Se construye una vez por roster y es de solo lectura: se puede compartir entre sesiones.
+    """
+
+    def __init__(self, nombres, especies=None, es_base=None):
+        nombres = [str(n) for n in nombres]
+        self.n = len(nombres)
+        self.nombres = nombres
+        longitudes = np.fromiter((len(n) for n in nombres), dtype=np.int64, count=self.n)
+        no_base = (np.zeros(self.n, dtype=np.int64) if es_base is None
+                   else (~np.asarray(es_base, dtype=bool)).astype(np.int64))
+        # Desempate dentro de un nivel: formas base primero, luego nombres cortos, luego orden del roster
+        self._desempate = (no_base << 40) | (np.minimum(longitudes, 0xFFFF) << 24) | np.arange(self.n, dtype=np.int64)
+
+        claves = []
+        for fila, nombre in enumerate(nombres):
+            normalizado = normalizar_nombre(nombre)
+            claves.append((normalizado, CLAVE_NOMBRE, fila))
+            if especies is not None:
+                especie = normalizar_nombre(especies[fila])
+                if especie != normalizado:
+                    claves.append((especie, CLAVE_ESPECIE, fila))
+            partes = palabras(nombre)
+            if len(partes) > 1:
+                for palabra in set(partes):
+                    claves.append((palabra, CLAVE_PALABRA, fila))
+        claves.sort()
+        self._claves = [c[0] for c in claves]
+        self._tipo_clave = np.fromiter((c[1] for c in claves), dtype=np.int8, count=len(claves))
+        self._fila_clave = np.fromiter((c[2] for c in claves), dtype=np.int64, count=len(claves))
+
+        # Índice invertido trigrama -> filas, y cuántos trigramas tiene cada nombre
+        listas = defaultdict(list)
+        self._num_trigramas = np.zeros(self.n, dtype=np.int32)
+        for fila, nombre in enumerate(nombres):
+            grams = trigramas(normalizar_nombre(nombre))
+            self._num_trigramas[fila] = len(grams)
+            for gram in grams:
+                listas[gram].append(fila)
+        self._trigramas = {gram: np.array(filas, dtype=np.int32) for gram, filas in listas.items()}
+
+        self._precalculados = {}
+        self._precalcular('', 0, len(self._claves))
+
+    def __len__(self):
+        return self.n
+
+    def buscar_filas(self, consulta, limite=20):
+        """Filas que coinciden con la consulta, de mejor a peor (como mucho `limite`)"""
+        q = normalizar_nombre(consulta)
+        if not q or limite <= 0:
+            return np.array([], dtype=np.int64)
+
+        inicio = bisect_left(self._claves, q)
+        fin = bisect_left(self._claves, q + '\uffff', lo=inicio)
+        if q in self._precalculados and limite <= LIMITE_PRECALCULO:
+            return self._precalculados[q][:limite]
+        return self._filas_prefijo(q, inicio, fin, limite)
+
+    def buscar(self, consulta, limite=20):
+        """Nombres que coinciden con la consulta, de mejor a peor"""
+        return [self.nombres[f] for f in self.buscar_filas(consulta, limite)]
+
+    def _filas_prefijo(self, q, inicio, fin, limite):
+        """Resultados de las claves [inicio, fin) que empiezan por q, más aproximados si faltan"""
+        fin_exacto = bisect_right(self._claves, q, lo=inicio, hi=fin)
+        tipos = self._tipo_clave[inicio:fin]
+        filas = self._fila_clave[inicio:fin]
+        niveles = _NIVEL_PREFIJO[tipos]
+        niveles[:fin_exacto - inicio] = _NIVEL_EXACTO[tipos[:fin_exacto - inicio]]
+        similares = np.zeros(len(filas), dtype=np.int64)
+
+        # Los aproximados solo se buscan si ningún nombre empieza por la consulta (errores de tipeo)
+        if fin == inicio:
+            aproximadas = self._aproximadas(q, limite)
+            filas = np.concatenate([filas, aproximadas])
+            niveles = np.concatenate([niveles, np.full(len(aproximadas), NIVEL_APROXIMADO)])
+            similares = np.concatenate([similares, np.arange(len(aproximadas))])
+        return self._ordenar(filas, niveles, similares, limite)
+
+    def _precalcular(self, prefijo, inicio, fin):
+        """Guardar los resultados de cada prefijo con más de UMBRAL_PRECALCULO claves (recorre el trie implícito)"""
+        if fin - inicio <= UMBRAL_PRECALCULO:
+            return
+        if prefijo:
+            self._precalculados[prefijo] = self._filas_prefijo(prefijo, inicio, fin, LIMITE_PRECALCULO)
+        # Hijos: claves con un carácter más que el prefijo (las iguales al prefijo van primero)
+        i = bisect_right(self._claves, prefijo, lo=inicio, hi=fin)
+        while i < fin:
+            hijo = self._claves[i][:len(prefijo) + 1]
+            j = bisect_left(self._claves, hijo + '\uffff', lo=i, hi=fin)
+            self._precalcular(hijo, i, j)
+            i = j
+
+    def _aproximadas(self, q, limite):
+        """Filas con nombre parecido por trigramas (similitud de Jaccard), las más parecidas primero"""
+        grams = trigramas(q)
+        listas = sorted((self._trigramas[g] for g in grams if g in self._trigramas), key=len)
+        # Primero solo nombres que comparten casi todos los trigramas (pocas listas que recorrer);
+        # el mínimo solo se baja si con él no se llena el límite de resultados
+        for fraccion in FRACCIONES_APROXIMADO:
+            minimo = max(1, math.ceil(fraccion * len(grams)))
+            candidatas, similitud = self._similares(listas, len(grams), minimo)
+            if (similitud >= SIMILITUD_MINIMA).sum() >= limite:
+                break
+        aceptadas = similitud >= SIMILITUD_MINIMA
+        candidatas, similitud = candidatas[aceptadas].astype(np.int64), similitud[aceptadas]
+        if len(candidatas) > limite:
+            mejores = np.argpartition(-similitud, limite - 1)[:limite]
+            candidatas, similitud = candidatas[mejores], similitud[mejores]
+        return candidatas[np.argsort(-similitud, kind='stable')]
+
+    def _similares(self, listas, total, minimo):
+        """Filas que comparten al menos `minimo` trigramas de la consulta, con su similitud.
+
+        Una fila así aparece en alguna de las len(listas) - minimo + 1 listas más cortas:
+        solo esas generan candidatos y las más comunes ('$bu', 'ar$', ...) se consultan
+        por búsqueda binaria.
+        """
+        generadoras = len(listas) - minimo + 1
+        if generadoras <= 0:
+            return np.array([], dtype=np.int32), np.array([])
+        candidatas, compartidos = np.unique(np.concatenate(listas[:generadoras]), return_counts=True)
+        for lista in listas[generadoras:]:
+            posiciones = np.minimum(np.searchsorted(lista, candidatas), len(lista) - 1)
+            compartidos += lista[posiciones] == candidatas
+        return candidatas, compartidos / (total + self._num_trigramas[candidatas] - compartidos)
+
+    def _ordenar(self, filas, niveles, similares, limite):
+        """Una fila por resultado (su mejor nivel), ordenadas por nivel y desempate.
+
+        `similares` es la posición de cada aproximado por similitud (0 en los demás):
+        desempata antes que la forma y la longitud del nombre.
+        """
+        if not len(filas):
+            return filas
+        puntaje = (niveles.astype(np.int64) << 56) | (similares << 42) | self._desempate[filas]
+        if len(puntaje) > limite * 8:
+            # Rango de prefijo muy grande ('a', 'm', ...): basta con los mejores puntajes
+            corte = np.argpartition(puntaje, limite * 8 - 1)[:limite * 8]
+            filas, puntaje = filas[corte], puntaje[corte]
+        orden = np.argsort(puntaje, kind='stable')
+        filas = filas[orden]
+        _, primeras = np.unique(filas, return_index=True)
+        return filas[np.sort(primeras)][:limite]
@@ -0,0 +1,99 @@
+# =====================================================
+# CACHÉ DE CONSULTAS - POKÉMON TEAM BUILDER
+# LRU acotada con TTL, invalidada por la versión de datos del import
+# =====================================================
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheConsultas:
+    """Caché LRU de resultados con TTL y clave ligada a la versión de los datos"""
+
+    def __init__(self, max_entradas=256, ttl=600.0, intervalo_version=5.0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.intervalo_version = intervalo_version
+        self._entradas = OrderedDict()  # clave -> (expira_en, valor)
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_leida_en = float('-inf')
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expiradas = 0
+        self._invalidaciones = 0
+
+    def version_actual(self, leer_version):
+        """Versión de los datos, releída como mucho cada `intervalo_version` segundos"""
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - self._version_leida_en < self.intervalo_version:
+                return self._version
+        version = leer_version()
+        with self._lock:
+            self._version_leida_en = ahora
+            if version != self._version:
+                # Datos nuevos: todo lo guardado con la versión anterior queda obsoleto
+                if self._entradas:
+                    self._invalidaciones += 1
+                self._entradas.clear()
+                self._version = version
+            return self._version
+
+    def obtener(self, clave, calcular):
+        """Devolver el valor guardado para `clave` o calcularlo y guardarlo.
+
+        El valor se comparte entre sesiones: quien lo reciba no debe modificarlo.
+        """
+        return self.obtener_con_estado(clave, calcular)[0]
+
+    def obtener_con_estado(self, clave, calcular):
+        """Como obtener(), pero devuelve (valor, hit) para poder instrumentar la consulta"""
+        ahora = time.monotonic()
+        with self._lock:
+            clave = (self._version, clave)
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                expira_en, valor = entrada
+                if expira_en > ahora:
+                    self._entradas.move_to_end(clave)
+                    self._hits += 1
+                    return valor, True
+                del self._entradas[clave]
+                self._expiradas += 1
+            self._misses += 1
+
+        # Se calcula fuera del lock para no bloquear a otras sesiones
+        valor = calcular()
+
+        with self._lock:
+            self._entradas[clave] = (ahora + self.ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._evictions += 1
+        return valor, False
+
+    def invalidar(self):
+        """Vaciar la caché manualmente"""
+        with self._lock:
+            self._entradas.clear()
+            self._invalidaciones += 1
+
+    def metricas(self):
+        """Contadores de uso de la caché"""
+        with self._lock:
+            consultas = self._hits + self._misses
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / consultas if consultas else 0.0,
+                'evictions': self._evictions,
+                'expiradas': self._expiradas,
+                'invalidaciones': self._invalidaciones,
+                'version': self._version,
+            }
@@ -0,0 +1,237 @@
+# =====================================================
+# PERSISTENCIA DE EQUIPOS - POKÉMON TEAM BUILDER
+# Guardar, cargar y listar equipos (teams + team_members) en lotes
+# =====================================================
+#
+# Uso (importador masivo, p. ej. con los CSV de generar_roster.py):
+#   python equipos.py datos_sinteticos/teams.csv datos_sinteticos/team_members.csv
+#   python equipos.py teams.csv team_members.csv --backend sqlite --sqlite-path pokemon_team_builder.db
+#
+# Los miembros de cada lote se insertan con un solo executemany y el registro en
+# activity_log se escribe al final del lote con un INSERT ... SELECT: los nombres de
+# equipo y Pokémon salen de un JOIN por lote, no de dos SELECT por fila como hacía
+# el trigger tr_team_activity_log.
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from almacenamiento import SQLITE_PATH_DEFAULT
+
+TAMANO_EQUIPO = 6
+EQUIPOS_POR_LOTE = 1000
+
+# Equipos más recientes con su número de miembros (un parámetro: el límite). Es una lectura:
+# la app la ejecuta por el camino de consultas, con las conexiones de solo lectura.
+# El LIMIT va antes del JOIN: solo se cuentan los miembros de los equipos listados
+SQL_LISTAR_EQUIPOS = """
+    SELECT t.id, t.name, t.description, t.created_at, COUNT(tm.id) AS members
+    FROM (SELECT id, name, description, created_at FROM teams ORDER BY id DESC LIMIT %s) t
+    LEFT JOIN team_members tm ON tm.team_id = t.id
+    GROUP BY t.id, t.name, t.description, t.created_at
+    ORDER BY t.id DESC
+"""
+
+# Mismo contenido que escribía tr_team_activity_log, para todos los miembros de varios equipos
+_SQL_REGISTRO_MIEMBROS = """
+    INSERT INTO activity_log (table_name, action_type, record_id, new_values)
+    SELECT
+        'team_members',
+        'INSERT',
+        tm.id,
+        JSON_OBJECT(
+            'team_id', tm.team_id,
+            'team_name', t.name,
+            'pokemon_unique_id', tm.pokemon_unique_id,
+            'pokemon_name', p.name,
+            'position', tm.position,
+            'nickname', tm.nickname
+        )
+    FROM team_members tm
+    JOIN teams t ON t.id = tm.team_id
+    JOIN pokemon p ON p.unique_id = tm.pokemon_unique_id
+    WHERE tm.team_id IN ({marcadores})
+    ORDER BY tm.id
+"""
+
+
+def _insertar_equipo(cursor, nombre, descripcion=None, allow_megas=True, allow_legendaries=True):
+    """INSERT de una fila de teams; devuelve el id asignado"""
+    if descripcion is not None and pd.isna(descripcion):
+        descripcion = None  # Celda vacía de un CSV
+    cursor.execute(
+        "INSERT INTO teams (name, description, allow_megas, allow_legendaries) VALUES (%s, %s, %s, %s)",
+        (nombre, descripcion, bool(allow_megas), bool(allow_legendaries))
+    )
+    return cursor.lastrowid
+
+
+def _insertar_miembros(cursor, miembros):
+    """Todos los miembros del lote en un solo executemany: (team_id, pokemon_unique_id, position, nickname)"""
+    if miembros:
+        cursor.executemany(
+            "INSERT INTO team_members (team_id, pokemon_unique_id, position, nickname) VALUES (%s, %s, %s, %s)",
+            miembros
+        )
+
+
+def registrar_miembros(cursor, team_ids):
+    """Escribir en activity_log los miembros de estos equipos con un solo INSERT ... SELECT"""
+    team_ids = [int(t) for t in team_ids]
+    if team_ids:
+        cursor.execute(_SQL_REGISTRO_MIEMBROS.format(marcadores=', '.join(['%s'] * len(team_ids))), team_ids)
+
+
+def _filas_miembros(team_id, pokemon_ids, apodos=None):
+    """Filas de team_members con las posiciones 1..n en el orden recibido"""
+    if len(pokemon_ids) > TAMANO_EQUIPO:
+        raise ValueError(f"Un equipo tiene como máximo {TAMANO_EQUIPO} Pokémon")
+    apodos = apodos or [None] * len(pokemon_ids)
+    return [(team_id, int(uid), posicion, apodo)
+            for posicion, (uid, apodo) in enumerate(zip(pokemon_ids, apodos), start=1)]
+
+
+def guardar_equipo(connection, nombre, pokemon_ids, descripcion=None, allow_megas=True,
+                   allow_legendaries=True, apodos=None):
+    """Guardar un equipo (lista de unique_id en orden de posición) y devolver su id.
+
+    El equipo, sus miembros y su registro en activity_log se confirman juntos.
+    """
+    cursor = connection.cursor()
+    try:
+        team_id = _insertar_equipo(cursor, nombre, descripcion, allow_megas, allow_legendaries)
+        _insertar_miembros(cursor, _filas_miembros(team_id, pokemon_ids, apodos))
+        registrar_miembros(cursor, [team_id])
+        connection.commit()
+        return team_id
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def guardar_equipos(connection, teams, team_members, equipos_por_lote=EQUIPOS_POR_LOTE):
+    """Guardar muchos equipos desde DataFrames con las columnas de teams y team_members.
+
+    `teams.id` y `team_members.team_id` solo relacionan las dos tablas del archivo: la
+    base asigna ids nuevos. Cada lote (equipos, miembros y registro) es una transacción.
+    Devuelve (equipos, miembros) guardados.
+    """
+    # Miembros ordenados por equipo y posición: los de cada equipo son un rango contiguo
+    miembros = team_members.sort_values(['team_id', 'position'], kind='stable')
+    equipo_miembro = miembros['team_id'].to_numpy()
+    pokemon_ids = miembros['pokemon_unique_id'].to_numpy()
+    if 'nickname' in miembros:
+        apodos = [None if pd.isna(a) else str(a) for a in miembros['nickname']]
+    else:
+        apodos = [None] * len(miembros)
+    desde = np.searchsorted(equipo_miembro, teams['id'].to_numpy(), side='left')
+    hasta = np.searchsorted(equipo_miembro, teams['id'].to_numpy(), side='right')
+    equipos_guardados = miembros_guardados = 0
+
+    cursor = connection.cursor()
+    try:
+        for inicio in range(0, len(teams), equipos_por_lote):
+            lote = teams.iloc[inicio:inicio + equipos_por_lote]
+            nuevos_ids, filas = [], []
+            for i, equipo in enumerate(lote.itertuples(index=False), start=inicio):
+                team_id = _insertar_equipo(
+                    cursor, equipo.name, getattr(equipo, 'description', None),
+                    getattr(equipo, 'allow_megas', True), getattr(equipo, 'allow_legendaries', True)
+                )
+                nuevos_ids.append(team_id)
+                filas.extend(_filas_miembros(team_id, pokemon_ids[desde[i]:hasta[i]].tolist(),
+                                             apodos[desde[i]:hasta[i]]))
+            _insertar_miembros(cursor, filas)
+            registrar_miembros(cursor, nuevos_ids)
+            connection.commit()
+            equipos_guardados += len(nuevos_ids)
+            miembros_guardados += len(filas)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return equipos_guardados, miembros_guardados
+
+
+def cargar_equipo(connection, team_id):
+    """Equipo guardado como dict con la lista `miembros` de unique_id por posición (None si no existe)"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT id, name, description, allow_megas, allow_legendaries, created_at FROM teams WHERE id = %s",
+            (int(team_id),)
+        )
+        fila = cursor.fetchone()
+        if fila is None:
+            return None
+        cursor.execute(
+            "SELECT pokemon_unique_id, nickname FROM team_members WHERE team_id = %s ORDER BY position",
+            (int(team_id),)
+        )
+        miembros = cursor.fetchall()
+    finally:
+        cursor.close()
+    return {
+        'id': fila[0],
+        'name': fila[1],
+        'description': fila[2],
+        'allow_megas': bool(fila[3]),
+        'allow_legendaries': bool(fila[4]),
+        'created_at': fila[5],
+        'miembros': [uid for uid, _ in miembros],
+        'apodos': [apodo for _, apodo in miembros],
+    }
+
+
+def listar_equipos(connection, limite=50):
+    """Los equipos más recientes con su número de miembros, como DataFrame"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(SQL_LISTAR_EQUIPOS, (int(limite),))
+        filas = cursor.fetchall()
+    finally:
+        cursor.close()
+    return pd.DataFrame(filas, columns=['id', 'name', 'description', 'created_at', 'members'])
+
+
+def main():
+    """Función principal"""
+    from import_mejorado import conectar_bd  # Solo el importador por consola necesita la conexión de import
+
+    parser = argparse.ArgumentParser(description="Importar equipos (teams.csv + team_members.csv) por lotes")
+    parser.add_argument('teams', help="CSV con id, name, description, allow_megas, allow_legendaries")
+    parser.add_argument('team_members', help="CSV con team_id, pokemon_unique_id, position, nickname")
+    parser.add_argument('--lote', type=int, default=EQUIPOS_POR_LOTE, help="Equipos por transacción")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql',
+                        help="Base de datos destino (default: mysql)")
+    parser.add_argument('--sqlite-path', default=SQLITE_PATH_DEFAULT,
+                        help=f"Archivo de la base SQLite (default: {SQLITE_PATH_DEFAULT})")
+    args = parser.parse_args()
+
+    teams = pd.read_csv(args.teams)
+    team_members = pd.read_csv(args.team_members)
+    connection = conectar_bd(backend=args.backend, sqlite_path=args.sqlite_path)
+    if not connection:
+        sys.exit(1)
+
+    try:
+        inicio = time.perf_counter()
+        equipos, miembros = guardar_equipos(connection, teams, team_members, args.lote)
+        duracion = time.perf_counter() - inicio
+    except Exception as e:
+        print(f"❌ Error guardando equipos: {e}")
+        sys.exit(1)
+    finally:
+        connection.close()
+    print(f"✅ {equipos:,} equipos ({miembros:,} miembros) guardados en {duracion:.2f}s "
+          f"({equipos / max(duracion, 1e-9):,.0f} equipos/s)")
+
+
+if __name__ == "__main__":
+    main()
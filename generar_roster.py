@@ -0,0 +1,243 @@
+# =====================================================
+# GENERADOR DE ROSTER SINTÉTICO - POKÉMON TEAM BUILDER
+# Rosters de cualquier tamaño (1M+ filas) con semilla, para pruebas de escala
+# =====================================================
+#
+# Uso:
+#   python generar_roster.py --filas 1000000 --equipos 100000 --semilla 42
+#   python import_mejorado.py --backend sqlite --csv datos_sinteticos/Pokemon.csv
+#   python puntuar_equipos.py datos_sinteticos/equipos.jsonl -o scores.csv
+#
+# Escribe en --directorio:
+#   Pokemon.csv        mismo esquema que el Pokemon.csv original
+#   teams.csv          filas para la tabla teams (id, name, description, ...)
+#   team_members.csv   filas para team_members (unique_id = fila del CSV + 1)
+#   equipos.jsonl      los mismos equipos en el formato de puntuar_equipos.py
+#
+# Las distribuciones de tipos, generaciones, legendarios y stats se toman de las
+# especies base del Pokemon.csv real; las formas usan sus mismos patrones de nombre.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS_CSV = ['#', 'Name', 'Type 1', 'Type 2', 'Total', 'HP', 'Attack', 'Defense',
+                'Sp. Atk', 'Sp. Def', 'Speed', 'Generation', 'Legendary']
+COLUMNAS_STATS = ['HP', 'Attack', 'Defense', 'Sp. Atk', 'Sp. Def', 'Speed']
+
+# Filas de Pokemon.csv que no son especies base (Mega, Primal, regionales y formas con Forme/Size)
+PATRON_FORMAS = r'Mega |Primal |Alolan |Galarian |Forme|Size|Confined|Unbound'
+
+SILABAS = [
+    'ba', 'bu', 'char', 'da', 'dra', 'ee', 'fla', 'ga', 'geo', 'gro', 'hoo', 'ji',
+    'ka', 'ki', 'lu', 'ma', 'mew', 'na', 'no', 'on', 'pi', 'po', 'qua', 'ra',
+    'ri', 'sa', 'sco', 'sha', 'ta', 'to', 'tyr', 'va', 'vo', 'wa', 'xa', 'zu',
+]
+
+# Familia de formas de cada especie y su probabilidad (proporciones del CSV real,
+# más formas regionales que el original no trae)
+FAMILIAS = ['ninguna', 'mega', 'mega_xy', 'primal', 'regional', 'forme', 'size']
+PROBABILIDADES = [0.878, 0.058, 0.003, 0.003, 0.040, 0.015, 0.003]
+
+FORMES = ['Normal', 'Attack', 'Defense', 'Speed', 'Altered', 'Origin', 'Incarnate', 'Therian']
+TAMANOS = ['Average', 'Small', 'Large', 'Super']
+REGIONES = ['Alolan', 'Galarian']
+
+# Stats extra de una Mega/Primal: +100 en total como en los juegos
+BONUS_MEGA = np.array([0, 30, 20, 30, 0, 20])
+
+
+def nombre_especie(numero):
+    """Nombre inventado y único para el número de especie (biyección a sílabas)"""
+    partes = []
+    n = numero + len(SILABAS)  # Al menos dos sílabas
+    while n:
+        n, resto = divmod(n, len(SILABAS))
+        partes.append(SILABAS[resto])
+    return ''.join(reversed(partes)).capitalize()
+
+
+def cargar_plantillas(archivo='Pokemon.csv'):
+    """Especies base del CSV real: de ellas se muestrean tipos, stats y generación"""
+    df = pd.read_csv(archivo)
+    df.columns = df.columns.str.strip()
+    return df[~df['Name'].str.contains(PATRON_FORMAS, na=False)].reset_index(drop=True)
+
+
+def _formas(familia, base, rng):
+    """Sufijos de nombre y tipo de forma de las filas de una especie"""
+    if familia == 'ninguna':
+        return [('', 'base')]
+    if familia == 'mega':
+        return [('', 'base'), (f'Mega {base}', 'mega')]
+    if familia == 'mega_xy':
+        return [('', 'base'), (f'Mega {base} X', 'mega'), (f'Mega {base} Y', 'mega')]
+    if familia == 'primal':
+        return [('', 'base'), (f'Primal {base}', 'mega')]
+    if familia == 'regional':
+        return [('', 'base'), (f'{REGIONES[rng.integers(len(REGIONES))]} {base}', 'regional')]
+    if familia == 'forme':
+        elegidas = rng.choice(FORMES, size=rng.integers(2, 5), replace=False)
+        return [(f'{forme} Forme', 'forme') for forme in elegidas]
+    return [(f'{tamano} Size', 'forme') for tamano in TAMANOS]
+
+
+def generar_roster(filas, semilla=0, plantillas=None):
+    """DataFrame con `filas` Pokémon en el esquema de Pokemon.csv"""
+    if plantillas is None:
+        plantillas = cargar_plantillas()
+    rng = np.random.default_rng(semilla)
+
+    # Especies de sobra: la media de filas por especie es ~1.13
+    especies = int(filas / 1.1) + 16
+    familias = rng.choice(len(FAMILIAS), size=especies, p=PROBABILIDADES)
+
+    numeros, nombres, tipos_forma = [], [], []
+    for especie, familia in enumerate(familias):
+        base = nombre_especie(especie)
+        for sufijo, tipo_forma in _formas(FAMILIAS[familia], base, rng):
+            numeros.append(especie)
+            nombres.append(base + sufijo)
+            tipos_forma.append(tipo_forma)
+        if len(numeros) >= filas:
+            break
+    numeros = np.array(numeros[:filas])
+    tipos_forma = np.array(tipos_forma[:filas])
+    nombres = nombres[:filas]
+
+    # Cada especie copia tipos, generación, legendario y stats de una especie real
+    plantilla = rng.integers(len(plantillas), size=numeros.max() + 1)[numeros]
+    fila_plantilla = plantillas.iloc[plantilla]
+    tipo1 = fila_plantilla['Type 1'].to_numpy(dtype=object)
+    tipo2 = fila_plantilla['Type 2'].to_numpy(dtype=object)
+
+    # Variación por especie (compartida por sus formas) y por fila
+    ruido = (rng.lognormal(0, 0.08, size=(numeros.max() + 1, len(COLUMNAS_STATS)))[numeros]
+             * rng.lognormal(0, 0.03, size=(len(numeros), len(COLUMNAS_STATS))))
+    stats = fila_plantilla[COLUMNAS_STATS].to_numpy(dtype=np.float64) * ruido
+
+    es_mega = tipos_forma == 'mega'
+    stats[es_mega] += BONUS_MEGA
+    stats = np.clip(np.rint(stats), 5, 255).astype(np.int64)
+
+    # Algunas Megas y todas las formas regionales cambian el segundo tipo
+    otro_tipo = plantillas['Type 1'].to_numpy(dtype=object)[rng.integers(len(plantillas), size=len(numeros))]
+    cambia = ((es_mega & (rng.random(len(numeros)) < 0.25)) | (tipos_forma == 'regional')) & (otro_tipo != tipo1)
+    tipo2 = np.where(cambia, otro_tipo, tipo2)
+
+    df = pd.DataFrame({
+        '#': numeros + 1,
+        'Name': nombres,
+        'Type 1': tipo1,
+        'Type 2': tipo2,
+        'Total': stats.sum(axis=1),
+        **{columna: stats[:, i] for i, columna in enumerate(COLUMNAS_STATS)},
+        'Generation': fila_plantilla['Generation'].to_numpy(),
+        'Legendary': fila_plantilla['Legendary'].to_numpy(),
+    })
+    return df[COLUMNAS_CSV]
+
+
+def generar_equipos(roster, cantidad, semilla=0):
+    """Equipos de 1 a 6 miembros sin repetir Pokémon, respetando allow_megas/allow_legendaries.
+
+    Lanza ValueError si el roster no tiene ningún Pokémon permitido para alguna combinación.
+
+    Devuelve (teams, team_members) con las columnas de esas tablas; pokemon_unique_id
+    es la fila del roster + 1, el id que asigna AUTO_INCREMENT en una importación limpia.
+    """
+    rng = np.random.default_rng(semilla + 1)
+    es_mega = roster['Name'].str.contains(r'Mega |Primal ', na=False).to_numpy()
+    es_legendario = roster['Legendary'].astype(bool).to_numpy()
+
+    allow_megas = rng.random(cantidad) < 0.7
+    allow_legendaries = rng.random(cantidad) < 0.4
+    tamanos = rng.choice([1, 2, 3, 4, 5, 6], size=cantidad, p=[0.02, 0.03, 0.05, 0.1, 0.1, 0.7])
+
+    miembros = np.zeros((cantidad, 6), dtype=np.int64)
+    for megas in (False, True):
+        for legendarios in (False, True):
+            permitidos = np.flatnonzero((megas | ~es_mega) & (legendarios | ~es_legendario))
+            equipos = np.flatnonzero((allow_megas == megas) & (allow_legendaries == legendarios))
+            if not len(equipos):
+                continue
+            if not len(permitidos):
+                raise ValueError(f"El roster no tiene Pokémon válidos para equipos con "
+                                 f"allow_megas={megas} y allow_legendaries={legendarios}")
+            # Con menos de 6 Pokémon permitidos los equipos se quedan en ese tamaño
+            m = min(6, len(permitidos))
+            tamanos[equipos] = np.minimum(tamanos[equipos], m)
+            # Muestreo sin reemplazo de Floyd, vectorizado por equipo: en el paso j se sortea
+            # en [0, j] y si sale uno ya elegido se toma j; luego se baraja el orden de cada fila
+            elegidos = np.empty((len(equipos), m), dtype=np.int64)
+            for c, j in enumerate(range(len(permitidos) - m, len(permitidos))):
+                sorteo = rng.integers(j + 1, size=len(equipos))
+                repetido = (elegidos[:, :c] == sorteo[:, None]).any(axis=1)
+                elegidos[:, c] = np.where(repetido, j, sorteo)
+            miembros[equipos, :m] = permitidos[rng.permuted(elegidos, axis=1)]
+
+    ids = np.arange(1, cantidad + 1)
+    teams = pd.DataFrame({
+        'id': ids,
+        'name': [f'Equipo Sintético {i}' for i in ids],
+        'description': 'Generado por generar_roster.py',
+        'allow_megas': allow_megas,
+        'allow_legendaries': allow_legendaries,
+    })
+
+    posiciones = np.arange(1, 7)
+    usados = posiciones <= tamanos[:, None]  # (cantidad, 6)
+    team_members = pd.DataFrame({
+        'team_id': np.repeat(ids, 6)[usados.ravel()],
+        'pokemon_unique_id': (miembros + 1).ravel()[usados.ravel()],
+        'position': np.tile(posiciones, cantidad)[usados.ravel()],
+        'nickname': None,
+    })
+    return teams, team_members
+
+
+def escribir_equipos_jsonl(ruta, teams, team_members):
+    """Los equipos como JSONL para puntuar_equipos.py (miembros por unique_id)"""
+    miembros = team_members.groupby('team_id', sort=True)['pokemon_unique_id'].agg(list)
+    with open(ruta, 'w', encoding='utf-8') as salida:
+        for nombre, lista in zip(teams['name'], miembros.reindex(teams['id'])):
+            salida.write(json.dumps({'team': nombre, 'members': lista}) + '\n')
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Generar un roster sintético y equipos para pruebas de escala")
+    parser.add_argument('--filas', type=int, default=1_000_000, help="Filas de Pokémon a generar")
+    parser.add_argument('--equipos', type=int, default=10_000, help="Equipos a generar")
+    parser.add_argument('--semilla', type=int, default=0, help="Semilla (misma semilla, mismos datos)")
+    parser.add_argument('--directorio', default='datos_sinteticos', help="Directorio de salida")
+    args = parser.parse_args()
+
+    os.makedirs(args.directorio, exist_ok=True)
+    inicio = time.perf_counter()
+
+    roster = generar_roster(args.filas, args.semilla)
+    ruta_roster = os.path.join(args.directorio, 'Pokemon.csv')
+    roster.to_csv(ruta_roster, index=False)
+    print(f"✅ {len(roster):,} Pokémon ({roster['#'].nunique():,} especies) en {ruta_roster}")
+
+    try:
+        teams, team_members = generar_equipos(roster, args.equipos, args.semilla)
+    except ValueError as e:
+        print(f"❌ No se pudieron generar los equipos: {e}")
+        sys.exit(1)
+    teams.to_csv(os.path.join(args.directorio, 'teams.csv'), index=False)
+    team_members.to_csv(os.path.join(args.directorio, 'team_members.csv'), index=False)
+    escribir_equipos_jsonl(os.path.join(args.directorio, 'equipos.jsonl'), teams, team_members)
+    print(f"✅ {len(teams):,} equipos ({len(team_members):,} miembros) en {args.directorio}")
+
+    print(f"⏱️  Generado en {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
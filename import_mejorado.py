@@ -6,9 +6,23 @@
 import pandas as pd
 import mysql.connector
 from mysql.connector import Error
+import sqlite3
 import numpy as np
 import sys
 import os
+import argparse
+import hashlib
+import tempfile
+import threading
+import time
+import queue
+from datetime import datetime
+from almacenamiento import (ConexionSQLite, OBJETOS_SQLITE, SQLITE_PATH_DEFAULT, SQL_EFECTIVIDAD,
+                            crear_esquema_sqlite, es_sqlite)
+from medicion_pasos import MedicionPasos
+from actividad import RETENCION_DIAS_DEFAULT, mantener_actividad
+from motor_tipos import TIPOS, FIRMAS, ID_TIPO, SIN_TIPO, MotorTipos, firmas_dataframe, id_tipo
+from ranking_poder import ranking_poder
 
 # Configuración de la base de datos
 DB_CONFIG = {
@@ -18,9 +32,12 @@ DB_CONFIG = {
     'database': 'pokemon_team_builder'
 }
 
-def verificar_archivos():
+# Errores de cualquiera de los dos backends (MySQL o SQLite embebido)
+ErroresBD = (Error, sqlite3.Error)
+
+def verificar_archivos(archivo_pokemon='Pokemon.csv'):
     """Verificar que los archivos CSV existan"""
-    archivos_requeridos = ['Pokemon.csv', 'Tabla de tipos.csv']
+    archivos_requeridos = [archivo_pokemon, 'Tabla de tipos.csv']
     archivos_faltantes = []
     
     for archivo in archivos_requeridos:
@@ -30,46 +47,85 @@ def verificar_archivos():
     if archivos_faltantes:
         print(f"❌ Archivos faltantes: {', '.join(archivos_faltantes)}")
         print("📁 Asegúrate de que los archivos estén en el directorio actual:")
-        print("   - Pokemon.csv")
+        print(f"   - {archivo_pokemon}")
         print("   - Tabla de tipos.csv")
         return False
     
     print("✅ Todos los archivos CSV encontrados!")
     return True
 
-def conectar_bd():
+def conectar_bd(load_data=False, backend='mysql', sqlite_path=SQLITE_PATH_DEFAULT):
     """Establecer conexión con la base de datos"""
+    if backend == 'sqlite':
+        try:
+            connection = ConexionSQLite(sqlite_path)
+            print(f"✅ Base de datos SQLite abierta: {sqlite_path}")
+            return connection
+        except ErroresBD as e:
+            print(f"❌ Error abriendo SQLite: {e}")
+            return None
+    
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
+        # LOAD DATA LOCAL INFILE requiere habilitarlo también en el cliente
+        connection = mysql.connector.connect(**DB_CONFIG, allow_local_infile=load_data)
         print("✅ Conexión exitosa a MySQL")
         return connection
-    except Error as e:
+    except ErroresBD as e:
         print(f"❌ Error conectando a MySQL: {e}")
         return None
 
-def ejecutar_sql_completo(connection):
+def ejecutar_sql_completo(connection, incremental=False):
     """Ejecutar todo el código SQL de estructura"""
     try:
         cursor = connection.cursor()
         
         print("🔧 Creando estructura de base de datos...")
         
-        # Leer el archivo SQL si existe, o usar código embebido
-        sql_commands = """
-        -- Eliminar base de datos existente y crear nueva
-        DROP DATABASE IF EXISTS pokemon_team_builder;
-        CREATE DATABASE pokemon_team_builder;
-        USE pokemon_team_builder;
+        # CREATE TABLE IF NOT EXISTS no migra una base creada antes del catálogo de tipos
+        if incremental and _tipos_como_texto(connection):
+            print("❌ La base usa el esquema anterior (tipos como texto): "
+                  "ejecuta una importación completa sin --incremental")
+            return False
+        
+        if es_sqlite(connection):
+            crear_esquema_sqlite(connection, reiniciar=not incremental)
+            connection.commit()
+            print("✅ Estructura de base de datos SQLite creada exitosamente!")
+            return importar_tipos(connection)
+        
+        if incremental:
+            # Conservar la base existente (teams, team_members, activity_log)
+            sql_header = """
+            CREATE DATABASE IF NOT EXISTS pokemon_team_builder;
+            USE pokemon_team_builder;
+            """
+        else:
+            sql_header = """
+            -- Eliminar base de datos existente y crear nueva
+            DROP DATABASE IF EXISTS pokemon_team_builder;
+            CREATE DATABASE pokemon_team_builder;
+            USE pokemon_team_builder;
+            """
         
+        # Leer el archivo SQL si existe, o usar código embebido
+        sql_commands = sql_header + """
         -- Crear todas las tablas
-        CREATE TABLE pokemon (
+        -- Catálogo de tipos: el resto de tablas referencian su id (TINYINT)
+        CREATE TABLE IF NOT EXISTS types (
+            id TINYINT UNSIGNED PRIMARY KEY,
+            name VARCHAR(20) NOT NULL,
+            
+            UNIQUE KEY unique_type_name (name)
+        );
+        
+        CREATE TABLE IF NOT EXISTS pokemon (
             unique_id INT PRIMARY KEY AUTO_INCREMENT,
             pokedex_number INT NOT NULL,
             name VARCHAR(100) NOT NULL,
             base_name VARCHAR(50) NOT NULL,
             form_type ENUM('base', 'mega', 'primal', 'regional', 'special') DEFAULT 'base',
-            type1 VARCHAR(20) NOT NULL,
-            type2 VARCHAR(20) NULL,
+            type1_id TINYINT UNSIGNED NOT NULL,
+            type2_id TINYINT UNSIGNED NULL,
             total_stats INT NOT NULL,
             hp INT NOT NULL,
             attack INT NOT NULL,
@@ -81,27 +137,86 @@ def ejecutar_sql_completo(connection):
             legendary BOOLEAN NOT NULL DEFAULT FALSE,
             is_alternate BOOLEAN DEFAULT FALSE,
             origin_region VARCHAR(20) DEFAULT 'Kanto',
+            signature_id SMALLINT NULL,
+            row_hash CHAR(40) NULL,
             
+            UNIQUE KEY unique_name (name),
             INDEX idx_pokedex (pokedex_number),
             INDEX idx_base_name (base_name),
             INDEX idx_form_type (form_type),
-            INDEX idx_type1 (type1),
+            INDEX idx_type1 (type1_id),
+            INDEX idx_type2 (type2_id),
             INDEX idx_generation (generation),
-            INDEX idx_legendary (legendary)
+            INDEX idx_legendary (legendary),
+            INDEX idx_signature (signature_id),
+            FOREIGN KEY (type1_id) REFERENCES types(id),
+            FOREIGN KEY (type2_id) REFERENCES types(id)
         );
         
-        CREATE TABLE type_effectiveness (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            attacking_type VARCHAR(20) NOT NULL,
-            defending_type VARCHAR(20) NOT NULL,
+        -- Un registro por tipo de cada Pokémon: buscar por tipo es un rango del índice
+        -- (type_id, total_stats) en vez de un OR entre type1_id y type2_id
+        CREATE TABLE IF NOT EXISTS pokemon_types (
+            pokemon_unique_id INT NOT NULL,
+            slot TINYINT UNSIGNED NOT NULL,
+            type_id TINYINT UNSIGNED NOT NULL,
+            total_stats INT NOT NULL,
+            
+            PRIMARY KEY (pokemon_unique_id, slot),
+            INDEX idx_type_stats (type_id, total_stats, pokemon_unique_id),
+            FOREIGN KEY (pokemon_unique_id) REFERENCES pokemon(unique_id) ON DELETE CASCADE,
+            FOREIGN KEY (type_id) REFERENCES types(id)
+        );
+        
+        -- Ranking de poder materializado: leer el top N es recorrer N entradas de idx_power_rank
+        CREATE TABLE IF NOT EXISTS pokemon_power_ranking (
+            unique_id INT PRIMARY KEY,
+            power_level DECIMAL(6,2) NOT NULL,
+            power_rank INT NOT NULL,
+            
+            INDEX idx_power_rank (power_rank),
+            FOREIGN KEY (unique_id) REFERENCES pokemon(unique_id) ON DELETE CASCADE
+        );
+        
+        CREATE TABLE IF NOT EXISTS type_effectiveness (
+            attacking_type_id TINYINT UNSIGNED NOT NULL,
+            defending_type_id TINYINT UNSIGNED NOT NULL,
             effectiveness DECIMAL(3,2) NOT NULL,
             
-            INDEX idx_attacking (attacking_type),
-            INDEX idx_defending (defending_type),
-            UNIQUE KEY unique_type_combination (attacking_type, defending_type)
+            PRIMARY KEY (attacking_type_id, defending_type_id),
+            INDEX idx_defending (defending_type_id),
+            FOREIGN KEY (attacking_type_id) REFERENCES types(id),
+            FOREIGN KEY (defending_type_id) REFERENCES types(id)
         );
         
-        CREATE TABLE teams (
+        -- 171 firmas de tipo (18 simples + 153 dobles) con su perfil defensivo
+        CREATE TABLE IF NOT EXISTS type_signatures (
+            id SMALLINT PRIMARY KEY,
+            type1_id TINYINT UNSIGNED NOT NULL,
+            type2_id TINYINT UNSIGNED NULL,
+            
+            UNIQUE KEY unique_signature (type1_id, type2_id),
+            FOREIGN KEY (type1_id) REFERENCES types(id),
+            FOREIGN KEY (type2_id) REFERENCES types(id)
+        );
+        
+        CREATE TABLE IF NOT EXISTS type_signature_profiles (
+            signature_id SMALLINT NOT NULL,
+            attacking_type_id TINYINT UNSIGNED NOT NULL,
+            multiplier DECIMAL(4,2) NOT NULL,
+            
+            PRIMARY KEY (signature_id, attacking_type_id),
+            FOREIGN KEY (signature_id) REFERENCES type_signatures(id) ON DELETE CASCADE,
+            FOREIGN KEY (attacking_type_id) REFERENCES types(id)
+        );
+        
+        -- Versión de los datos: la app invalida su caché cuando cambia
+        CREATE TABLE IF NOT EXISTS data_version (
+            id TINYINT PRIMARY KEY,
+            version VARCHAR(40) NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        );
+        
+        CREATE TABLE IF NOT EXISTS teams (
             id INT PRIMARY KEY AUTO_INCREMENT,
             name VARCHAR(100) NOT NULL,
             description TEXT,
@@ -115,7 +230,7 @@ def ejecutar_sql_completo(connection):
             CONSTRAINT chk_team_name_length CHECK (CHAR_LENGTH(name) >= 3)
         );
         
-        CREATE TABLE team_members (
+        CREATE TABLE IF NOT EXISTS team_members (
             id INT PRIMARY KEY AUTO_INCREMENT,
             team_id INT NOT NULL,
             pokemon_unique_id INT NOT NULL,
@@ -131,17 +246,35 @@ def ejecutar_sql_completo(connection):
             INDEX idx_pokemon (pokemon_unique_id)
         );
         
-        CREATE TABLE activity_log (
-            id INT PRIMARY KEY AUTO_INCREMENT,
+        -- Particionada por día: actividad.py agrega particiones por adelantado y borra
+        -- las vencidas con DROP PARTITION, así los índices solo crecen hasta la retención
+        CREATE TABLE IF NOT EXISTS activity_log (
+            id INT NOT NULL AUTO_INCREMENT,
             table_name VARCHAR(50) NOT NULL,
             action_type ENUM('INSERT', 'UPDATE', 'DELETE') NOT NULL,
             record_id INT NOT NULL,
             old_values JSON,
             new_values JSON,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
             
+            PRIMARY KEY (id, timestamp),
             INDEX idx_table_action (table_name, action_type),
             INDEX idx_timestamp (timestamp)
+        )
+        PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (
+            PARTITION p_futuro VALUES LESS THAN MAXVALUE
+        );
+        
+        -- Resumen diario de las entradas de activity_log ya compactadas
+        CREATE TABLE IF NOT EXISTS activity_log_daily (
+            day DATE NOT NULL,
+            table_name VARCHAR(50) NOT NULL,
+            action_type ENUM('INSERT', 'UPDATE', 'DELETE') NOT NULL,
+            entries INT NOT NULL,
+            first_id INT NOT NULL,
+            last_id INT NOT NULL,
+            
+            PRIMARY KEY (day, table_name, action_type)
         );
         """
         
@@ -153,22 +286,73 @@ def ejecutar_sql_completo(connection):
         connection.commit()
         print("✅ Estructura de base de datos creada exitosamente!")
         
-    except Error as e:
+    except ErroresBD as e:
         print(f"❌ Error creando estructura: {e}")
         return False
     
-    return True
+    return importar_tipos(connection)
+
+def _tipos_como_texto(connection):
+    """True si la tabla pokemon existe con el esquema anterior (type1/type2 como texto)"""
+    cursor = connection.cursor()
+    if es_sqlite(connection):
+        cursor.execute("SELECT name FROM pragma_table_info('pokemon')")
+    else:
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = 'pokemon_team_builder' AND TABLE_NAME = 'pokemon'
+        """)
+    columnas = {fila[0] for fila in cursor.fetchall()}
+    return bool(columnas) and 'type1_id' not in columnas
+
+def importar_tipos(connection):
+    """Llenar el catálogo `types` (ids TINYINT que usan pokemon y type_effectiveness)"""
+    try:
+        cursor = connection.cursor()
+        cursor.executemany(
+            "INSERT INTO types (id, name) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE name = VALUES(name)",
+            [(ID_TIPO[tipo], tipo) for tipo in TIPOS]
+        )
+        connection.commit()
+        print(f"✅ Catálogo de {len(TIPOS)} tipos listo!")
+        
+        return True
+        
+    except ErroresBD as e:
+        print(f"❌ Error creando el catálogo de tipos: {e}")
+        return False
 
 def crear_vistas_y_procedimientos(connection):
-    """Crear vistas, triggers y procedimientos"""
+    """Crear vistas y procedimientos"""
     try:
         cursor = connection.cursor()
         
-        print("🔧 Creando vistas, triggers y procedimientos...")
+        print("🔧 Creando vistas y procedimientos...")
+        
+        if es_sqlite(connection):
+            # SQLite no tiene funciones ni procedimientos: vistas equivalentes
+            connection.executescript(OBJETOS_SQLITE)
+            connection.commit()
+            print("✅ Vistas de SQLite creadas exitosamente!")
+            return True
+        
+        # Vista 0: Pokémon con los nombres de sus tipos (la tabla guarda los ids)
+        cursor.execute("""
+        CREATE OR REPLACE VIEW vw_pokemon AS
+        SELECT 
+            p.unique_id, p.pokedex_number, p.name, p.base_name, p.form_type,
+            t1.name as type1, t2.name as type2, p.type1_id, p.type2_id,
+            p.total_stats, p.hp, p.attack, p.defense, p.sp_attack, p.sp_defense, p.speed,
+            p.generation, p.legendary, p.is_alternate, p.origin_region, p.signature_id
+        FROM pokemon p
+        JOIN types t1 ON t1.id = p.type1_id
+        LEFT JOIN types t2 ON t2.id = p.type2_id;
+        """)
         
         # Vista 1: Mega Evoluciones
         cursor.execute("""
-        CREATE VIEW vw_mega_evolutions AS
+        CREATE OR REPLACE VIEW vw_mega_evolutions AS
         SELECT 
             base.base_name,
             base.name as base_form,
@@ -181,33 +365,34 @@ def crear_vistas_y_procedimientos(connection):
             base.type2 as base_type2,
             mega.type1 as mega_type1,
             mega.type2 as mega_type2
-        FROM pokemon base
-        JOIN pokemon mega ON base.pokedex_number = mega.pokedex_number
+        FROM vw_pokemon base
+        JOIN vw_pokemon mega ON base.pokedex_number = mega.pokedex_number
         WHERE base.form_type = 'base' AND mega.form_type = 'mega'
         ORDER BY power_increase DESC;
         """)
         
         # Vista 2: Pokémon tipo fuego
         cursor.execute("""
-        CREATE VIEW vw_fire_type_fighters AS
+        CREATE OR REPLACE VIEW vw_fire_type_fighters AS
         SELECT 
-            unique_id,
-            name,
-            form_type,
-            type1,
-            type2,
-            attack,
-            sp_attack,
-            total_stats,
-            generation,
-            legendary,
+            p.unique_id,
+            p.name,
+            p.form_type,
+            p.type1,
+            p.type2,
+            p.attack,
+            p.sp_attack,
+            p.total_stats,
+            p.generation,
+            p.legendary,
             CASE 
-                WHEN attack > sp_attack THEN 'Physical'
-                WHEN sp_attack > attack THEN 'Special'
+                WHEN p.attack > p.sp_attack THEN 'Physical'
+                WHEN p.sp_attack > p.attack THEN 'Special'
                 ELSE 'Balanced'
             END as attack_style
-        FROM pokemon 
-        WHERE type1 = 'Fire' OR type2 = 'Fire'
+        FROM vw_pokemon p
+        JOIN types fuego ON fuego.name = 'Fire'
+        WHERE p.type1_id = fuego.id OR p.type2_id = fuego.id
         HAVING attack >= 80 OR sp_attack >= 80
         ORDER BY GREATEST(attack, sp_attack) DESC;
         """)
@@ -244,54 +429,29 @@ def crear_vistas_y_procedimientos(connection):
         END;
         """)
         
-        # Vista 3: Ranking de power level
+        # Vista 3: Ranking de power level (lee la tabla materializada por el import)
         cursor.execute("""
-        CREATE VIEW vw_pokemon_power_ranking AS
+        CREATE OR REPLACE VIEW vw_pokemon_power_ranking AS
         SELECT 
-            unique_id,
-            name,
-            base_name,
-            form_type,
-            type1,
-            type2,
-            total_stats,
-            legendary,
-            generation,
-            fn_calculate_power_level(total_stats, legendary, form_type) as power_level,
-            RANK() OVER (ORDER BY fn_calculate_power_level(total_stats, legendary, form_type) DESC) as power_rank
-        FROM pokemon
-        ORDER BY power_level DESC;
+            p.unique_id,
+            p.name,
+            p.base_name,
+            p.form_type,
+            p.type1,
+            p.type2,
+            p.total_stats,
+            p.legendary,
+            p.generation,
+            r.power_level,
+            r.power_rank
+        FROM pokemon_power_ranking r
+        JOIN vw_pokemon p ON p.unique_id = r.unique_id
+        ORDER BY r.power_rank, r.unique_id;
         """)
         
-        # Trigger
+        # El registro de team_members en activity_log lo escribe equipos.py por lotes
+        # (un INSERT ... SELECT por transacción); el trigger fila por fila se elimina
         cursor.execute("DROP TRIGGER IF EXISTS tr_team_activity_log;")
-        cursor.execute("""
-        CREATE TRIGGER tr_team_activity_log
-            AFTER INSERT ON team_members
-            FOR EACH ROW
-        BEGIN
-            DECLARE team_name VARCHAR(100);
-            DECLARE pokemon_name VARCHAR(100);
-            
-            SELECT t.name INTO team_name FROM teams t WHERE t.id = NEW.team_id;
-            SELECT p.name INTO pokemon_name FROM pokemon p WHERE p.unique_id = NEW.pokemon_unique_id;
-            
-            INSERT INTO activity_log (table_name, action_type, record_id, new_values)
-            VALUES (
-                'team_members',
-                'INSERT',
-                NEW.id,
-                JSON_OBJECT(
-                    'team_id', NEW.team_id,
-                    'team_name', team_name,
-                    'pokemon_unique_id', NEW.pokemon_unique_id,
-                    'pokemon_name', pokemon_name,
-                    'position', NEW.position,
-                    'nickname', NEW.nickname
-                )
-            );
-        END;
-        """)
         
         # Procedimiento almacenado 1
         cursor.execute("DROP PROCEDURE IF EXISTS sp_find_pokemon_by_type;")
@@ -301,21 +461,28 @@ def crear_vistas_y_procedimientos(connection):
             IN p_min_stats INT
         )
         BEGIN
+            DECLARE v_type_id TINYINT UNSIGNED;
+            
+            -- Comparar ids enteros en vez de nombres
+            SELECT id INTO v_type_id FROM types WHERE name = p_type;
+            
+            -- Rango en idx_type_stats; solo las filas encontradas se buscan en pokemon
             SELECT 
-                unique_id,
-                name,
-                form_type,
-                type1,
-                type2,
-                total_stats,
-                attack,
-                sp_attack,
-                legendary,
-                generation
-            FROM pokemon 
-            WHERE (type1 = p_type OR type2 = p_type) 
-            AND total_stats >= p_min_stats
-            ORDER BY total_stats DESC, name;
+                p.unique_id,
+                p.name,
+                p.form_type,
+                p.type1,
+                p.type2,
+                p.total_stats,
+                p.attack,
+                p.sp_attack,
+                p.legendary,
+                p.generation
+            FROM pokemon_types pt
+            JOIN vw_pokemon p ON p.unique_id = pt.pokemon_unique_id
+            WHERE pt.type_id = v_type_id
+            AND pt.total_stats >= p_min_stats
+            ORDER BY p.total_stats DESC, p.name;
         END;
         """)
         
@@ -354,78 +521,119 @@ def crear_vistas_y_procedimientos(connection):
                 p.legendary,
                 tm.nickname
             FROM team_members tm
-            JOIN pokemon p ON tm.pokemon_unique_id = p.unique_id
+            JOIN vw_pokemon p ON tm.pokemon_unique_id = p.unique_id
             WHERE tm.team_id = p_team_id
             ORDER BY tm.position;
         END;
         """)
         
         connection.commit()
-        print("✅ Vistas, triggers y procedimientos creados exitosamente!")
+        print("✅ Vistas y procedimientos creados exitosamente!")
         
-    except Error as e:
+    except ErroresBD as e:
         print(f"❌ Error creando objetos SQL: {e}")
         return False
     
     return True
 
-def procesar_pokemon_data():
+# Columnas del CSV original y su nombre en la tabla pokemon
+COLUMNAS_CSV = {
+    '#': 'pokedex_number',
+    'Name': 'name',
+    'Type 1': 'type1',
+    'Type 2': 'type2',
+    'Total': 'total_stats',
+    'HP': 'hp',
+    'Attack': 'attack',
+    'Defense': 'defense',
+    'Sp. Atk': 'sp_attack',
+    'Sp. Def': 'sp_defense',
+    'Speed': 'speed',
+    'Generation': 'generation',
+    'Legendary': 'legendary'
+}
+# Clasificador de formas con una sola regex. El CSV pega el nombre de la especie y el de
+# la forma ("VenusaurMega Venusaur", "DeoxysAttack Forme"), así que la especie es lo que
+# va antes de la forma o, en las Mega/Primal/regionales, lo que va después de ella.
+# Distingue mayúsculas para no confundir "Meganium" o "Yanmega" con una Mega.
+# Solo usa sintaxis común a re y a RE2 (sin lookarounds ni modo verbose): con textos
+# Arrow, str.extract la ejecuta en C++ con pyarrow.compute.extract_regex.
+PATRON_FORMAS = (
+    r"^\s*(?:"
+    # Mega, Primal o regional: "VenusaurMega Venusaur", "CharizardMega Charizard X", "Alolan Raichu"
+    r".*?(?P<forma>Mega|Primal|Alolan|Galarian)\s(?P<especie>.+?)(?:\s[XY])?"
+    # Otra forma pegada a la especie: "HoopaHoopa Unbound", "RotomHeat Rotom", "MeowsticMale"
+    r"|(?P<base>.+?[a-z])(?:"
+    r"(?P<especial>Super\sSize|Attack\sForme|Defense\sForme|[A-Z]\S*\sConfined|[A-Z]\S*\sUnbound)"
+    r"|[A-Z0-9]\S*\s.+|Male|Female)"
+    # Sin forma: "Mr. Mime", "Mime Jr."
+    r"|(?P<nombre>.+?)"
+    r")\s*$"
+)
+# Toda forma que reconoce PATRON_FORMAS tiene un espacio o termina en Male/Female: los
+# demás nombres (casi todo el roster) no pasan por la regex
+SUFIJOS_SIN_ESPACIO = ('Male', 'Female')
+FORMAS = ['base', 'mega', 'primal', 'regional', 'special']
+TIPO_FORMA = {'Mega': 'mega', 'Primal': 'primal', 'Alolan': 'regional', 'Galarian': 'regional'}
+FILAS_POR_BLOQUE_CSV = 50000  # Filas que lee cada bloque en modo streaming
+LOTES_EN_COLA = 8  # Lotes ya convertidos que pueden esperar a ser insertados
+
+def clasificar_formas(nombres):
+    """(form_type, is_alternate, base_name) de cada nombre con un solo str.extract de PATRON_FORMAS.
+    
+    Solo son 'special' (y alternativas) las formas de siempre: Super Size, Confined, Unbound,
+    Attack Forme y Defense Forme; el resto de formas pegadas quedan como 'base' pero con
+    el nombre de la especie como base_name.
+    """
+    # Dos búsquedas literales, más baratas que cualquier regex sobre todo el roster
+    candidatos = (nombres.str.contains(' ', regex=False, na=False)
+                  | nombres.str.endswith(SUFIJOS_SIN_ESPACIO, na=False)).to_numpy()
+    texto = nombres[candidatos]
+    if getattr(texto.dtype, 'storage', None) == 'pyarrow':
+        import pyarrow as pa  # Solo existe si pandas guarda los textos en Arrow
+        # Mismo buffer, pero con ArrowDtype str.extract usa RE2 en C++ en vez de re fila por fila
+        texto = texto.astype(pd.ArrowDtype(pa.large_string()))
+    # RE2 devuelve '' en los grupos que no participan; ningún grupo puede capturar ''
+    partes = texto.str.extract(PATRON_FORMAS).replace('', None)
+    
+    tipos = partes['forma'].map(TIPO_FORMA)
+    tipos = tipos.mask(tipos.isna() & partes['especial'].notna(), 'special').fillna('base')
+    # Los que no son candidatos son 'base' con su propio nombre: solo se escriben los candidatos
+    codigos = np.zeros(len(nombres), dtype=np.int8)
+    codigos[candidatos] = pd.Categorical(tipos, categories=FORMAS).codes
+    form_type = pd.Series(np.asarray(FORMAS, dtype=object)[codigos], index=nombres.index, dtype=object)
+    base_name = nombres.copy()
+    base_name[candidatos] = partes['especie'].fillna(partes['base']).fillna(partes['nombre']).to_numpy(dtype=object)
+    return form_type, pd.Series(codigos != 0, index=nombres.index), base_name
+
+def procesar_bloque_pokemon(df):
+    """Categorizar un bloque del CSV: forma, nombre base, firma de tipo y región"""
+    # Limpiar nombres de columnas y renombrarlas
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns=COLUMNAS_CSV)
+    
+    df['form_type'], df['is_alternate'], df['base_name'] = clasificar_formas(df['name'])
+    
+    # Firma de tipo (id en type_signatures) para buscar el perfil defensivo
+    df['signature_id'] = firmas_dataframe(df)
+    
+    # Asignar región por generación
+    df['origin_region'] = df['generation'].map({
+        1: 'Kanto', 2: 'Johto', 3: 'Hoenn', 4: 'Sinnoh',
+        5: 'Unova', 6: 'Kalos', 7: 'Alola', 8: 'Galar'
+    }).fillna('Unknown')
+    
+    return df
+
+def procesar_pokemon_data(archivo='Pokemon.csv'):
     """Procesar y categorizar los datos de Pokémon"""
     try:
         print("📂 Cargando datos de Pokémon...")
-        df = pd.read_csv('Pokemon.csv')
+        df = pd.read_csv(archivo)
         
         print(f"📊 Dataset original: {len(df)} filas")
         
-        # Limpiar nombres de columnas
-        df.columns = df.columns.str.strip()
-        
-        # Renombrar columnas si es necesario
-        column_mapping = {
-            '#': 'pokedex_number',
-            'Name': 'name',
-            'Type 1': 'type1',
-            'Type 2': 'type2',
-            'Total': 'total_stats',
-            'HP': 'hp',
-            'Attack': 'attack',
-            'Defense': 'defense',
-            'Sp. Atk': 'sp_attack',
-            'Sp. Def': 'sp_defense',
-            'Speed': 'speed',
-            'Generation': 'generation',
-            'Legendary': 'legendary'
-        }
-        
-        df = df.rename(columns=column_mapping)
-        
-        # Procesar formas alternativas
-        df['form_type'] = 'base'
-        df['is_mega'] = df['name'].str.contains('Mega', na=False, case=False)
-        df['is_primal'] = df['name'].str.contains('Primal', na=False, case=False)
-        df['is_regional'] = df['name'].str.contains('Alolan|Galarian', na=False, case=False)
-        df['is_alternate'] = df['name'].str.contains('|'.join([
-            'Mega', 'Primal', 'Alolan', 'Galarian', 'Super Size', 
-            'Confined', 'Unbound', 'Attack Forme', 'Defense Forme'
-        ]), na=False, case=False)
-        
-        # Asignar tipos de forma
-        df.loc[df['is_mega'], 'form_type'] = 'mega'
-        df.loc[df['is_primal'], 'form_type'] = 'primal'
-        df.loc[df['is_regional'], 'form_type'] = 'regional'
-        df.loc[df['is_alternate'] & (df['form_type'] == 'base'), 'form_type'] = 'special'
-        
-        # Crear nombre base limpio
-        df['base_name'] = df['name'].str.replace(
-            r'Mega |Primal |Alolan |Galarian |Super Size|Confined|Unbound|Attack Forme|Defense Forme', 
-            '', regex=True
-        ).str.strip()
-        
-        # Asignar región por generación
-        df['origin_region'] = df['generation'].map({
-            1: 'Kanto', 2: 'Johto', 3: 'Hoenn', 4: 'Sinnoh',
-            5: 'Unova', 6: 'Kalos', 7: 'Alola', 8: 'Galar'
-        }).fillna('Unknown')
+        df = procesar_bloque_pokemon(df)
         
         # Estadísticas
         form_stats = df['form_type'].value_counts()
@@ -439,53 +647,212 @@ def procesar_pokemon_data():
         print(f"❌ Error procesando datos Pokémon: {e}")
         return None
 
-def importar_pokemon_data(connection, df):
-    """Importar datos de Pokémon a la base de datos"""
+def leer_pokemon_por_bloques(archivo='Pokemon.csv', filas_por_bloque=FILAS_POR_BLOQUE_CSV):
+    """Generador de bloques del CSV ya procesados: la memoria depende del bloque, no del archivo"""
+    with pd.read_csv(archivo, chunksize=filas_por_bloque) as lector:
+        for bloque in lector:
+            yield procesar_bloque_pokemon(bloque)
+
+def en_segundo_plano(bloques, max_pendientes=LOTES_EN_COLA):
+    """Consumir un generador desde un hilo aparte a través de una cola acotada.
+    
+    Mientras el llamador inserta un lote, el hilo ya prepara los siguientes (el driver
+    de la base suelta el GIL mientras espera a SQLite o a la red). La cola acotada
+    frena al lector si la base va más lenta, así la memoria no crece.
+    """
+    cola = queue.Queue(maxsize=max_pendientes)
+    detener = threading.Event()
+    fin = object()
+    
+    def poner(elemento):
+        # Con timeout para poder abandonar si el consumidor se detuvo
+        while not detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def producir():
+        try:
+            for bloque in bloques:
+                if not poner((bloque, None)):
+                    return
+            poner((fin, None))
+        except Exception as e:
+            poner((fin, e))
+    
+    hilo = threading.Thread(target=producir, name='lector-csv', daemon=True)
+    hilo.start()
+    try:
+        while True:
+            bloque, error = cola.get()
+            if bloque is fin:
+                if error is not None:
+                    raise error
+                return
+            yield bloque
+    finally:
+        detener.set()
+        hilo.join(timeout=5)
+
+# Columnas de la tabla pokemon en el orden en que se insertan
+COLUMNAS_POKEMON = [
+    'pokedex_number', 'name', 'base_name', 'form_type', 'type1_id', 'type2_id',
+    'total_stats', 'hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed',
+    'generation', 'legendary', 'is_alternate', 'origin_region', 'signature_id',
+    'row_hash'
+]
+
+def valores_pokemon(row):
+    """Convertir una fila procesada en la tupla de valores para INSERT (con su hash)"""
+    valores = (
+        int(row.pokedex_number),
+        str(row.name)[:100],  # Truncar si es muy largo
+        str(row.base_name)[:50],
+        row.form_type,
+        id_tipo(row.type1),
+        id_tipo(row.type2),
+        int(row.total_stats),
+        int(row.hp),
+        int(row.attack),
+        int(row.defense),
+        int(row.sp_attack),
+        int(row.sp_defense),
+        int(row.speed),
+        int(row.generation),
+        bool(row.legendary),
+        bool(row.is_alternate),
+        str(row.origin_region),
+        int(row.signature_id) if row.signature_id >= 0 else None
+    )
+    # El hash permite que la sincronización incremental detecte filas cambiadas
+    return valores + (hashlib.sha1(repr(valores).encode('utf-8')).hexdigest(),)
+
+def _insertar_lote(connection, cursor, insert_query, lote):
+    """Insertar un lote con executemany; si falla, fila por fila para reportar errores"""
+    try:
+        cursor.executemany(insert_query, [valores for _, valores in lote])
+        connection.commit()
+        return len(lote)
+    except ErroresBD:
+        connection.rollback()
+    
+    insertados = 0
+    for nombre, valores in lote:
+        try:
+            cursor.execute(insert_query, valores)
+            insertados += 1
+        except Exception as e:
+            print(f"⚠️ Error insertando {nombre}: {e}")
+    connection.commit()
+    return insertados
+
+def _cargar_load_data(connection, cursor, lote):
+    """Ruta rápida: escribir el lote en un TSV temporal y cargarlo con LOAD DATA LOCAL INFILE"""
+    with tempfile.NamedTemporaryFile('w', suffix='.tsv', delete=False, encoding='utf-8', newline='') as tmp:
+        for _, valores in lote:
+            campos = []
+            for valor in valores:
+                if valor is None:
+                    campos.append('\\N')
+                elif isinstance(valor, bool):
+                    campos.append('1' if valor else '0')
+                else:
+                    campos.append(str(valor).replace('\\', '\\\\').replace('\t', ' ').replace('\n', ' '))
+            tmp.write('\t'.join(campos) + '\n')
+        ruta = tmp.name
+    try:
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE '{ruta.replace(os.sep, '/')}'
+            INTO TABLE pokemon
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY '\\t'
+            LINES TERMINATED BY '\\n'
+            ({', '.join(COLUMNAS_POKEMON)})
+        """)
+        connection.commit()
+        return cursor.rowcount
+    finally:
+        os.remove(ruta)
+
+def importar_pokemon_data(connection, df, chunk_size=1000, load_data=False):
+    """Importar datos de Pokémon a la base de datos por lotes"""
+    lotes = (_convertir_lote(df.iloc[inicio:inicio + chunk_size]) for inicio in range(0, len(df), chunk_size))
+    return _importar_lotes(connection, lotes, chunk_size, load_data)
+
+def importar_pokemon_stream(connection, archivo='Pokemon.csv', chunk_size=1000, load_data=False,
+                            filas_por_bloque=FILAS_POR_BLOQUE_CSV):
+    """Leer, procesar e importar el CSV por bloques, sin cargarlo entero en memoria.
+    
+    Un hilo lee, categoriza y convierte a tuplas los lotes siguientes mientras se inserta
+    el actual: al hilo principal solo le queda el executemany, que suelta el GIL.
+    """
+    print(f"📂 Leyendo {archivo} en bloques de {filas_por_bloque:,} filas (streaming)...")
+    lotes = en_segundo_plano(
+        _convertir_lote(bloque.iloc[inicio:inicio + chunk_size])
+        for bloque in leer_pokemon_por_bloques(archivo, filas_por_bloque)
+        for inicio in range(0, len(bloque), chunk_size)
+    )
+    try:
+        return _importar_lotes(connection, lotes, chunk_size, load_data)
+    except Exception as e:
+        print(f"❌ Error procesando datos Pokémon: {e}")
+        return False
+
+def _convertir_lote(df_lote):
+    """Filas (nombre, valores) de un lote procesado; los errores de conversión se reportan por fila"""
+    lote = []
+    for row in df_lote.itertuples(index=False):
+        try:
+            lote.append((row.name, valores_pokemon(row)))
+        except Exception as e:
+            print(f"⚠️ Error insertando {row.name}: {e}")
+    return lote
+
+def _importar_lotes(connection, lotes, chunk_size, load_data):
+    """Insertar cada lote de filas (nombre, valores) de `lotes`, uno por transacción"""
     try:
         cursor = connection.cursor()
         
-        print("📥 Importando datos de Pokémon...")
+        if load_data and es_sqlite(connection):
+            print("⚠️ LOAD DATA LOCAL INFILE solo existe en MySQL, usando executemany...")
+            load_data = False
+        
+        modo = "LOAD DATA LOCAL INFILE" if load_data else f"executemany (lotes de {chunk_size})"
+        print(f"📥 Importando datos de Pokémon con {modo}...")
         
-        insert_query = """
-        INSERT INTO pokemon (pokedex_number, name, base_name, form_type, type1, type2,
-                           total_stats, hp, attack, defense, sp_attack, sp_defense, speed,
-                           generation, legendary, is_alternate, origin_region)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        insert_query = f"""
+        INSERT INTO pokemon ({', '.join(COLUMNAS_POKEMON)})
+        VALUES ({', '.join(['%s'] * len(COLUMNAS_POKEMON))})
         """
         
         successful_inserts = 0
-        for _, row in df.iterrows():
-            try:
-                values = (
-                    int(row['pokedex_number']),
-                    str(row['name'])[:100],  # Truncar si es muy largo
-                    str(row['base_name'])[:50],
-                    row['form_type'],
-                    str(row['type1']),
-                    str(row['type2']) if pd.notna(row['type2']) else None,
-                    int(row['total_stats']),
-                    int(row['hp']),
-                    int(row['attack']),
-                    int(row['defense']),
-                    int(row['sp_attack']),
-                    int(row['sp_defense']),
-                    int(row['speed']),
-                    int(row['generation']),
-                    bool(row['legendary']),
-                    bool(row['is_alternate']),
-                    str(row['origin_region'])
-                )
-                cursor.execute(insert_query, values)
-                successful_inserts += 1
-                
-                if successful_inserts % 100 == 0:
-                    print(f"   Procesados: {successful_inserts}")
-                    
-            except Exception as e:
-                print(f"⚠️ Error insertando {row['name']}: {e}")
+        inicio_total = time.perf_counter()
+        for numero_lote, lote in enumerate(lotes, start=1):
+            inicio_lote = time.perf_counter()
+            
+            if load_data:
+                try:
+                    insertados = _cargar_load_data(connection, cursor, lote)
+                except ErroresBD as e:
+                    # El servidor puede tener local_infile desactivado: seguir con executemany
+                    print(f"⚠️ LOAD DATA no disponible ({e}), usando executemany...")
+                    connection.rollback()
+                    load_data = False
+                    insertados = _insertar_lote(connection, cursor, insert_query, lote)
+            else:
+                insertados = _insertar_lote(connection, cursor, insert_query, lote)
+            successful_inserts += insertados
+            
+            duracion = time.perf_counter() - inicio_lote
+            print(f"   Lote {numero_lote}: {insertados} filas en {duracion:.2f}s "
+                  f"({insertados / max(duracion, 1e-9):,.0f} filas/s) - Total: {successful_inserts}")
         
-        connection.commit()
-        print(f"✅ {successful_inserts} Pokémon importados exitosamente!")
+        duracion_total = time.perf_counter() - inicio_total
+        print(f"✅ {successful_inserts} Pokémon importados exitosamente! "
+              f"({successful_inserts / max(duracion_total, 1e-9):,.0f} filas/s)")
         
         # Verificar resultados
         cursor.execute("SELECT form_type, COUNT(*) as count FROM pokemon GROUP BY form_type")
@@ -496,77 +863,283 @@ def importar_pokemon_data(connection, df):
         
         return successful_inserts > 0
         
-    except Error as e:
+    except ErroresBD as e:
         print(f"❌ Error en importación de Pokémon: {e}")
         return False
 
-def importar_efectividad_tipos(connection):
+def sincronizar_pokemon_data(connection, df, chunk_size=1000):
+    """Sincronizar la tabla pokemon con el CSV: solo insertar, actualizar o borrar lo que cambió.
+    
+    Devuelve el conjunto de unique_id insertados, actualizados o borrados (None si falla),
+    para que las tablas derivadas solo toquen esas filas.
+    """
+    try:
+        cursor = connection.cursor()
+        
+        print("🔄 Sincronizando datos de Pokémon (modo incremental)...")
+        inicio = time.perf_counter()
+        
+        cursor.execute("SELECT unique_id, name, row_hash FROM pokemon")
+        existentes = {name: (unique_id, row_hash) for unique_id, name, row_hash in cursor.fetchall()}
+        
+        nuevos, cambiados, vistos = [], [], set()
+        for row in df.itertuples(index=False):
+            try:
+                valores = valores_pokemon(row)
+            except Exception as e:
+                print(f"⚠️ Error procesando {row.name}: {e}")
+                continue
+            nombre = valores[1]
+            vistos.add(nombre)
+            if nombre not in existentes:
+                nuevos.append((nombre, valores))
+            elif existentes[nombre][1] != valores[-1]:
+                cambiados.append((nombre, valores + (existentes[nombre][0],)))
+        eliminados = [(nombre, unique_id) for nombre, (unique_id, _) in existentes.items() if nombre not in vistos]
+        
+        print(f"   Nuevos: {len(nuevos)} · Cambiados: {len(cambiados)} · "
+              f"Eliminados: {len(eliminados)} · Sin cambios: {len(vistos) - len(nuevos) - len(cambiados)}")
+        
+        insert_query = f"""
+        INSERT INTO pokemon ({', '.join(COLUMNAS_POKEMON)})
+        VALUES ({', '.join(['%s'] * len(COLUMNAS_POKEMON))})
+        """
+        update_query = f"""
+        UPDATE pokemon SET {', '.join(f'{columna} = %s' for columna in COLUMNAS_POKEMON)}
+        WHERE unique_id = %s
+        """
+        for inicio_lote in range(0, len(nuevos), chunk_size):
+            _insertar_lote(connection, cursor, insert_query, nuevos[inicio_lote:inicio_lote + chunk_size])
+        for inicio_lote in range(0, len(cambiados), chunk_size):
+            _insertar_lote(connection, cursor, update_query, cambiados[inicio_lote:inicio_lote + chunk_size])
+        
+        # Un Pokémon usado en team_members no se puede borrar (FOREIGN KEY): se reporta y se conserva
+        for nombre, unique_id in eliminados:
+            try:
+                cursor.execute("DELETE FROM pokemon WHERE unique_id = %s", (unique_id,))
+            except ErroresBD as e:
+                print(f"⚠️ No se pudo eliminar {nombre}: {e}")
+        connection.commit()
+        
+        # Los ids de las filas nuevas los asigna AUTO_INCREMENT: se buscan por nombre (UNIQUE)
+        tocados = {valores[-1] for _, valores in cambiados} | {unique_id for _, unique_id in eliminados}
+        nombres_nuevos = [nombre for nombre, _ in nuevos]
+        for inicio_lote in range(0, len(nombres_nuevos), chunk_size):
+            lote = nombres_nuevos[inicio_lote:inicio_lote + chunk_size]
+            cursor.execute(f"SELECT unique_id FROM pokemon WHERE name IN ({', '.join(['%s'] * len(lote))})", lote)
+            tocados.update(unique_id for (unique_id,) in cursor.fetchall())
+        
+        duracion = time.perf_counter() - inicio
+        print(f"✅ Sincronización completada en {duracion * 1000:.0f} ms")
+        
+        return tocados
+        
+    except ErroresBD as e:
+        print(f"❌ Error sincronizando Pokémon: {e}")
+        return None
+
+def importar_tipos_pokemon(connection, unique_ids=None, chunk_size=1000):
+    """Reconstruir pokemon_types (un registro por tipo de cada Pokémon) desde la tabla pokemon.
+    
+    Con `unique_ids` (lo que devolvió sincronizar_pokemon_data) solo se reescriben los
+    registros de esos Pokémon; los borrados no dejan filas porque ya no están en pokemon.
+    """
+    try:
+        cursor = connection.cursor()
+        
+        if unique_ids is not None:
+            cursor.execute("SELECT 1 FROM pokemon_types LIMIT 1")
+            if cursor.fetchone() is None:
+                unique_ids = None  # Tabla vacía (base anterior a pokemon_types): se llena entera
+        
+        if unique_ids is None:
+            print("📥 Indexando Pokémon por tipo...")
+            
+            # Dos INSERT ... SELECT en el servidor: no pasa ninguna fila por Python
+            cursor.execute("DELETE FROM pokemon_types")
+            cursor.execute("""
+                INSERT INTO pokemon_types (pokemon_unique_id, slot, type_id, total_stats)
+                SELECT unique_id, 1, type1_id, total_stats FROM pokemon
+            """)
+            cursor.execute("""
+                INSERT INTO pokemon_types (pokemon_unique_id, slot, type_id, total_stats)
+                SELECT unique_id, 2, type2_id, total_stats FROM pokemon WHERE type2_id IS NOT NULL
+            """)
+            connection.commit()
+            
+            cursor.execute("SELECT COUNT(*) FROM pokemon_types")
+            print(f"✅ {cursor.fetchone()[0]} registros en pokemon_types!")
+            return True
+        
+        print(f"📥 Reindexando por tipo {len(unique_ids)} Pokémon cambiados...")
+        ids = sorted(int(unique_id) for unique_id in unique_ids)
+        for inicio in range(0, len(ids), chunk_size):
+            lote = ids[inicio:inicio + chunk_size]
+            marcadores = ', '.join(['%s'] * len(lote))
+            cursor.execute(f"DELETE FROM pokemon_types WHERE pokemon_unique_id IN ({marcadores})", lote)
+            cursor.execute(f"""
+                INSERT INTO pokemon_types (pokemon_unique_id, slot, type_id, total_stats)
+                SELECT unique_id, 1, type1_id, total_stats FROM pokemon WHERE unique_id IN ({marcadores})
+            """, lote)
+            cursor.execute(f"""
+                INSERT INTO pokemon_types (pokemon_unique_id, slot, type_id, total_stats)
+                SELECT unique_id, 2, type2_id, total_stats FROM pokemon
+                WHERE type2_id IS NOT NULL AND unique_id IN ({marcadores})
+            """, lote)
+            connection.commit()
+        
+        print(f"✅ pokemon_types al día ({len(ids)} Pokémon reindexados)")
+        return True
+        
+    except ErroresBD as e:
+        print(f"❌ Error indexando Pokémon por tipo: {e}")
+        return False
+
+def refrescar_ranking_poder(connection, chunk_size=1000):
+    """Recalcular el ranking de poder y escribir solo las filas cuyo nivel o puesto cambió"""
+    try:
+        cursor = connection.cursor()
+        
+        print("📥 Actualizando ranking de poder...")
+        
+        cursor.execute("""
+            SELECT p.unique_id, p.total_stats, p.legendary, p.form_type, r.power_level, r.power_rank
+            FROM pokemon p
+            LEFT JOIN pokemon_power_ranking r ON r.unique_id = p.unique_id
+        """)
+        df = pd.DataFrame(cursor.fetchall(), columns=[
+            'unique_id', 'total_stats', 'legendary', 'form_type', 'nivel_guardado', 'rango_guardado'
+        ])
+        
+        # Mismos valores que fn_calculate_power_level + RANK() OVER, calculados con numpy
+        ranking = ranking_poder(df)
+        guardado = pd.to_numeric(df['nivel_guardado'], errors='coerce').to_numpy(dtype=float)
+        cambiadas = (
+            np.isnan(guardado)
+            | (np.rint(guardado * 100) != np.rint(ranking['power_level'].to_numpy() * 100))
+            | (df['rango_guardado'].fillna(0).to_numpy(dtype=np.int64) != ranking['power_rank'].to_numpy())
+        )
+        filas = [
+            (int(uid), float(nivel), int(rango))
+            for uid, nivel, rango in ranking[cambiadas].itertuples(index=False)
+        ]
+        
+        # Los Pokémon borrados salen del ranking por ON DELETE CASCADE
+        upsert_query = (
+            "INSERT INTO pokemon_power_ranking (unique_id, power_level, power_rank) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE power_level = VALUES(power_level), power_rank = VALUES(power_rank)"
+        )
+        for inicio in range(0, len(filas), chunk_size):
+            cursor.executemany(upsert_query, filas[inicio:inicio + chunk_size])
+        connection.commit()
+        
+        print(f"✅ Ranking de poder: {len(filas)} de {len(df)} filas actualizadas")
+        
+        return True
+        
+    except ErroresBD as e:
+        print(f"❌ Error actualizando el ranking de poder: {e}")
+        return False
+
+def leer_efectividad_tipos(archivo='Tabla de tipos.csv'):
+    """Leer las reglas de efectividad como tuplas (attacking_type, defending_type, effectiveness)"""
+    # Verificar si existe el archivo
+    if not os.path.exists(archivo):
+        print(f"⚠️ Archivo '{archivo}' no encontrado.")
+        print("📝 Usando datos básicos de efectividad...")
+        
+        # Datos básicos de efectividad
+        basic_effectiveness = [
+            # Súper efectivo (2.0)
+            ('Water', 'Fire', 2.0), ('Fire', 'Grass', 2.0), ('Grass', 'Water', 2.0),
+            ('Electric', 'Water', 2.0), ('Electric', 'Flying', 2.0),
+            ('Ice', 'Grass', 2.0), ('Ice', 'Flying', 2.0), ('Ice', 'Dragon', 2.0),
+            ('Fighting', 'Normal', 2.0), ('Fighting', 'Rock', 2.0), ('Fighting', 'Steel', 2.0),
+            ('Rock', 'Fire', 2.0), ('Rock', 'Ice', 2.0), ('Rock', 'Flying', 2.0),
+            ('Flying', 'Grass', 2.0), ('Flying', 'Fighting', 2.0), ('Flying', 'Bug', 2.0),
+            ('Psychic', 'Fighting', 2.0), ('Psychic', 'Poison', 2.0),
+            ('Bug', 'Grass', 2.0), ('Bug', 'Psychic', 2.0), ('Bug', 'Dark', 2.0),
+            ('Ghost', 'Psychic', 2.0), ('Ghost', 'Ghost', 2.0),
+            ('Dragon', 'Dragon', 2.0), ('Dark', 'Psychic', 2.0), ('Dark', 'Ghost', 2.0),
+            ('Steel', 'Ice', 2.0), ('Steel', 'Rock', 2.0), ('Steel', 'Fairy', 2.0),
+        
+            # Resistente (0.5)
+            ('Fire', 'Water', 0.5), ('Water', 'Grass', 0.5), ('Grass', 'Fire', 0.5),
+            ('Electric', 'Grass', 0.5), ('Flying', 'Electric', 0.5),
+            ('Steel', 'Fire', 0.5), ('Steel', 'Water', 0.5), ('Steel', 'Electric', 0.5),
+            ('Fire', 'Fire', 0.5), ('Water', 'Water', 0.5), ('Grass', 'Grass', 0.5),
+            ('Psychic', 'Psychic', 0.5), ('Fighting', 'Flying', 0.5),
+        
+            # Inmune (0.0)
+            ('Electric', 'Ground', 0.0), ('Ground', 'Flying', 0.0),
+            ('Psychic', 'Dark', 0.0), ('Normal', 'Ghost', 0.0),
+            ('Fighting', 'Ghost', 0.0), ('Ghost', 'Normal', 0.0)
+        ]
+        return basic_effectiveness
+    
+    # Procesar archivo CSV
+    df_types = pd.read_csv(archivo, encoding='latin1')
+    
+    type_effectiveness_data = []
+    for _, row in df_types.iterrows():
+        defending_type = row['Tipo']
+        
+        if pd.notna(row.get('Debil', '')):
+            for attacking_type in str(row['Debil']).replace(' ', '').split(','):
+                if attacking_type.strip():
+                    type_effectiveness_data.append((attacking_type.strip(), defending_type, 2.0))
+        
+        if pd.notna(row.get('Resistente', '')):
+            for attacking_type in str(row['Resistente']).replace(' ', '').split(','):
+                if attacking_type.strip():
+                    type_effectiveness_data.append((attacking_type.strip(), defending_type, 0.5))
+        
+        if pd.notna(row.get('Inmune', '')):
+            for attacking_type in str(row['Inmune']).replace(' ', '').split(','):
+                if attacking_type.strip():
+                    type_effectiveness_data.append((attacking_type.strip(), defending_type, 0.0))
+    
+    return type_effectiveness_data
+
+def importar_efectividad_tipos(connection, incremental=False):
     """Importar datos de efectividad de tipos"""
     try:
         cursor = connection.cursor()
         
         print("📥 Importando efectividad de tipos...")
         
-        # Verificar si existe el archivo
-        if not os.path.exists('Tabla de tipos.csv'):
-            print("⚠️ Archivo 'Tabla de tipos.csv' no encontrado.")
-            print("📝 Insertando datos básicos de efectividad...")
+        # Los alias del CSV (Land, Sinister, Plant...) se normalizan al id del tipo canónico
+        type_effectiveness_data = []
+        for attacking_type, defending_type, effectiveness in leer_efectividad_tipos():
+            ids = (id_tipo(attacking_type), id_tipo(defending_type))
+            if None in ids:
+                print(f"⚠️ Tipo no reconocido en la regla {attacking_type} → {defending_type}, se omite")
+                continue
+            type_effectiveness_data.append(ids + (effectiveness,))
+        
+        if incremental:
+            # Igual que INSERT IGNORE: ante reglas repetidas gana la primera
+            reglas = {}
+            for attacking_type, defending_type, effectiveness in type_effectiveness_data:
+                reglas.setdefault((attacking_type, defending_type), effectiveness)
             
-            # Datos básicos de efectividad
-            basic_effectiveness = [
-                # Súper efectivo (2.0)
-                ('Water', 'Fire', 2.0), ('Fire', 'Grass', 2.0), ('Grass', 'Water', 2.0),
-                ('Electric', 'Water', 2.0), ('Electric', 'Flying', 2.0),
-                ('Ice', 'Grass', 2.0), ('Ice', 'Flying', 2.0), ('Ice', 'Dragon', 2.0),
-                ('Fighting', 'Normal', 2.0), ('Fighting', 'Rock', 2.0), ('Fighting', 'Steel', 2.0),
-                ('Rock', 'Fire', 2.0), ('Rock', 'Ice', 2.0), ('Rock', 'Flying', 2.0),
-                ('Flying', 'Grass', 2.0), ('Flying', 'Fighting', 2.0), ('Flying', 'Bug', 2.0),
-                ('Psychic', 'Fighting', 2.0), ('Psychic', 'Poison', 2.0),
-                ('Bug', 'Grass', 2.0), ('Bug', 'Psychic', 2.0), ('Bug', 'Dark', 2.0),
-                ('Ghost', 'Psychic', 2.0), ('Ghost', 'Ghost', 2.0),
-                ('Dragon', 'Dragon', 2.0), ('Dark', 'Psychic', 2.0), ('Dark', 'Ghost', 2.0),
-                ('Steel', 'Ice', 2.0), ('Steel', 'Rock', 2.0), ('Steel', 'Fairy', 2.0),
-                
-                # Resistente (0.5)
-                ('Fire', 'Water', 0.5), ('Water', 'Grass', 0.5), ('Grass', 'Fire', 0.5),
-                ('Electric', 'Grass', 0.5), ('Flying', 'Electric', 0.5),
-                ('Steel', 'Fire', 0.5), ('Steel', 'Water', 0.5), ('Steel', 'Electric', 0.5),
-                ('Fire', 'Fire', 0.5), ('Water', 'Water', 0.5), ('Grass', 'Grass', 0.5),
-                ('Psychic', 'Psychic', 0.5), ('Fighting', 'Flying', 0.5),
-                
-                # Inmune (0.0)
-                ('Electric', 'Ground', 0.0), ('Ground', 'Flying', 0.0),
-                ('Psychic', 'Dark', 0.0), ('Normal', 'Ghost', 0.0),
-                ('Fighting', 'Ghost', 0.0), ('Ghost', 'Normal', 0.0)
-            ]
-            
-            insert_query = "INSERT IGNORE INTO type_effectiveness (attacking_type, defending_type, effectiveness) VALUES (%s, %s, %s)"
-            cursor.executemany(insert_query, basic_effectiveness)
+            cursor.execute("SELECT attacking_type_id, defending_type_id, effectiveness FROM type_effectiveness")
+            existentes = {(a, d): float(e) for a, d, e in cursor.fetchall()}
             
+            cambiadas = [(a, d, e) for (a, d), e in reglas.items() if existentes.get((a, d)) != e]
+            sobrantes = [clave for clave in existentes if clave not in reglas]
+            cursor.executemany(
+                "INSERT INTO type_effectiveness (attacking_type_id, defending_type_id, effectiveness) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE effectiveness = VALUES(effectiveness)",
+                cambiadas
+            )
+            cursor.executemany(
+                "DELETE FROM type_effectiveness WHERE attacking_type_id = %s AND defending_type_id = %s",
+                sobrantes
+            )
+            print(f"   Reglas cambiadas: {len(cambiadas)} · Eliminadas: {len(sobrantes)}")
         else:
-            # Procesar archivo CSV
-            df_types = pd.read_csv('Tabla de tipos.csv', encoding='latin1')
-            
-            type_effectiveness_data = []
-            for _, row in df_types.iterrows():
-                defending_type = row['Tipo']
-                
-                if pd.notna(row.get('Debil', '')):
-                    for attacking_type in str(row['Debil']).replace(' ', '').split(','):
-                        if attacking_type.strip():
-                            type_effectiveness_data.append((attacking_type.strip(), defending_type, 2.0))
-                
-                if pd.notna(row.get('Resistente', '')):
-                    for attacking_type in str(row['Resistente']).replace(' ', '').split(','):
-                        if attacking_type.strip():
-                            type_effectiveness_data.append((attacking_type.strip(), defending_type, 0.5))
-                
-                if pd.notna(row.get('Inmune', '')):
-                    for attacking_type in str(row['Inmune']).replace(' ', '').split(','):
-                        if attacking_type.strip():
-                            type_effectiveness_data.append((attacking_type.strip(), defending_type, 0.0))
-            
-            insert_query = "INSERT IGNORE INTO type_effectiveness (attacking_type, defending_type, effectiveness) VALUES (%s, %s, %s)"
+            insert_query = "INSERT IGNORE INTO type_effectiveness (attacking_type_id, defending_type_id, effectiveness) VALUES (%s, %s, %s)"
             cursor.executemany(insert_query, type_effectiveness_data)
         
         connection.commit()
@@ -582,11 +1155,58 @@ def importar_efectividad_tipos(connection):
         print(f"❌ Error importando efectividad: {e}")
         return False
 
+def importar_perfiles_defensivos(connection):
+    """Precalcular el perfil defensivo de las 171 firmas de tipo"""
+    try:
+        cursor = connection.cursor()
+        
+        print("📥 Calculando perfiles defensivos por firma de tipo...")
+        
+        cursor.execute(SQL_EFECTIVIDAD)
+        motor = MotorTipos.desde_filas(cursor.fetchall())
+        
+        firmas_data = [
+            (firma_id, int(t1) + 1, int(t2) + 1 if t2 != SIN_TIPO else None)
+            for firma_id, (t1, t2) in enumerate(FIRMAS)
+        ]
+        cursor.executemany(
+            "INSERT INTO type_signatures (id, type1_id, type2_id) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE type1_id = VALUES(type1_id), type2_id = VALUES(type2_id)",
+            firmas_data
+        )
+        
+        # Producto de multiplicadores: los tipos dobles dan x4 y x0.25 correctamente
+        perfiles_data = [
+            (firma_id, ID_TIPO[TIPOS[atacante]], float(motor.perfiles_firmas[firma_id, atacante]))
+            for firma_id in range(len(FIRMAS))
+            for atacante in range(len(TIPOS))
+        ]
+        cursor.executemany(
+            "INSERT INTO type_signature_profiles (signature_id, attacking_type_id, multiplier) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE multiplier = VALUES(multiplier)",
+            perfiles_data
+        )
+        
+        connection.commit()
+        print(f"✅ {len(firmas_data)} firmas y {len(perfiles_data)} multiplicadores precalculados!")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error calculando perfiles defensivos: {e}")
+        return False
+
 def crear_datos_ejemplo(connection):
     """Crear equipos y datos de ejemplo"""
     try:
         cursor = connection.cursor()
         
+        # En una resincronización no se duplican los equipos ni se tocan los del usuario
+        cursor.execute("SELECT COUNT(*) FROM teams")
+        if cursor.fetchone()[0] > 0:
+            print("📝 Ya existen equipos, se omiten los datos de ejemplo")
+            return True
+        
         print("📝 Creando datos de ejemplo...")
         
         # Insertar equipos de ejemplo
@@ -612,6 +1232,35 @@ def crear_datos_ejemplo(connection):
         print(f"❌ Error creando datos de ejemplo: {e}")
         return False
 
+def registrar_version_datos(connection):
+    """Escribir una nueva versión de datos para invalidar la caché de la app"""
+    try:
+        cursor = connection.cursor()
+        
+        version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        cursor.execute(
+            "INSERT INTO data_version (id, version) VALUES (1, %s) "
+            "ON DUPLICATE KEY UPDATE version = VALUES(version)",
+            (version,)
+        )
+        connection.commit()
+        print(f"🏷️ Versión de datos registrada: {version}")
+        
+        return True
+        
+    except ErroresBD as e:
+        print(f"❌ Error registrando la versión de datos: {e}")
+        return False
+
+def contar_filas(connection, tabla):
+    """Número de filas de una tabla (para las métricas por paso)"""
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        return cursor.fetchone()[0]
+    except ErroresBD:
+        return 0
+
 def verificar_instalacion(connection):
     """Verificar que todo esté funcionando correctamente"""
     try:
@@ -619,6 +1268,9 @@ def verificar_instalacion(connection):
         
         print("\n🔍 VERIFICANDO INSTALACIÓN...")
         
+        if es_sqlite(connection):
+            return verificar_instalacion_sqlite(connection)
+        
         # Verificar tablas
         cursor.execute("""
             SELECT TABLE_NAME, TABLE_ROWS 
@@ -679,56 +1331,191 @@ def verificar_instalacion(connection):
         print(f"❌ Error en verificación: {e}")
         return False
 
+def verificar_instalacion_sqlite(connection):
+    """Verificación equivalente para el backend SQLite (sqlite_master en vez de information_schema)"""
+    cursor = connection.cursor()
+    
+    cursor.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name")
+    objetos = cursor.fetchall()
+    
+    print("\n📋 Tablas creadas:")
+    for tipo, nombre in objetos:
+        if tipo == 'table':
+            cursor.execute(f"SELECT COUNT(*) FROM {nombre}")
+            print(f"   ✅ {nombre}: {cursor.fetchone()[0]} registros")
+    
+    print("\n👁️ Vistas creadas:")
+    for tipo, nombre in objetos:
+        if tipo == 'view':
+            print(f"   ✅ {nombre}")
+    
+    print("\n🔥 Triggers creados:")
+    for tipo, nombre in objetos:
+        if tipo == 'trigger':
+            print(f"   ✅ {nombre}")
+    
+    cursor.execute("SELECT COUNT(*) FROM pokemon WHERE legendary = 1")
+    legendary_count = cursor.fetchone()[0]
+    print(f"\n📊 Prueba rápida: {legendary_count} Pokémon legendarios encontrados")
+    
+    return True
+
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Importar los datos de Pokémon Team Builder")
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help="Filas por lote de executemany (default: 1000)")
+    parser.add_argument('--load-data', action='store_true',
+                        help="Cargar los Pokémon con LOAD DATA LOCAL INFILE")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Sincronizar solo las filas que cambiaron, sin borrar la base de datos")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default='mysql',
+                        help="Base de datos destino (default: mysql)")
+    parser.add_argument('--sqlite-path', default=SQLITE_PATH_DEFAULT,
+                        help=f"Archivo de la base SQLite (default: {SQLITE_PATH_DEFAULT})")
+    parser.add_argument('--profile', nargs='?', const='perfil_import', default=None, metavar='DIRECTORIO',
+                        help="Guardar un cProfile por paso y resumen.json en DIRECTORIO (default: perfil_import)")
+    parser.add_argument('--retencion-dias', type=int, default=RETENCION_DIAS_DEFAULT,
+                        help=f"Días que activity_log conserva completos antes de resumirse (default: {RETENCION_DIAS_DEFAULT})")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Leer el CSV por bloques e insertarlos mientras se lee el siguiente (memoria constante)")
+    parser.add_argument('--filas-por-bloque', type=int, default=FILAS_POR_BLOQUE_CSV,
+                        help=f"Filas del CSV por bloque con --streaming (default: {FILAS_POR_BLOQUE_CSV})")
+    parser.add_argument('--csv', default='Pokemon.csv',
+                        help="CSV de Pokémon a importar, p. ej. uno de generar_roster.py (default: Pokemon.csv)")
+    args = parser.parse_args()
+    
     print("🚀 INICIANDO IMPORTACIÓN COMPLETA DE POKÉMON TEAM BUILDER")
     print("=" * 70)
     
     # Verificar archivos
-    if not verificar_archivos():
+    if not verificar_archivos(args.csv):
         print("\n❌ Proceso detenido. Corrige los archivos faltantes.")
         return
     
     # Conectar a la base de datos
-    connection = conectar_bd()
+    connection = conectar_bd(load_data=args.load_data, backend=args.backend, sqlite_path=args.sqlite_path)
     if not connection:
         print("\n❌ No se pudo conectar a la base de datos.")
         return
     
+    medicion = MedicionPasos(args.profile)
+    cambiados = None  # unique_id tocados por --incremental; None = reconstruir las tablas derivadas
     try:
         # Paso 1: Crear estructura
-        if not ejecutar_sql_completo(connection):
+        with medicion.paso("1. Estructura") as paso:
+            paso['ok'] = ejecutar_sql_completo(connection, args.incremental)
+        if not paso['ok']:
             print("❌ Error creando estructura básica")
             return
         
         # Paso 2: Crear vistas y procedimientos
-        if not crear_vistas_y_procedimientos(connection):
+        with medicion.paso("2. Vistas y procedimientos") as paso:
+            paso['ok'] = crear_vistas_y_procedimientos(connection)
+        if not paso['ok']:
             print("❌ Error creando objetos SQL avanzados")
             return
         
-        # Paso 3: Procesar datos Pokémon
-        df_pokemon = procesar_pokemon_data()
-        if df_pokemon is None:
-            print("❌ Error procesando datos Pokémon")
+        if args.streaming and args.incremental:
+            print("⚠️ --streaming no se combina con --incremental (la sincronización compara el CSV "
+                  "completo con la tabla): se procesa en memoria")
+        
+        if args.streaming and not args.incremental:
+            # Pasos 3 y 4 a la vez: los bloques se leen y procesan mientras se insertan los anteriores
+            with medicion.paso("3-4. Procesar e importar Pokémon (streaming)") as paso:
+                paso['ok'] = importar_pokemon_stream(connection, args.csv, args.chunk_size,
+                                                     args.load_data, args.filas_por_bloque)
+                paso['filas'] = contar_filas(connection, 'pokemon')
+            if not paso['ok']:
+                print("❌ Error importando datos Pokémon")
+                return
+        else:
+            # Paso 3: Procesar datos Pokémon
+            with medicion.paso("3. Procesar CSV de Pokémon") as paso:
+                df_pokemon = procesar_pokemon_data(args.csv)
+                paso['ok'] = df_pokemon is not None
+                paso['filas'] = len(df_pokemon) if paso['ok'] else 0
+            if not paso['ok']:
+                print("❌ Error procesando datos Pokémon")
+                return
+        
+            # Paso 4: Importar (o sincronizar) datos Pokémon
+            if args.incremental:
+                with medicion.paso("4. Sincronizar Pokémon") as paso:
+                    cambiados = sincronizar_pokemon_data(connection, df_pokemon, args.chunk_size)
+                    paso['ok'] = cambiados is not None
+                    paso['filas'] = len(df_pokemon)
+                if not paso['ok']:
+                    print("❌ Error sincronizando datos Pokémon")
+                    return
+            else:
+                with medicion.paso("4. Importar Pokémon") as paso:
+                    paso['ok'] = importar_pokemon_data(connection, df_pokemon, args.chunk_size, args.load_data)
+                    paso['filas'] = len(df_pokemon)
+                if not paso['ok']:
+                    print("❌ Error importando datos Pokémon")
+                    return
+        
+        # Paso 4b: Indexar Pokémon por tipo (tabla pokemon_types)
+        with medicion.paso("4b. Pokémon por tipo") as paso:
+            paso['ok'] = importar_tipos_pokemon(connection, cambiados, args.chunk_size)
+            paso['filas'] = contar_filas(connection, 'pokemon_types')
+        if not paso['ok']:
+            print("❌ Error indexando Pokémon por tipo")
             return
         
-        # Paso 4: Importar datos Pokémon
-        if not importar_pokemon_data(connection, df_pokemon):
-            print("❌ Error importando datos Pokémon")
+        # Paso 4c: Ranking de poder materializado (solo se escriben las filas que cambian)
+        with medicion.paso("4c. Ranking de poder") as paso:
+            paso['ok'] = refrescar_ranking_poder(connection, args.chunk_size)
+            paso['filas'] = contar_filas(connection, 'pokemon_power_ranking')
+        if not paso['ok']:
+            print("❌ Error actualizando el ranking de poder")
             return
         
         # Paso 5: Importar efectividad de tipos
-        if not importar_efectividad_tipos(connection):
+        with medicion.paso("5. Efectividad de tipos") as paso:
+            paso['ok'] = importar_efectividad_tipos(connection, args.incremental)
+            paso['filas'] = contar_filas(connection, 'type_effectiveness')
+        if not paso['ok']:
             print("❌ Error importando efectividad")
             return
         
+        # Paso 5b: Precalcular perfiles defensivos por firma de tipo
+        with medicion.paso("5b. Perfiles defensivos") as paso:
+            paso['ok'] = importar_perfiles_defensivos(connection)
+            paso['filas'] = contar_filas(connection, 'type_signature_profiles')
+        if not paso['ok']:
+            print("❌ Error calculando perfiles defensivos")
+            return
+        
         # Paso 6: Crear datos de ejemplo
-        if not crear_datos_ejemplo(connection):
+        with medicion.paso("6. Datos de ejemplo") as paso:
+            paso['ok'] = crear_datos_ejemplo(connection)
+            paso['filas'] = contar_filas(connection, 'teams')
+        if not paso['ok']:
             print("❌ Error creando datos de ejemplo")
             return
         
+        # Paso 6b: Registrar la versión de los datos importados
+        with medicion.paso("6b. Versión de datos") as paso:
+            paso['ok'] = registrar_version_datos(connection)
+            paso['filas'] = 1
+        if not paso['ok']:
+            print("❌ Error registrando la versión de datos")
+            return
+        
+        # Paso 6c: Retención de activity_log (resumen diario) y particiones de los próximos días
+        with medicion.paso("6c. Mantenimiento de activity_log") as paso:
+            paso['ok'] = mantener_actividad(connection, args.retencion_dias)
+            paso['filas'] = contar_filas(connection, 'activity_log')
+        if not paso['ok']:
+            print("❌ Error manteniendo activity_log")
+            return
+        
         # Paso 7: Verificar instalación
-        if not verificar_instalacion(connection):
+        with medicion.paso("7. Verificación") as paso:
+            paso['ok'] = verificar_instalacion(connection)
+        if not paso['ok']:
             print("❌ Error en verificación final")
             return
         
@@ -746,6 +1533,12 @@ def main():
         print(f"\n❌ Error inesperado: {e}")
     
     finally:
+        medicion.imprimir()
+        if args.profile:
+            ruta_resumen = os.path.join(args.profile, 'resumen.json')
+            medicion.guardar(ruta_resumen)
+            print(f"\n💾 Perfiles cProfile y resumen en {args.profile}/ "
+                  f"(ver con: python -m pstats {args.profile}/<paso>.prof)")
         if connection and connection.is_connected():
             connection.close()
             print("\n🔌 Conexión cerrada.")
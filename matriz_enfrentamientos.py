@@ -0,0 +1,174 @@
+# =====================================================
+# MATRIZ DE ENFRENTAMIENTOS - POKÉMON TEAM BUILDER
+# Todos contra todos por tipos STAB, en un archivo .npy mapeado en memoria
+# =====================================================
+#
+# Celda [x, y] (uint8): nibble alto = código del mejor multiplicador STAB de x
+# contra y, nibble bajo = el de y contra x. Una fila responde las dos preguntas
+# ("a quién le gana X" y "quién le gana a X") sin leer nada más.
+#
+# Los valores solo dependen de las firmas de tipo: se calcula la tabla 171x171
+# una vez y la matriz del roster es una indexación de esa tabla por bloques de filas.
+
+import os
+import re
+
+import numpy as np
+
+from motor_tipos import FIRMAS
+
+MATRIZ_DIR_DEFAULT = 'cache_enfrentamientos'
+# Más allá de esto (n * n bytes) no se escribe el archivo y cada fila se calcula al pedirla
+LIMITE_BYTES_DEFAULT = 2 * 1024**3
+FILAS_POR_BLOQUE = 1024
+
+
+def niveles_multiplicador(motor):
+    """Multiplicadores distintos del motor en orden ascendente: el código de un valor es su posición"""
+    return np.unique(motor.perfiles_firmas)
+
+
+def multiplicadores_firmas(motor):
+    """(171, 171): mejor multiplicador STAB de la firma atacante [a] contra la defensora [b]"""
+    # Columna extra para "sin tipo": nunca es el mejor golpe
+    perfiles = np.hstack([motor.perfiles_firmas, np.full((len(FIRMAS), 1), -np.inf)])
+    # perfiles[b, FIRMAS] -> (b, a, 2): los dos tipos STAB de cada atacante contra cada defensor
+    return perfiles[:, FIRMAS].max(axis=2).T
+
+
+def codigos_firmas(motor):
+    """(171, 171) uint8 con los dos sentidos del enfrentamiento entre firmas empaquetados"""
+    niveles = niveles_multiplicador(motor)
+    if len(niveles) > 16:
+        raise ValueError(f"Demasiados multiplicadores distintos para 4 bits: {len(niveles)}")
+    ataque = np.searchsorted(niveles, multiplicadores_firmas(motor)).astype(np.uint8)
+    return (ataque << 4) | ataque.T
+
+
+# Temporales de obtener(): <matriz>.npy.<pid>.tmp y <ids>.npy.<pid>.tmp.npy
+_TEMPORAL = re.compile(r'.+\.npy\.\d+\.tmp(\.npy)?')
+
+
+def _nombre_archivo(version):
+    """Nombre de archivo seguro para una versión de datos"""
+    return 'matchups_' + re.sub(r'[^A-Za-z0-9_.-]+', '_', str(version))
+
+
+def _limpiar_versiones_anteriores(directorio, nombre, hasta):
+    """Borrar las matrices e ids publicados de otras versiones no más nuevos que `hasta`.
+
+    Los temporales (*.tmp, *.tmp.npy) no se tocan: pueden ser de otro proceso que aún
+    está escribiendo. Un proceso que tenga abierta una matriz anterior la sigue leyendo:
+    el borrado solo quita el nombre; en Windows el archivo abierto no se puede borrar y se deja.
+    """
+    for archivo in os.listdir(directorio):
+        if (not archivo.startswith('matchups_') or not archivo.endswith('.npy')
+                or _TEMPORAL.fullmatch(archivo)
+                or archivo in (nombre + '.npy', nombre + '.ids.npy')):
+            continue
+        ruta = os.path.join(directorio, archivo)
+        try:
+            if os.path.getmtime(ruta) <= hasta:
+                os.remove(ruta)
+        except OSError:
+            pass
+
+
+class MatrizEnfrentamientos:
+    """Matriz de enfrentamientos del roster, de solo lectura.
+
+    Con `matriz` (un memmap) cada fila es una lectura de n bytes del archivo, que el
+    sistema operativo comparte entre todos los procesos que lo abren; sin ella (roster
+    demasiado grande) la fila se calcula desde la tabla de firmas, también en O(n).
+    """
+
+    def __init__(self, signature_ids, niveles, codigos, matriz=None):
+        self.signature_ids = np.asarray(signature_ids, dtype=np.intp)
+        self.niveles = np.asarray(niveles, dtype=np.float64)
+        self.codigos = codigos
+        self.matriz = matriz
+
+    def __len__(self):
+        return len(self.signature_ids)
+
+    @classmethod
+    def obtener(cls, motor, unique_ids, signature_ids, version, directorio=MATRIZ_DIR_DEFAULT,
+                limite_bytes=LIMITE_BYTES_DEFAULT):
+        """Abrir la matriz guardada para `version` o, si no existe o no corresponde al roster, crearla"""
+        unique_ids = np.asarray(unique_ids, dtype=np.int64)
+        signature_ids = np.asarray(signature_ids, dtype=np.intp)
+        if (signature_ids < 0).any():
+            raise ValueError("Hay Pokémon sin firma de tipo")
+        niveles = niveles_multiplicador(motor)
+        codigos = codigos_firmas(motor)
+        n = len(unique_ids)
+        if version is None or n * n > limite_bytes:
+            return cls(signature_ids, niveles, codigos)
+
+        os.makedirs(directorio, exist_ok=True)
+        nombre = _nombre_archivo(version)
+        base = os.path.join(directorio, nombre)
+        ruta, ruta_ids = base + '.npy', base + '.ids.npy'
+        if os.path.exists(ruta) and os.path.exists(ruta_ids):
+            if np.array_equal(np.load(ruta_ids), unique_ids):
+                return cls(signature_ids, niveles, codigos, np.load(ruta, mmap_mode='r'))
+
+        # Escribir en un temporal y renombrar: otro proceso nunca ve un archivo a medias
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        temporal_ids = f"{ruta_ids}.{os.getpid()}.tmp.npy"
+        try:
+            matriz = np.lib.format.open_memmap(temporal, mode='w+', dtype=np.uint8, shape=(n, n))
+            for inicio in range(0, n, FILAS_POR_BLOQUE):
+                bloque = signature_ids[inicio:inicio + FILAS_POR_BLOQUE]
+                matriz[inicio:inicio + len(bloque)] = codigos[bloque[:, None], signature_ids[None, :]]
+            matriz.flush()
+            del matriz
+            np.save(temporal_ids, unique_ids)
+            # Primero la matriz: quien lea la matriz nueva con los ids viejos solo ve que no
+            # coinciden y la recalcula; al revés aceptaría ids nuevos con la matriz vieja
+            os.replace(temporal, ruta)
+            os.replace(temporal_ids, ruta_ids)
+            # Las versiones anteriores ya no se van a abrir: sin esto el directorio crece n² bytes por versión
+            _limpiar_versiones_anteriores(directorio, nombre, os.path.getmtime(ruta_ids))
+            return cls(signature_ids, niveles, codigos, np.load(ruta, mmap_mode='r'))
+        except OSError:
+            # Disco lleno, permisos o un archivo borrado por otro proceso: calcular cada fila al pedirla
+            for archivo in (temporal, temporal_ids):
+                try:
+                    os.remove(archivo)
+                except OSError:
+                    pass
+            return cls(signature_ids, niveles, codigos)
+
+    def fila(self, i):
+        """Códigos empaquetados de la fila i (n,)"""
+        if self.matriz is not None:
+            return np.asarray(self.matriz[i])
+        return self.codigos[self.signature_ids[i], self.signature_ids]
+
+    def enfrentamientos(self, i):
+        """Multiplicadores (ataque, defensa) de la fila i: lo que i le hace a cada uno y lo que recibe"""
+        fila = self.fila(i)
+        return self.niveles[fila >> 4], self.niveles[fila & 0x0F]
+
+    def counters(self, i, n=10, desempate=None):
+        """Filas que mejor contrarrestan a i: más daño a i, menos daño recibido de i, luego `desempate` mayor"""
+        fila = self.fila(i).astype(np.int64)
+        # Nibble bajo: lo que cada fila le hace a i; nibble alto: lo que i le hace a ella
+        le_hace, recibe = fila & 0x0F, fila >> 4
+        # Clave única para una sola selección O(n): (golpe a i, resistencia a i, desempate)
+        clave = (le_hace << 4 | (0x0F - recibe)) << 32
+        if desempate is not None:
+            clave |= np.clip(np.asarray(desempate, dtype=np.int64), 0, 2**32 - 1)
+        clave[i] = -1  # Uno mismo no cuenta
+        n = min(n, len(fila) - 1)
+        if n <= 0:
+            return np.array([], dtype=np.intp)
+        mejores = np.argpartition(-clave, n - 1)[:n]
+        return mejores[np.argsort(-clave[mejores], kind='stable')]
+
+    def vence_a(self, i):
+        """Filas a las que i golpea x2 o más y que no le golpean x2"""
+        ataque, defensa = self.enfrentamientos(i)
+        return np.flatnonzero((ataque >= 2) & (defensa < 2))
+
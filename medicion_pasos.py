@@ -0,0 +1,172 @@
+# =====================================================
+# MEDICIÓN POR PASOS - POKÉMON TEAM BUILDER
+# Duración, filas, filas/s y memoria pico de cada paso del import (+ cProfile)
+# =====================================================
+
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_maximo_mb():
+    """Pico de memoria residente del proceso hasta ahora (MB), o None si no se puede leer"""
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return maximo / 2**20 if sys.platform == 'darwin' else maximo / 2**10
+
+
+def rss_actual_mb():
+    """Memoria residente actual del proceso (MB), o None fuera de Linux"""
+    try:
+        with open('/proc/self/statm') as archivo:
+            paginas = int(archivo.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+class MuestreoRSS:
+    """Pico de RSS durante un bloque, muestreando la memoria actual en un hilo.
+
+    ru_maxrss es el pico de todo el proceso y no baja nunca: un paso ligero después
+    de uno pesado heredaría su pico. El muestreo puede perder picos más cortos que
+    el intervalo, pero es barato y no necesita tracemalloc.
+    """
+
+    def __init__(self, intervalo=0.01):
+        self.intervalo = intervalo
+        self.pico = rss_actual_mb()
+        self._parar = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        """Empezar a muestrear en segundo plano"""
+        if self.pico is not None:
+            self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self):
+        """Parar el hilo y devolver el pico en MB (None si no se puede leer el RSS)"""
+        if self._hilo:
+            self._parar.set()
+            self._hilo.join()
+            self._anotar()
+        return self.pico
+
+    def _anotar(self):
+        actual = rss_actual_mb()
+        if actual is not None and actual > self.pico:
+            self.pico = actual
+
+    def _muestrear(self):
+        while not self._parar.wait(self.intervalo):
+            self._anotar()
+
+
+class MedicionPasos:
+    """Registro de los pasos de un proceso.
+
+    Siempre mide duración, filas/s, el pico de RSS durante el paso (muestreado, solo
+    Linux) y cuánto subió en el paso el pico de RSS del proceso (ru_maxrss).
+    Con `directorio_perfil` además guarda un cProfile por paso y el pico de memoria
+    de Python del paso (tracemalloc), que es preciso pero hace el paso varias veces
+    más lento: por eso solo se activa al perfilar.
+    """
+
+    def __init__(self, directorio_perfil=None):
+        self.directorio_perfil = directorio_perfil
+        self.pasos = []
+        self.inicio = datetime.now().isoformat(timespec='seconds')
+        if directorio_perfil:
+            os.makedirs(directorio_perfil, exist_ok=True)
+
+    @contextmanager
+    def paso(self, nombre):
+        """Medir el bloque como un paso; quien lo usa anota en el registro las filas y si falló"""
+        registro = {'paso': nombre, 'filas': 0, 'ok': True}
+        perfil = None
+        if self.directorio_perfil:
+            perfil = cProfile.Profile()
+            tracemalloc.start()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+
+        rss_max_inicial = rss_maximo_mb()
+        muestreo = MuestreoRSS().iniciar()
+        inicio = time.perf_counter()
+        if perfil:
+            perfil.enable()
+        try:
+            yield registro
+        except BaseException:
+            registro['ok'] = False
+            raise
+        finally:
+            if perfil:
+                perfil.disable()
+            duracion = time.perf_counter() - inicio
+            rss_pico = muestreo.detener()
+
+            registro['segundos'] = duracion
+            registro['filas_s'] = registro['filas'] / duracion if registro['filas'] and duracion > 0 else None
+            registro['rss_pico_mb'] = rss_pico
+            rss_max_final = rss_maximo_mb()
+            registro['rss_max_subida_mb'] = (
+                rss_max_final - rss_max_inicial if rss_max_final is not None else None
+            )
+            if perfil:
+                pico = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                registro['python_pico_mb'] = max(pico - memoria_inicial, 0) / 2**20
+                archivo = os.path.join(self.directorio_perfil, f"{len(self.pasos) + 1:02d}_{_nombre_archivo(nombre)}.prof")
+                perfil.dump_stats(archivo)
+                registro['perfil'] = archivo
+            self.pasos.append(registro)
+
+    def resumen(self):
+        """Resumen serializable de todos los pasos medidos"""
+        return {
+            'inicio': self.inicio,
+            'total_segundos': sum(p['segundos'] for p in self.pasos),
+            'pasos': self.pasos,
+        }
+
+    def imprimir(self):
+        """Tabla de tiempos por paso"""
+        print("\n⏱️ TIEMPOS POR PASO")
+        print(f"   {'Paso':<30} {'Tiempo':>9} {'Filas':>10} {'Filas/s':>11} {'RSS pico':>10} "
+              f"{'+RSS máx':>10} {'Pico Python':>12}")
+        for p in self.pasos:
+            filas_s = f"{p['filas_s']:,.0f}" if p['filas_s'] else '-'
+            rss = f"{p['rss_pico_mb']:.0f}MB" if p['rss_pico_mb'] is not None else '-'
+            subida = f"{p['rss_max_subida_mb']:.0f}MB" if p['rss_max_subida_mb'] is not None else '-'
+            pico = f"{p['python_pico_mb']:.1f}MB" if 'python_pico_mb' in p else '-'
+            estado = '' if p['ok'] else ' ❌'
+            print(f"   {p['paso']:<30} {p['segundos']:>8.2f}s {p['filas']:>10,} {filas_s:>11} "
+                  f"{rss:>10} {subida:>10} {pico:>12}{estado}")
+        print(f"   {'Total':<30} {self.resumen()['total_segundos']:>8.2f}s")
+
+    def guardar(self, ruta):
+        """Escribir el resumen en JSON"""
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(self.resumen(), archivo, indent=2, ensure_ascii=False)
+
+
+def _nombre_archivo(nombre):
+    """'4. Importar Pokémon' -> 'importar_pokemon'"""
+    nombre = nombre.lower().translate(str.maketrans('áéíóúñ', 'aeioun'))
+    return re.sub(r'[^a-z0-9]+', '_', nombre.split('. ', 1)[-1]).strip('_')
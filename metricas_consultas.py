@@ -0,0 +1,126 @@
+# =====================================================
+# MÉTRICAS POR CONSULTA - POKÉMON TEAM BUILDER
+# Tiempo, filas, bytes y caché por etiqueta; percentiles y exportación JSONL
+# =====================================================
+
+import hashlib
+import json
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+
+def etiqueta_consulta(query):
+    """Etiqueta estable para una consulta sin nombre: hash del SQL sin espacios extra"""
+    normalizada = ' '.join(query.split()).rstrip(';').lower()
+    return 'q_' + hashlib.sha1(normalizada.encode('utf-8')).hexdigest()[:10]
+
+
+def bytes_resultado(df):
+    """Tamaño aproximado de un resultado (DataFrame) en bytes"""
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+class MetricasConsultas:
+    """Registro acotado de ejecuciones de consultas, compartido por todas las sesiones"""
+
+    def __init__(self, max_muestras=2000, archivo_jsonl=None):
+        self.max_muestras = max_muestras
+        self.archivo_jsonl = archivo_jsonl
+        # Por etiqueta solo se guardan las últimas `max_muestras` duraciones
+        self._duraciones = defaultdict(lambda: deque(maxlen=max_muestras))
+        self._totales = defaultdict(lambda: {'n': 0, 'filas': 0, 'bytes': 0, 'hits': 0, 'misses': 0, 'errores': 0})
+        self._registros = deque(maxlen=max_muestras)
+        self._lock = threading.Lock()
+        # El JSONL lo escribe un hilo con el archivo siempre abierto: registrar() no espera al disco
+        self._pendientes = None
+        if archivo_jsonl:
+            self._pendientes = queue.SimpleQueue()
+            self._escritor = threading.Thread(target=self._escribir_jsonl, daemon=True)
+            self._escritor.start()
+
+    def _escribir_jsonl(self):
+        """Hilo escritor: vuelca las líneas pendientes y hace flush cuando la cola se vacía"""
+        with open(self.archivo_jsonl, 'a', encoding='utf-8') as archivo:
+            while True:
+                linea = self._pendientes.get()
+                if linea is None:
+                    return
+                archivo.write(linea)
+                if self._pendientes.empty():
+                    archivo.flush()
+
+    def cerrar(self):
+        """Escribir lo pendiente del JSONL y parar el hilo escritor"""
+        if self._pendientes is not None:
+            self._pendientes.put(None)
+            self._escritor.join()
+            self._pendientes = None
+
+    def registrar(self, etiqueta, segundos, filas=0, bytes_=0, cache_hit=None, error=False):
+        """Guardar una ejecución; cache_hit es None si la consulta no pasa por la caché"""
+        registro = {
+            'ts': time.time(),
+            'label': etiqueta,
+            'ms': round(segundos * 1000, 3),
+            'rows': filas,
+            'bytes': bytes_,
+            'cache_hit': cache_hit,
+            'error': error,
+        }
+        with self._lock:
+            self._duraciones[etiqueta].append(segundos)
+            totales = self._totales[etiqueta]
+            totales['n'] += 1
+            totales['filas'] += filas
+            totales['bytes'] += bytes_
+            if cache_hit is True:
+                totales['hits'] += 1
+            elif cache_hit is False:
+                totales['misses'] += 1
+            if error:
+                totales['errores'] += 1
+            self._registros.append(registro)
+        pendientes = self._pendientes
+        if pendientes is not None:
+            pendientes.put(json.dumps(registro) + '\n')
+
+    def resumen(self):
+        """Percentiles (ms) y totales por etiqueta, ordenado por p95 descendente"""
+        with self._lock:
+            duraciones = {etiqueta: np.array(d) * 1000 for etiqueta, d in self._duraciones.items()}
+            totales = {etiqueta: dict(t) for etiqueta, t in self._totales.items()}
+
+        filas = []
+        for etiqueta, ms in duraciones.items():
+            t = totales[etiqueta]
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            con_cache = t['hits'] + t['misses']
+            filas.append({
+                'label': etiqueta,
+                'n': t['n'],
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'filas_media': t['filas'] / t['n'],
+                'bytes_total': t['bytes'],
+                'hit_rate': t['hits'] / con_cache if con_cache else None,
+                'errores': t['errores'],
+            })
+        return sorted(filas, key=lambda f: -f['p95_ms'])
+
+    def a_jsonl(self):
+        """Las últimas ejecuciones registradas como JSON lines"""
+        with self._lock:
+            registros = list(self._registros)
+        return ''.join(json.dumps(registro) + '\n' for registro in registros)
+
+    def reiniciar(self):
+        """Olvidar todas las muestras"""
+        with self._lock:
+            self._duraciones.clear()
+            self._totales.clear()
+            self._registros.clear()
@@ -0,0 +1,240 @@
+# =====================================================
+# MOTOR DE EFECTIVIDAD DE TIPOS - POKÉMON TEAM BUILDER
+# Matriz 18x18 en memoria para analizar equipos sin ir a MySQL
+# =====================================================
+
+import numpy as np
+import pandas as pd
+
+# Orden canónico de los 18 tipos (índices de filas y columnas de la matriz)
+TIPOS = [
+    'Normal', 'Fire', 'Water', 'Electric', 'Grass', 'Ice',
+    'Fighting', 'Poison', 'Ground', 'Flying', 'Psychic', 'Bug',
+    'Rock', 'Ghost', 'Dragon', 'Dark', 'Steel', 'Fairy'
+]
+INDICE_TIPO = {tipo: i for i, tipo in enumerate(TIPOS)}
+SIN_TIPO = len(TIPOS)  # Índice usado cuando el Pokémon no tiene type2
+# Ids de la tabla `types` (TINYINT) que referencian pokemon y type_effectiveness
+ID_TIPO = {tipo: i + 1 for i, tipo in enumerate(TIPOS)}
+
+# 'Tabla de tipos.csv' usa nombres distintos a los de Pokemon.csv
+ALIAS_TIPOS = {
+    'land': 'Ground',
+    'earth': 'Ground',
+    'sinister': 'Dark',
+    'plant': 'Grass',
+    'struggle': 'Fighting',
+    'fight': 'Fighting',
+    'electrical': 'Electric',
+    'electricity': 'Electric',
+}
+
+# Firmas de tipo: 18 tipos simples + 153 combinaciones dobles = 171 perfiles.
+# El id de firma es la posición en esta lista y no depende del orden type1/type2.
+FIRMAS = np.array(
+    [(i, SIN_TIPO) for i in range(len(TIPOS))]
+    + [(i, j) for i in range(len(TIPOS)) for j in range(i + 1, len(TIPOS))],
+    dtype=np.intp
+)
+_ID_FIRMA = np.full((len(TIPOS) + 1, len(TIPOS) + 1), -1, dtype=np.intp)
+for _id, (_a, _b) in enumerate(FIRMAS):
+    _ID_FIRMA[_a, _b] = _ID_FIRMA[_b, _a] = _id
+for _a in range(len(TIPOS)):
+    _ID_FIRMA[_a, _a] = _ID_FIRMA[_a, SIN_TIPO]
+
+# Un Pokémon inmune cuenta como -2, igual que en la consulta SQL original
+SCORE_INMUNE = -2.0
+
+# Una firma está cubierta si el equipo la golpea al menos x2 con algún tipo STAB
+SUPER_EFECTIVO = 2.0
+NOMBRES_FIRMAS = [TIPOS[a] if b == SIN_TIPO else f"{TIPOS[a]}/{TIPOS[b]}" for a, b in FIRMAS]
+
+
+def normalizar_tipo(nombre):
+    """Convierte un nombre de tipo (o alias) a su nombre canónico, o None"""
+    if nombre is None or (isinstance(nombre, float) and np.isnan(nombre)):
+        return None
+    limpio = str(nombre).strip()
+    if not limpio:
+        return None
+    clave = limpio.lower()
+    if clave in ALIAS_TIPOS:
+        return ALIAS_TIPOS[clave]
+    for tipo in TIPOS:
+        if tipo.lower() == clave:
+            return tipo
+    return None
+
+
+def indice_tipo(nombre):
+    """Índice de un tipo en la matriz; SIN_TIPO si está vacío o no se reconoce"""
+    tipo = normalizar_tipo(nombre)
+    return INDICE_TIPO[tipo] if tipo else SIN_TIPO
+
+
+def id_tipo(nombre):
+    """Id de un tipo (o alias) en la tabla types; None si está vacío o no se reconoce"""
+    tipo = normalizar_tipo(nombre)
+    return ID_TIPO[tipo] if tipo else None
+
+
+def indices_tipos(serie):
+    """Convierte una columna de tipos a índices de la matriz"""
+    return np.fromiter((indice_tipo(t) for t in serie), dtype=np.intp, count=len(serie))
+
+
+def ids_firma(type1, type2):
+    """Id de firma (0-170) para arrays de índices de tipo; -1 si type1 falta"""
+    return _ID_FIRMA[np.asarray(type1, dtype=np.intp), np.asarray(type2, dtype=np.intp)]
+
+
+def firmas_dataframe(df):
+    """Id de firma de cada fila de un DataFrame con columnas type1/type2"""
+    return ids_firma(indices_tipos(df['type1']), indices_tipos(df['type2']))
+
+
+def perfiles_desde_dataframe(df):
+    """Matriz (171, 18) desde SELECT * FROM type_signature_profiles"""
+    perfiles = np.ones((len(FIRMAS), len(TIPOS)))
+    columnas = indices_tipos(df['attacking_type'])
+    validas = columnas != SIN_TIPO
+    perfiles[df['signature_id'].to_numpy(dtype=np.intp)[validas], columnas[validas]] = (
+        df['multiplier'].to_numpy(dtype=np.float64)[validas]
+    )
+    return perfiles
+
+
+def frecuencias_firmas(signature_ids):
+    """Fracción del roster que tiene cada una de las 171 firmas (ids < 0 se ignoran)"""
+    ids = np.asarray(signature_ids, dtype=np.intp)
+    conteos = np.bincount(ids[ids >= 0], minlength=len(FIRMAS))
+    return conteos / max(conteos.sum(), 1)
+
+
+def mascaras_stab(tipos):
+    """Índices de tipo de cada equipo (k, m), SIN_TIPO en los huecos -> (k, 18) bool de tipos STAB"""
+    tipos = np.asarray(tipos, dtype=np.intp)
+    tipos = tipos.reshape(len(tipos), -1)
+    mascaras = np.zeros((len(tipos), len(TIPOS) + 1), dtype=bool)
+    mascaras[np.arange(len(tipos))[:, None], tipos] = True
+    return mascaras[:, :len(TIPOS)]
+
+
+def puntuar_multiplicadores(multiplicadores):
+    """Pasa multiplicadores (4, 2, 1, 0.5, 0.25, 0) a la escala de score de la app"""
+    multiplicadores = np.asarray(multiplicadores, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        scores = np.log2(multiplicadores)
+    return np.where(multiplicadores == 0, SCORE_INMUNE, scores)
+
+
+class MotorTipos:
+    """Matriz de efectividad [tipo atacante, tipo defensor] cargada una sola vez"""
+
+    def __init__(self, matriz, perfiles_firmas=None):
+        matriz = np.asarray(matriz, dtype=np.float64)
+        if matriz.shape != (len(TIPOS), len(TIPOS)):
+            raise ValueError(f"La matriz de efectividad debe ser 18x18, no {matriz.shape}")
+        # Columna extra de unos: defender "sin tipo" no modifica el daño
+        self.matriz = np.hstack([matriz, np.ones((len(TIPOS), 1))])
+        self.matriz.setflags(write=False)
+        # Perfil defensivo precalculado de las 171 firmas (importado o calculado aquí)
+        if perfiles_firmas is None:
+            perfiles_firmas = self.perfiles(FIRMAS[:, 0], FIRMAS[:, 1])
+        self.perfiles_firmas = np.asarray(perfiles_firmas, dtype=np.float64)
+        self.perfiles_firmas.setflags(write=False)
+        # Cobertura ofensiva: para cada multiplicador distinto (de mayor a menor), qué
+        # tipo atacante llega al menos a ese valor contra cada firma
+        self._niveles = np.unique(self.perfiles_firmas)[::-1]
+        self._alcanza = np.stack([(self.perfiles_firmas >= nivel).T for nivel in self._niveles]).astype(np.float32)
+
+    @classmethod
+    def desde_filas(cls, filas):
+        """Construye el motor desde tuplas (attacking_type, defending_type, effectiveness)"""
+        matriz = np.ones((len(TIPOS), len(TIPOS)))
+        for atacante, defensor, efectividad in filas:
+            i, j = indice_tipo(atacante), indice_tipo(defensor)
+            if i == SIN_TIPO or j == SIN_TIPO:
+                continue
+            matriz[i, j] = float(efectividad)
+        return cls(matriz)
+
+    @classmethod
+    def desde_dataframe(cls, df, df_perfiles=None):
+        """Construye el motor desde type_effectiveness (y type_signature_profiles si existe)"""
+        motor = cls.desde_filas(
+            df[['attacking_type', 'defending_type', 'effectiveness']].itertuples(index=False)
+        )
+        if df_perfiles is not None and not df_perfiles.empty:
+            motor = cls(motor.matriz[:, :len(TIPOS)], perfiles_desde_dataframe(df_perfiles))
+        return motor
+
+    def perfiles(self, type1, type2):
+        """Multiplicadores defensivos (n, 18): producto de las columnas de cada tipo"""
+        t1 = np.asarray(type1, dtype=np.intp)
+        t2 = np.asarray(type2, dtype=np.intp)
+        return self.matriz[:, t1].T * self.matriz[:, t2].T
+
+    def perfiles_equipo(self, team_df):
+        """Multiplicadores defensivos de cada miembro: búsqueda por signature_id"""
+        if 'signature_id' in team_df and team_df['signature_id'].notna().all():
+            ids = team_df['signature_id'].to_numpy(dtype=np.intp)
+        else:
+            ids = firmas_dataframe(team_df)
+        if (ids < 0).any():
+            raise ValueError("Hay Pokémon con un type1 no reconocido")
+        return self.perfiles_firmas[ids]
+
+    def analizar_perfiles(self, perfiles):
+        """Matriz de vulnerabilidad del equipo a partir de sus multiplicadores"""
+        perfiles = np.asarray(perfiles, dtype=np.float64).reshape(-1, len(TIPOS))
+        scores = puntuar_multiplicadores(perfiles)
+        df = pd.DataFrame({
+            'attacking_type': TIPOS,
+            'team_score': scores.sum(axis=0),
+            'pokemon_affected': (perfiles != 1).sum(axis=0),
+        })
+        return df.sort_values('team_score', ascending=False, kind='stable').reset_index(drop=True)
+
+    def analizar_equipo(self, team_df):
+        """Equivalente en memoria del score_query de app.py"""
+        return self.analizar_perfiles(self.perfiles_equipo(team_df))
+
+    def mejor_multiplicador(self, mascaras):
+        """Mejor multiplicador (k, 171) que cada equipo logra contra cada firma con sus tipos STAB.
+
+        Un producto de matrices por nivel de multiplicador: (k, 18) @ (18, 171) dice
+        si algún tipo del equipo llega a ese nivel, así miles de equipos van en una llamada.
+        """
+        mascaras = np.asarray(mascaras, dtype=np.float32).reshape(-1, len(TIPOS))
+        mejor = np.zeros((len(mascaras), len(FIRMAS)))
+        pendiente = np.ones(mejor.shape, dtype=bool)
+        for nivel, alcanza in zip(self._niveles, self._alcanza):
+            llega = (mascaras @ alcanza) > 0
+            mejor[pendiente & llega] = nivel
+            pendiente &= ~llega
+        return mejor
+
+    def cobertura_ofensiva(self, tipos, pesos=None):
+        """Cobertura de k equipos dados como índices de tipo (k, m).
+
+        Devuelve el mejor multiplicador por firma (k, 171) y la fracción cubierta de
+        cada equipo (k,), ponderada por `pesos` (p. ej. frecuencias_firmas del roster).
+        """
+        mejor = self.mejor_multiplicador(mascaras_stab(tipos))
+        pesos = np.ones(len(FIRMAS)) if pesos is None else np.asarray(pesos, dtype=np.float64)
+        return mejor, (mejor >= SUPER_EFECTIVO) @ pesos / max(pesos.sum(), 1e-12)
+
+    def analizar_cobertura(self, tipos, pesos=None):
+        """Cobertura ofensiva de un equipo por firma: las no cubiertas más frecuentes primero"""
+        pesos = np.full(len(FIRMAS), 1 / len(FIRMAS)) if pesos is None else np.asarray(pesos, dtype=np.float64)
+        mejor, _ = self.cobertura_ofensiva(np.asarray(tipos).reshape(1, -1), pesos)
+        df = pd.DataFrame({
+            'signature_id': np.arange(len(FIRMAS)),
+            'defending_types': NOMBRES_FIRMAS,
+            'best_multiplier': mejor[0],
+            'roster_share': pesos / max(pesos.sum(), 1e-12),
+        })
+        df['covered'] = df['best_multiplier'] >= SUPER_EFECTIVO
+        return df.sort_values(['covered', 'roster_share', 'best_multiplier'], ascending=[True, False, True],
+                              kind='stable').reset_index(drop=True)
@@ -0,0 +1,255 @@
+# =====================================================
+# PUNTUACIÓN DE EQUIPOS POR LOTES - POKÉMON TEAM BUILDER
+# Miles de equipos por llamada: reducción vectorizada N x 6 x 18
+# =====================================================
+#
+# Uso:
+#   python puntuar_equipos.py equipos.jsonl -o scores.csv
+#   python puntuar_equipos.py equipos.csv -o scores.jsonl --mysql
+#   python puntuar_equipos.py datos_sinteticos/equipos.jsonl --roster datos_sinteticos/Pokemon.csv
+#
+# Entrada JSONL: una línea por equipo, {"team": "...", "members": [...]} o solo la lista.
+# Entrada CSV: columna opcional "team" y el resto son los miembros.
+# Los miembros pueden ser nombres o unique_id.
+
+import argparse
+import csv
+import itertools
+import json
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from almacenamiento import SQL_EFECTIVIDAD
+from motor_tipos import SIN_TIPO, TIPOS, MotorTipos, firmas_dataframe, frecuencias_firmas, indices_tipos, puntuar_multiplicadores
+
+TAMANO_EQUIPO = 6
+LINEAS_POR_BLOQUE = 4096
+
+# Texto de cada score posible, para formatear el CSV sin pasar por csv.writer
+_TEXTO_SCORE = np.array([str(v) for v in range(-128, 128)], dtype=object)
+_NECESITA_COMILLAS = re.compile(r'[,"\n\r]').search
+
+
+class PuntuadorEquipos:
+    """Tabla de scores por Pokémon del roster para puntuar equipos en bloque"""
+
+    def __init__(self, df_pokemon, motor):
+        if 'signature_id' in df_pokemon and df_pokemon['signature_id'].notna().all():
+            firmas = df_pokemon['signature_id'].to_numpy(dtype=np.intp)
+        else:
+            firmas = firmas_dataframe(df_pokemon)
+        if (firmas < 0).any():
+            # Con índice -1 el Pokémon tomaría en silencio los scores de la última firma
+            raise ValueError("Hay Pokémon con un type1 no reconocido")
+        # Una fila de scores por Pokémon y una fila de ceros al final para los huecos
+        scores = puntuar_multiplicadores(motor.perfiles_firmas[firmas]).astype(np.int8)
+        self.scores = np.vstack([scores, np.zeros((1, len(TIPOS)), dtype=np.int8)])
+        self.scores.setflags(write=False)
+        self.hueco = len(df_pokemon)
+
+        # Tipos STAB de cada fila (SIN_TIPO en el hueco) y peso de cada firma en el roster
+        self.motor = motor
+        self.tipos = np.vstack([
+            np.column_stack([indices_tipos(df_pokemon['type1']), indices_tipos(df_pokemon['type2'])]),
+            [[SIN_TIPO, SIN_TIPO]]
+        ])
+        self.pesos_firmas = frecuencias_firmas(firmas)
+
+        # Un solo diccionario con las claves tal cual llegan en los archivos
+        # (nombre exacto, unique_id entero o texto); None es el hueco de relleno
+        self.indice = {None: self.hueco}
+        for i, (nombre, unique_id) in enumerate(zip(df_pokemon['name'], df_pokemon['unique_id'])):
+            self.indice[str(nombre).lower()] = i
+            self.indice[str(nombre)] = i
+            self.indice[int(unique_id)] = i
+            self.indice[str(int(unique_id))] = i
+
+    def buscar(self, miembro):
+        """Fila de un miembro (nombre o unique_id, sin distinguir mayúsculas) o None"""
+        fila = self.indice.get(miembro)
+        if fila is None and isinstance(miembro, str):
+            fila = self.indice.get(miembro.strip().lower())
+        return fila
+
+    def resolver(self, miembros):
+        """Índices de fila (rellenos hasta 6) y lista de miembros no encontrados o de más.
+
+        Solo se puntúan los 6 primeros; los siguientes se reportan como "<miembro> (más de 6)".
+        """
+        filas = []
+        desconocidos = []
+        miembros = list(miembros)
+        for miembro in miembros[:TAMANO_EQUIPO]:
+            fila = self.buscar(miembro)
+            if fila is None:
+                desconocidos.append(str(miembro))
+            else:
+                filas.append(fila)
+        desconocidos.extend(f"{miembro} (más de {TAMANO_EQUIPO})" for miembro in miembros[TAMANO_EQUIPO:])
+        filas.extend([self.hueco] * (TAMANO_EQUIPO - len(filas)))
+        return filas, desconocidos
+
+    def puntuar(self, indices):
+        """Scores (N, 18) de N equipos dados como índices de fila (N, 6)"""
+        return self.scores[np.asarray(indices, dtype=np.intp)].sum(axis=1, dtype=np.int16)
+
+    def cobertura(self, indices):
+        """Fracción del roster (por firma) que cada equipo golpea x2 o más con sus tipos STAB"""
+        indices = np.asarray(indices, dtype=np.intp)
+        return self.motor.cobertura_ofensiva(self.tipos[indices].reshape(len(indices), -1), self.pesos_firmas)[1]
+
+    def puntuar_stream(self, equipos, tamano_lote=65536, cobertura=False):
+        """Puntuar un iterable de (nombre, miembros) por lotes, sin cargarlo entero.
+
+        Cada lote es (nombres, scores, desconocidos, cobertura); cobertura es None si no se pide.
+        """
+        equipos = iter(equipos)
+        while True:
+            lote = list(itertools.islice(equipos, tamano_lote))
+            if not lote:
+                return
+            # Camino rápido: una búsqueda exacta por miembro para todo el lote
+            relleno = [None] * TAMANO_EQUIPO
+            planos = [m for _, miembros in lote for m in (list(miembros) + relleno)[:TAMANO_EQUIPO]]
+            get = self.indice.get
+            indices = np.array([get(m, -1) for m in planos], dtype=np.intp).reshape(-1, TAMANO_EQUIPO)
+
+            # Camino lento solo para los equipos con algún miembro no encontrado o de más
+            desconocidos = [[] for _ in lote]
+            de_mas = np.array([len(miembros) > TAMANO_EQUIPO for _, miembros in lote])
+            for i in np.flatnonzero((indices < 0).any(axis=1) | de_mas):
+                indices[i], desconocidos[i] = self.resolver(lote[i][1])
+            yield ([nombre for nombre, _ in lote], self.puntuar(indices), desconocidos,
+                   self.cobertura(indices) if cobertura else None)
+
+
+def leer_equipos(ruta):
+    """Generador de (nombre, miembros) desde un archivo JSONL o CSV"""
+    with open(ruta, newline='', encoding='utf-8') as archivo:
+        if ruta.endswith('.csv'):
+            lector = csv.reader(archivo)
+            cabecera = next(lector, [])
+            con_nombre = bool(cabecera) and cabecera[0].strip().lower() == 'team'
+            for numero, fila in enumerate(lector, start=1):
+                if con_nombre:
+                    yield fila[0], [m for m in fila[1:] if m.strip()]
+                else:
+                    yield f"team_{numero}", [m for m in fila if m.strip()]
+        else:
+            # Decodificar bloques de líneas como un solo arreglo JSON: una llamada a
+            # json.loads por bloque en vez de una por equipo
+            numero = 0
+            while True:
+                lineas = [l for l in itertools.islice(archivo, LINEAS_POR_BLOQUE) if l.strip()]
+                if not lineas:
+                    return
+                datos = json.loads('[' + ','.join(lineas) + ']')
+                yield from (
+                    (dato.get('team', f"team_{n}"), dato.get('members', []))
+                    if isinstance(dato, dict) else (f"team_{n}", dato)
+                    for n, dato in enumerate(datos, start=numero + 1)
+                )
+                numero += len(datos)
+
+
+def escribir_scores(salida, nombres, scores, desconocidos, formato, cobertura=None):
+    """Escribir un lote de resultados (CSV o JSONL); cobertura añade offensive_coverage"""
+    vulnerabilidades = np.maximum(scores, 0).sum(axis=1)
+    if formato == 'jsonl':
+        coberturas = [None] * len(nombres) if cobertura is None else np.round(cobertura, 4).tolist()
+        for nombre, fila, vuln, faltan, cob in zip(nombres, scores.tolist(), vulnerabilidades.tolist(),
+                                                   desconocidos, coberturas):
+            registro = {
+                'team': nombre,
+                'scores': dict(zip(TIPOS, fila)),
+                'vulnerability': vuln,
+                'unknown': faltan,
+            }
+            if cob is not None:
+                registro['offensive_coverage'] = cob
+            salida.write(json.dumps(registro) + '\n')
+    else:
+        celdas = _TEXTO_SCORE[np.column_stack([scores, vulnerabilidades]) + 128].tolist()
+        extra = [''] * len(nombres) if cobertura is None else [f",{c:.4f}" for c in cobertura.tolist()]
+        salida.write(''.join(
+            f"{_campo_csv(nombre)},{','.join(fila)}{cob},{_campo_csv(';'.join(faltan))}\n"
+            for nombre, fila, faltan, cob in zip(nombres, celdas, desconocidos, extra)
+        ))
+
+
+def _campo_csv(valor):
+    """Citar un campo de texto solo si lo necesita (comas, comillas, saltos de línea)"""
+    valor = str(valor)
+    if _NECESITA_COMILLAS(valor):
+        return '"' + valor.replace('"', '""') + '"'
+    return valor
+
+
+def cargar_roster(desde_mysql, archivo='Pokemon.csv'):
+    """Roster y motor de tipos desde MySQL o, sin servidor, desde los CSV"""
+    import import_mejorado
+
+    if desde_mysql:
+        connection = import_mejorado.conectar_bd()
+        if not connection:
+            return None, None
+        try:
+            df_pokemon = pd.read_sql("SELECT unique_id, name, type1, type2, signature_id FROM vw_pokemon", connection)
+            df_efectividad = pd.read_sql(SQL_EFECTIVIDAD, connection)
+            return df_pokemon, MotorTipos.desde_dataframe(df_efectividad)
+        finally:
+            connection.close()
+
+    df_pokemon = import_mejorado.procesar_pokemon_data(archivo)
+    if df_pokemon is None:
+        return None, None
+    # Mismos unique_id que asigna AUTO_INCREMENT en una importación limpia
+    df_pokemon['unique_id'] = np.arange(1, len(df_pokemon) + 1)
+    return df_pokemon, MotorTipos.desde_filas(import_mejorado.leer_efectividad_tipos())
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Puntuar equipos Pokémon por lotes")
+    parser.add_argument('entrada', help="Archivo de equipos (.jsonl o .csv)")
+    parser.add_argument('-o', '--salida', default='scores.csv', help="Archivo de resultados (.csv o .jsonl)")
+    parser.add_argument('--lote', type=int, default=65536, help="Equipos por lote vectorizado")
+    parser.add_argument('--mysql', action='store_true', help="Leer el roster desde MySQL en vez de los CSV")
+    parser.add_argument('--roster', default='Pokemon.csv', help="CSV del roster sin MySQL (p. ej. uno de generar_roster.py)")
+    parser.add_argument('--cobertura', action='store_true',
+                        help="Añadir offensive_coverage: fracción del roster que el equipo golpea x2 con sus tipos STAB")
+    args = parser.parse_args()
+
+    df_pokemon, motor = cargar_roster(args.mysql, args.roster)
+    if df_pokemon is None:
+        print("❌ No se pudo cargar el roster.")
+        sys.exit(1)
+    try:
+        puntuador = PuntuadorEquipos(df_pokemon, motor)
+    except ValueError as e:
+        print(f"❌ Roster no válido: {e}")
+        sys.exit(1)
+
+    formato = 'jsonl' if args.salida.endswith('.jsonl') else 'csv'
+    total = 0
+    inicio = time.perf_counter()
+    with open(args.salida, 'w', newline='', encoding='utf-8') as salida:
+        if formato == 'csv':
+            cobertura = ['offensive_coverage'] if args.cobertura else []
+            csv.writer(salida).writerow(['team', *TIPOS, 'vulnerability', *cobertura, 'unknown'])
+        lotes = puntuador.puntuar_stream(leer_equipos(args.entrada), args.lote, args.cobertura)
+        for nombres, scores, desconocidos, cobertura in lotes:
+            escribir_scores(salida, nombres, scores, desconocidos, formato, cobertura)
+            total += len(nombres)
+
+    duracion = time.perf_counter() - inicio
+    print(f"✅ {total} equipos puntuados en {duracion:.2f}s ({total / max(duracion, 1e-9):,.0f} equipos/s)")
+    print(f"💾 Resultados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# =====================================================
+# RANKING DE PODER - POKÉMON TEAM BUILDER
+# Equivalente vectorizado de fn_calculate_power_level + RANK() OVER
+# =====================================================
+
+import numpy as np
+import pandas as pd
+
+# Multiplicador en décimas: 1.0 base, +0.5 legendario, más el bono de la forma
+MULTIPLICADOR_BASE = 10
+BONO_LEGENDARIO = 5
+BONO_FORMA = {'mega': 8, 'primal': 9, 'regional': 2, 'special': 3}
+
+
+def centesimas_poder(total_stats, legendary, form_type):
+    """power_level * 100 como entero exacto.
+
+    fn_calculate_power_level devuelve total_stats / 10 * multiplicador con dos
+    decimales; con el multiplicador en décimas el resultado en centésimas es
+    total_stats * décimas, sin redondeos de coma flotante.
+    """
+    formas = pd.Series(np.asarray(form_type, dtype=object))
+    decimas = (MULTIPLICADOR_BASE
+               + BONO_LEGENDARIO * np.asarray(legendary, dtype=bool)
+               + formas.map(BONO_FORMA).fillna(0).to_numpy(dtype=np.int64))
+    return np.asarray(total_stats, dtype=np.int64) * decimas
+
+
+def rangos(centesimas):
+    """RANK() OVER (ORDER BY power_level DESC): los empates comparten puesto y dejan hueco"""
+    centesimas = np.asarray(centesimas, dtype=np.int64)
+    ordenadas = np.sort(-centesimas)
+    return np.searchsorted(ordenadas, -centesimas, side='left') + 1
+
+
+def ranking_poder(df):
+    """DataFrame unique_id, power_level, power_rank para las filas de pokemon en df"""
+    centesimas = centesimas_poder(df['total_stats'], df['legendary'], df['form_type'])
+    return pd.DataFrame({
+        'unique_id': df['unique_id'].to_numpy(dtype=np.int64),
+        'power_level': centesimas / 100,
+        'power_rank': rangos(centesimas),
+    })
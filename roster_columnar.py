@@ -0,0 +1,123 @@
+# =====================================================
+# ROSTER COLUMNAR EN MEMORIA - POKÉMON TEAM BUILDER
+# Un arreglo por columna, compartido y de solo lectura entre sesiones
+# =====================================================
+
+import numpy as np
+import pandas as pd
+
+from busqueda_nombres import IndiceNombres
+from motor_tipos import SIN_TIPO, TIPOS, firmas_dataframe, frecuencias_firmas, indices_tipos
+
+COLUMNAS_STATS = ['total_stats', 'hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']
+
+
+def _solo_lectura(arreglo):
+    arreglo = np.ascontiguousarray(arreglo)
+    arreglo.setflags(write=False)
+    return arreglo
+
+
+class RosterColumnar:
+    """Roster como struct-of-arrays: tipos como códigos enteros, formas categóricas,
+    índices hash de nombre y unique_id a fila e índice de búsqueda de nombres.
+
+    Se construye una vez por versión de datos y todas las sesiones leen el mismo
+    objeto, así que nada de él debe modificarse.
+    """
+
+    def __init__(self, df):
+        df = df.reset_index(drop=True)
+        self.n = len(df)
+
+        self.unique_id = _solo_lectura(df['unique_id'].to_numpy(dtype=np.int32))
+        self.pokedex_number = _solo_lectura(df['pokedex_number'].to_numpy(dtype=np.int32))
+        self.name = _solo_lectura(df['name'].astype(str).to_numpy(dtype=object))
+        self.base_name = _solo_lectura(df['base_name'].astype(str).to_numpy(dtype=object))
+
+        # Códigos de tipo 0-17 (SIN_TIPO = sin type2); la vista trae el id de `types`
+        if 'type1_id' in df:
+            self.type1 = _solo_lectura(df['type1_id'].to_numpy(dtype=np.int8) - 1)
+            self.type2 = _solo_lectura(df['type2_id'].fillna(SIN_TIPO + 1).to_numpy(dtype=np.int8) - 1)
+        else:
+            self.type1 = _solo_lectura(indices_tipos(df['type1']).astype(np.int8))
+            self.type2 = _solo_lectura(indices_tipos(df['type2']).astype(np.int8))
+        if 'signature_id' in df and df['signature_id'].notna().all():
+            self.signature_id = _solo_lectura(df['signature_id'].to_numpy(dtype=np.int16))
+        else:
+            self.signature_id = _solo_lectura(firmas_dataframe(df).astype(np.int16))
+
+        formas = pd.Categorical(df['form_type'])
+        self.formas = list(formas.categories)
+        self.form_code = _solo_lectura(formas.codes.astype(np.int8))
+        self._codigo_base = self.formas.index('base') if 'base' in self.formas else -1
+
+        self.stats = {columna: _solo_lectura(df[columna].to_numpy(dtype=np.int16)) for columna in COLUMNAS_STATS}
+        self.generation = _solo_lectura(df['generation'].to_numpy(dtype=np.int8))
+        self.legendary = _solo_lectura(df['legendary'].astype(bool).to_numpy())
+
+        # Índices hash: nombre -> fila y unique_id -> fila
+        self.fila_por_nombre = {nombre: i for i, nombre in enumerate(self.name)}
+        self.fila_por_id = {int(uid): i for i, uid in enumerate(self.unique_id)}
+
+        # Derivados que la app usaba recalcular en cada rerun
+        self.nombres = self.name.tolist()
+        presentes = np.union1d(self.type1, self.type2[self.type2 != SIN_TIPO])
+        self.tipos_presentes = sorted(TIPOS[i] for i in presentes)
+        self.frecuencia_firmas = _solo_lectura(frecuencias_firmas(self.signature_id))
+        self.busqueda = IndiceNombres(self.name, self.base_name, self.form_code == self._codigo_base)
+
+    def __len__(self):
+        return self.n
+
+    def filas(self, nombres):
+        """Filas de una lista de nombres (en ese orden); los desconocidos se omiten"""
+        get = self.fila_por_nombre.get
+        return np.array([f for f in map(get, nombres) if f is not None], dtype=np.intp)
+
+    def filas_por_id(self, unique_ids):
+        """Filas de una lista de unique_id (en ese orden); los desconocidos se omiten"""
+        get = self.fila_por_id.get
+        return np.array([f for f in (get(int(u)) for u in unique_ids) if f is not None], dtype=np.intp)
+
+    def tipos_stab(self, filas):
+        """Índices de tipo (type1 y type2, SIN_TIPO si falta) de las filas, para la cobertura ofensiva"""
+        return np.concatenate([self.type1[filas], self.type2[filas]]).astype(np.intp)
+
+    def form_type(self, filas=None):
+        """Nombre de la forma de cada fila"""
+        codigos = self.form_code if filas is None else self.form_code[filas]
+        return np.asarray(self.formas, dtype=object)[codigos]
+
+    def dataframe(self, filas=None):
+        """DataFrame (una copia) de las filas pedidas, o de todo el roster"""
+        sel = slice(None) if filas is None else np.asarray(filas, dtype=np.intp)
+        nombres_tipo = np.asarray(TIPOS + [None], dtype=object)
+        return pd.DataFrame({
+            'unique_id': self.unique_id[sel],
+            'pokedex_number': self.pokedex_number[sel],
+            'name': self.name[sel],
+            'base_name': self.base_name[sel],
+            'form_type': self.form_type(sel),
+            'type1': nombres_tipo[self.type1[sel]],
+            'type2': nombres_tipo[self.type2[sel]],
+            **{columna: valores[sel] for columna, valores in self.stats.items()},
+            'generation': self.generation[sel],
+            'legendary': self.legendary[sel],
+            'signature_id': self.signature_id[sel],
+        })
+
+    def resumen(self):
+        """Conteos del dashboard sin construir ningún DataFrame"""
+        return {
+            'entradas': self.n,
+            'especies': int(np.unique(self.pokedex_number).size),
+            'formas_alternativas': int((self.form_code != self._codigo_base).sum()),
+            'legendarios': int(self.legendary.sum()),
+        }
+
+    def memoria_bytes(self):
+        """Memoria de las columnas numéricas (sin contar textos ni índices)"""
+        arreglos = [self.unique_id, self.pokedex_number, self.type1, self.type2, self.signature_id,
+                    self.form_code, self.generation, self.legendary, *self.stats.values()]
+        return sum(a.nbytes for a in arreglos)
@@ -0,0 +1,101 @@
+# =====================================================
+# TESTS DEL CLASIFICADOR DE FORMAS - POKÉMON TEAM BUILDER
+# python -m pytest test_formas.py
+# =====================================================
+
+import os
+
+import pandas as pd
+import pytest
+
+from import_mejorado import clasificar_formas
+
+CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Pokemon.csv')
+FORMAS_VALIDAS = {'base', 'mega', 'primal', 'regional', 'special'}
+
+# Un ejemplo de cada patrón de nombre de Pokemon.csv: (nombre, form_type, base_name)
+PATRONES = [
+    ('Bulbasaur', 'base', 'Bulbasaur'),
+    ('VenusaurMega Venusaur', 'mega', 'Venusaur'),
+    ('CharizardMega Charizard X', 'mega', 'Charizard'),
+    ('MewtwoMega Mewtwo Y', 'mega', 'Mewtwo'),
+    ('KyogrePrimal Kyogre', 'primal', 'Kyogre'),
+    ('GroudonPrimal Groudon', 'primal', 'Groudon'),
+    ('Meganium', 'base', 'Meganium'),
+    ('Yanmega', 'base', 'Yanmega'),
+    ('Mr. Mime', 'base', 'Mr. Mime'),
+    ('Mime Jr.', 'base', 'Mime Jr.'),
+    ('Porygon2', 'base', 'Porygon2'),
+    ("Farfetch'd", 'base', "Farfetch'd"),
+    ('DeoxysNormal Forme', 'base', 'Deoxys'),
+    ('DeoxysAttack Forme', 'special', 'Deoxys'),
+    ('DeoxysDefense Forme', 'special', 'Deoxys'),
+    ('DeoxysSpeed Forme', 'base', 'Deoxys'),
+    ('Zygarde50% Forme', 'base', 'Zygarde'),
+    ('WormadamPlant Cloak', 'base', 'Wormadam'),
+    ('RotomHeat Rotom', 'base', 'Rotom'),
+    ('DarmanitanZen Mode', 'base', 'Darmanitan'),
+    ('KyuremBlack Kyurem', 'base', 'Kyurem'),
+    ('MeowsticMale', 'base', 'Meowstic'),
+    ('MeowsticFemale', 'base', 'Meowstic'),
+    ('PumpkabooAverage Size', 'base', 'Pumpkaboo'),
+    ('GourgeistSuper Size', 'special', 'Gourgeist'),
+    ('HoopaHoopa Confined', 'special', 'Hoopa'),
+    ('HoopaHoopa Unbound', 'special', 'Hoopa'),
+    # Formas regionales: no están en Pokemon.csv pero sí en los rosters de generar_roster.py
+    ('RaichuAlolan Raichu', 'regional', 'Raichu'),
+    ('Mr. MimeGalarian Mr. Mime', 'regional', 'Mr. Mime'),
+    ('Alolan Raichu', 'regional', 'Raichu'),
+    ('Galarian Meowth', 'regional', 'Meowth'),
+    ('Mega Charizard X', 'mega', 'Charizard'),
+    ('  Pikachu ', 'base', 'Pikachu'),
+]
+
+
+@pytest.fixture(scope='module')
+def pokemon_csv():
+    return pd.read_csv(CSV)
+
+
+@pytest.mark.parametrize('dtype', ['str', object])
+@pytest.mark.parametrize('nombre, forma, base', PATRONES)
+def test_patron(nombre, forma, base, dtype):
+    form_type, is_alternate, base_name = clasificar_formas(pd.Series([nombre], dtype=dtype))
+    assert form_type[0] == forma
+    assert is_alternate[0] == (forma != 'base')
+    assert base_name[0] == base
+
+
+def test_nombre_vacio():
+    form_type, is_alternate, base_name = clasificar_formas(pd.Series(['Pikachu', None]))
+    assert form_type[1] == 'base'
+    assert not is_alternate[1]
+    assert pd.isna(base_name[1])
+
+
+def test_todo_el_csv_se_clasifica(pokemon_csv):
+    nombres = pokemon_csv['Name']
+    form_type, is_alternate, base_name = clasificar_formas(nombres)
+    assert set(form_type) <= FORMAS_VALIDAS
+    assert (is_alternate == (form_type != 'base')).all()
+    assert base_name.notna().all()
+    assert all(base and base in nombre for nombre, base in zip(nombres, base_name))
+    # Ninguna Mega falsa: todas llevan "Mega " pegado a la especie
+    assert set(nombres[form_type == 'mega'].str.contains('Mega ')) == {True}
+    assert form_type[nombres.isin(['Meganium', 'Yanmega'])].eq('base').all()
+
+
+def test_megas_y_primal_apuntan_a_su_especie(pokemon_csv):
+    form_type, _, base_name = clasificar_formas(pokemon_csv['Name'])
+    especies = pokemon_csv.assign(base_name=base_name, form_type=form_type)
+    base = especies[especies['form_type'] == 'base'].set_index('#')['Name']
+    formas = especies[especies['form_type'].isin(['mega', 'primal'])]
+    assert len(formas) == 50
+    assert (formas['base_name'].to_numpy() == base.loc[formas['#']].to_numpy()).all()
+
+
+def test_mismo_resultado_con_arrow_y_objetos(pokemon_csv):
+    arrow = clasificar_formas(pokemon_csv['Name'])
+    objetos = clasificar_formas(pokemon_csv['Name'].astype(object))
+    for a, b in zip(arrow, objetos):
+        assert a.astype(object).tolist() == b.astype(object).tolist()